@@ -0,0 +1,10 @@
+"""Benchmarks that time the repoma hooks, run from the repository root.
+
+.. code-block:: shell
+
+    python -m benchmarks.synthetic --sizes 1 2 4 8 --output synthetic.json
+    python -m benchmarks.replay ../ampform --commits 50 --output ampform.json
+
+The hooks are run in separate processes with the :code:`repoma` package of this
+working tree, so that start-up time is included, just like under pre-commit.
+"""
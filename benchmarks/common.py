@@ -0,0 +1,157 @@
+"""Run hooks in separate processes and store their timings as JSON."""
+
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import attr
+
+REPOMA_ROOT = Path(__file__).parent.parent
+
+HOOKS = {
+    "check-dev-files": "repoma.check_dev_files",
+    "fix-nbformat-version": "repoma.fix_nbformat_version",
+    "format-setup-cfg": "repoma.format_setup_cfg",
+    "pin-nb-requirements": "repoma.pin_nb_requirements",
+    "set-nb-cells": "repoma.set_nb_cells",
+}
+"""Module of the :code:`main` function of each hook, by hook ID."""
+
+
+@attr.s(frozen=True)
+class Measurement:
+    """Resources that one run of a hook took."""
+
+    hook: str = attr.ib()
+    seconds: float = attr.ib()
+    max_rss_kb: int = attr.ib()
+    """Peak resident memory of the hook process in kilobytes."""
+    exit_code: int = attr.ib()
+
+
+def run_hook(hook: str, args: Sequence[str], cwd: Union[Path, str]) -> Measurement:
+    """Run a hook in a new interpreter, like pre-commit does, and measure it."""
+    module = HOOKS[hook]
+    command = [
+        sys.executable,
+        "-c",
+        f"import sys; from {module} import main; sys.exit(main())",
+        *args,
+    ]
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(REPOMA_ROOT / "src")
+    start = time.perf_counter()
+    process = subprocess.Popen(  # pylint: disable=consider-using-with
+        command,
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    if not hasattr(os, "wait4"):
+        exit_code = process.wait()
+        return Measurement(hook, time.perf_counter() - start, 0, exit_code)
+    _, status, usage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - start
+    exit_code = _to_exit_code(status)
+    process.returncode = exit_code  # already reaped by os.wait4
+    max_rss_kb = usage.ru_maxrss
+    if sys.platform == "darwin":
+        max_rss_kb //= 1024  # bytes on macOS
+    return Measurement(hook, seconds, max_rss_kb, exit_code)
+
+
+def _to_exit_code(status: int) -> int:
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    """Compute statistics of a sample of timings.
+
+    >>> summarize([3.0, 1.0, 2.0, 4.0])
+    {'min': 1.0, 'median': 2.5, 'p90': 3.7, 'max': 4.0, 'mean': 2.5}
+    """
+    return {
+        "min": min(values),
+        "median": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "max": max(values),
+        "mean": sum(values) / len(values),
+    }
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Compute a percentile with linear interpolation, like `numpy.percentile`.
+
+    >>> percentile([1.0, 2.0, 3.0, 4.0, 5.0], 95)
+    4.8
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    fraction = position - lower
+    return round(ordered[lower] + (ordered[upper] - ordered[lower]) * fraction, 9)
+
+
+def estimate_exponent(sizes: Sequence[float], seconds: Sequence[float]) -> float:
+    r"""Fit :math:`t \propto n^k` and return :math:`k`.
+
+    An exponent of 1 means that a hook scales linearly with the size of the
+    repository; an exponent that is clearly larger than 1 points to super-linear
+    behavior.
+
+    >>> round(estimate_exponent([1, 2, 4], [0.1, 0.4, 1.6]), 3)
+    2.0
+    """
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in seconds]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if variance == 0:
+        return math.nan
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    return covariance / variance
+
+
+def write_results(
+    path: Union[Path, str], benchmark: str, results: List[Dict[str, Any]], **info: Any
+) -> None:
+    """Write benchmark results to a JSON file, with information on the machine."""
+    content = {
+        "benchmark": benchmark,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "repoma": _get_repoma_version(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        **info,
+        "results": results,
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as stream:
+        json.dump(content, stream, indent=2)
+        stream.write("\n")
+
+
+def _get_repoma_version() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty", "--tags"],
+            cwd=REPOMA_ROOT,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,232 @@
+"""Compare the models of :mod:`repoma.utilities.precommit` with pydantic models.
+
+.. code-block:: shell
+
+    python -m benchmarks.models --repos 10 100 --output models.json
+
+The pydantic models are the ones that :mod:`repoma.utilities.precommit` used
+before, so pydantic has to be installed to run this benchmark. Each case is timed
+for both implementations on a :file:`.pre-commit-config.yaml` with a growing
+number of repos:
+
+- **import**: time to import pydantic or the module with the new models, in a new
+  interpreter.
+- **lookup**: create the config from a `dict` and find one hook, which is what
+  most checks do.
+- **validate**: create the config and convert all of it back to a `dict`.
+- **compare**: compare a hook to its expected definition.
+"""
+
+import argparse
+import importlib.util
+import os
+import subprocess
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import yaml
+
+from benchmarks.common import REPOMA_ROOT, summarize, write_results
+from benchmarks.synthetic import RepositorySpec, create_precommit_config
+
+_LEGACY_MODELS = """
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class PrecommitCi(BaseModel):
+    autofix_commit_msg: str = "[pre-commit.ci] auto fixes [...]"
+    autofix_prs: bool = True
+    autoupdate_commit_msg: str = "[pre-commit.ci] pre-commit autoupdate"
+    autoupdate_schedule: str = "weekly"
+    skip: List[str] = []
+    submodules: bool = False
+
+
+class Hook(BaseModel):
+    id: str
+    args: List[str] = []
+    name: Optional[str] = None
+    additional_dependencies: List[str] = []
+    files: Optional[str] = None
+    exclude: Optional[str] = None
+    types: Optional[List[str]] = None
+    alias: Optional[str] = None
+
+
+class Repo(BaseModel):
+    repo: str
+    rev: Optional[str] = None
+    hooks: List[Hook]
+
+    def get_hook_index(self, hook_id: str) -> Optional[int]:
+        for i, hook in enumerate(self.hooks):
+            if hook.id == hook_id:
+                return i
+        return None
+
+
+class PrecommitConfig(BaseModel):
+    repos: List[Repo]
+    ci: Optional[PrecommitCi] = None
+    files: str = ""
+    exclude: str = "^$"
+    fail_fast: bool = False
+
+    def get_repo_index(self, search_pattern: str) -> Optional[int]:
+        import re
+
+        for i, repo in enumerate(self.repos):
+            if re.search(search_pattern, repo.repo):
+                return i
+        return None
+"""
+"""The pydantic models that :mod:`repoma.utilities.precommit` used to define."""
+
+
+def load_legacy_models() -> Any:
+    """Create a module with the pydantic models."""
+    spec = importlib.util.spec_from_loader("legacy_precommit", loader=None)
+    module = importlib.util.module_from_spec(spec)  # type: ignore[arg-type]
+    exec(_LEGACY_MODELS, module.__dict__)  # pylint: disable=exec-used
+    return module
+
+
+def load_models() -> Any:
+    """Import the models of this working tree."""
+    src_dir = str(REPOMA_ROOT / "src")
+    if src_dir not in sys.path:
+        sys.path.insert(0, src_dir)
+    return importlib.import_module("repoma.utilities.precommit")
+
+
+def measure_import_time(implementation: str) -> float:
+    """Time to import the models in a new interpreter, in seconds.
+
+    For pydantic, this is the cumulative import time of :mod:`pydantic`. For the
+    models of repoma, this is the time of :mod:`repoma.utilities.precommit`
+    itself, without the imports that it shares with the rest of repoma.
+    """
+    if implementation == "pydantic":
+        module_name, column = "pydantic", 1
+    else:
+        module_name, column = "repoma.utilities.precommit", 0
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(REPOMA_ROOT / "src")
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # do not time the compilation
+    command = [sys.executable, "-X", "importtime", "-c", f"import {module_name}"]
+    subprocess.run(command, check=True, env=env, stderr=subprocess.DEVNULL)
+    process = subprocess.run(
+        command,
+        check=True,
+        env=env,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        *times, name = line[len("import time:") :].split("|")
+        if name.strip() == module_name:
+            return int(times[column]) / 1e6
+    raise ValueError(f"{module_name} has not been imported")
+
+
+def create_cases(models: Any, definition: Dict[str, Any]) -> Dict[str, Callable]:
+    """Create the functions that are timed, for one implementation of the models."""
+    last_repo = definition["repos"][-1]
+    last_hook = last_repo["hooks"][-1]
+    url_pattern = last_repo["repo"] + "$"
+    expected_hook = {"id": last_hook["id"], "args": ["--option=0"]}
+    hook = models.Hook(**last_hook)
+    if hasattr(models.Hook, "__slots__"):
+
+        def compare() -> bool:
+            return hook != models.Hook(**expected_hook)
+
+    else:
+
+        def compare() -> bool:
+            return hook.dict(skip_defaults=True) != expected_hook
+
+    def lookup() -> Optional[int]:
+        config = models.PrecommitConfig(**definition)
+        index = config.get_repo_index(url_pattern)
+        return config.repos[index].get_hook_index(last_hook["id"])
+
+    def validate() -> dict:
+        return models.PrecommitConfig(**definition).dict()
+
+    return {"lookup": lookup, "validate": validate, "compare": compare}
+
+
+def run_benchmarks(
+    repo_counts: Sequence[int], repeat: int = 5, hooks_per_repo: int = 3
+) -> List[Dict[str, Any]]:
+    implementations = {"pydantic": load_legacy_models(), "repoma": load_models()}
+    results = []
+    for implementation in implementations:
+        seconds = [measure_import_time(implementation) for _ in range(repeat)]
+        results.append(_create_result("import", implementation, None, seconds))
+    for repos in repo_counts:
+        spec = RepositorySpec(precommit_repos=repos, hooks_per_repo=hooks_per_repo)
+        definition = yaml.safe_load(create_precommit_config(spec))
+        for implementation, models in implementations.items():
+            cases = create_cases(models, definition)
+            for case, function in cases.items():
+                timer = timeit.Timer(function)
+                number, _ = timer.autorange()
+                totals = timer.repeat(repeat=repeat, number=number)
+                seconds = [total / number for total in totals]
+                results.append(_create_result(case, implementation, repos, seconds))
+    return results
+
+
+def _create_result(
+    case: str, implementation: str, repos: Optional[int], seconds: List[float]
+) -> Dict[str, Any]:
+    result: Dict[str, Any] = {
+        "case": case,
+        "implementation": implementation,
+        "repos": repos,
+        "seconds": seconds,
+        **summarize(seconds),
+    }
+    print(
+        f"{case:<9} {implementation:<9} repos {repos or '-':>5}  median"
+        f" {1e6 * result['median']:10.1f} µs",
+        flush=True,
+    )
+    return result
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(__doc__)
+    parser.add_argument(
+        "--repos",
+        default=[10, 100],
+        help="Numbers of repos in the generated pre-commit config.",
+        nargs="+",
+        type=int,
+    )
+    parser.add_argument(
+        "--repeat", default=5, help="Number of timings per case.", type=int
+    )
+    parser.add_argument(
+        "--output",
+        default="benchmark-models.json",
+        help="JSON file to which the results are written.",
+    )
+    args = parser.parse_args(argv)
+    if importlib.util.find_spec("pydantic") is None:
+        print("This benchmark requires pydantic", file=sys.stderr)
+        return 1
+    results = run_benchmarks(args.repos, args.repeat)
+    write_results(args.output, "models", results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""Replay the hooks on the recent history of a real repository.
+
+.. code-block:: shell
+
+    python -m benchmarks.replay ../ampform --commits 50 --output ampform.json
+
+The last commits of the repository are checked out one by one in a temporary
+`git worktree <https://git-scm.com/docs/git-worktree>`_, so that the working tree
+of the repository itself is left alone. For each commit, each hook is run the way
+pre-commit would run it if that commit was being made: on the files that the
+commit added or modified, as far as they match the :code:`files`,
+:code:`exclude`, and :code:`types` of the hook, and with the :code:`args` from the
+:file:`.pre-commit-config.yaml` of the commit. Hooks that match none of the files
+are skipped, unless they are :code:`always_run`.
+
+After each run, the files that the hook modified are recorded and the worktree
+is reset. The results contain the timings of each run and, per hook, latency
+percentiles over all commits, the peak memory, and the number of touched files.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import attr
+import yaml
+
+from benchmarks.common import (
+    HOOKS,
+    REPOMA_ROOT,
+    percentile,
+    run_hook,
+    summarize,
+    write_results,
+)
+
+_TYPE_SUFFIXES = {
+    "jupyter": (".ipynb",),
+    "json": (".json", ".ipynb"),
+    "python": (".py", ".pyi"),
+    "toml": (".toml",),
+    "yaml": (".yaml", ".yml"),
+}
+"""File extensions for the :code:`types` of pre-commit hooks that are used here."""
+
+
+@attr.s(frozen=True)
+class HookDefinition:
+    """How pre-commit selects the files for a hook and which arguments it passes."""
+
+    id: str = attr.ib()  # noqa: A003
+    args: Tuple[str, ...] = attr.ib(default=(), converter=tuple)
+    files: str = attr.ib(default="")
+    exclude: str = attr.ib(default="^$")
+    types: Tuple[str, ...] = attr.ib(default=(), converter=tuple)
+    always_run: bool = attr.ib(default=False)
+    pass_filenames: bool = attr.ib(default=True)
+
+    def select(
+        self, filenames: Iterable[str], files: str = "", exclude: str = "^$"
+    ) -> List[str]:
+        """Select the files that pre-commit would pass to this hook.
+
+        >>> hook = HookDefinition("format-setup-cfg", files="^setup.cfg$")
+        >>> hook.select(["setup.cfg", "docs/setup.cfg", "tox.ini"])
+        ['setup.cfg']
+        >>> hook = HookDefinition("set-nb-cells", exclude="^docs/adr/", types=["jupyter"])
+        >>> hook.select(["docs/index.ipynb", "docs/adr/001.ipynb", "docs/conf.py"])
+        ['docs/index.ipynb']
+        """
+        selected = []
+        for filename in filenames:
+            if not re.search(files, filename) or re.search(exclude, filename):
+                continue
+            if not re.search(self.files, filename) or re.search(self.exclude, filename):
+                continue
+            if not all(_has_type(filename, tag) for tag in self.types):
+                continue
+            selected.append(filename)
+        return selected
+
+
+def _has_type(filename: str, tag: str) -> bool:
+    if tag in {"file", "text"}:
+        return True
+    return filename.endswith(_TYPE_SUFFIXES.get(tag, ()))
+
+
+def load_hook_definitions() -> Dict[str, HookDefinition]:
+    """Load the hooks as they are defined by this repository."""
+    with open(REPOMA_ROOT / ".pre-commit-hooks.yaml") as stream:
+        definitions = yaml.safe_load(stream)
+    return {
+        definition["id"]: _create_hook_definition(definition)
+        for definition in definitions
+    }
+
+
+def load_configured_hooks(
+    path: Path, definitions: Dict[str, HookDefinition]
+) -> Tuple[Dict[str, HookDefinition], str, str]:
+    """Override the hook definitions with the :file:`.pre-commit-config.yaml` of a commit.
+
+    Returns the hooks and the top-level :code:`files` and :code:`exclude` patterns.
+    """
+    if not path.exists():
+        return definitions, "", "^$"
+    with open(path) as stream:
+        config = yaml.safe_load(stream) or {}
+    hooks = dict(definitions)
+    for repo in config.get("repos", []):
+        for hook in repo.get("hooks", []):
+            definition = hooks.get(hook.get("id"))
+            if definition is None:
+                continue
+            overrides = attr.asdict(definition)
+            overrides.update(hook)
+            hooks[definition.id] = _create_hook_definition(overrides)
+    return hooks, config.get("files", ""), config.get("exclude", "^$")
+
+
+def _create_hook_definition(definition: Dict[str, Any]) -> HookDefinition:
+    field_names = {field.name for field in attr.fields(HookDefinition)}
+    return HookDefinition(**{k: v for k, v in definition.items() if k in field_names})
+
+
+def get_commits(repository: Path, max_count: int, revision: str = "HEAD") -> List[str]:
+    """Get the last commits on the first-parent history, oldest first."""
+    output = _git(
+        repository, "rev-list", "--first-parent", f"--max-count={max_count}", revision
+    )
+    return output.split()[::-1]
+
+
+def get_changed_files(repository: Path, commit: str) -> List[str]:
+    """Get the files that a commit added or modified, relative to its first parent."""
+    parents = _git(repository, "rev-list", "--parents", "-n1", commit).split()[1:]
+    if parents:
+        output = _git(
+            repository,
+            "diff",
+            "--name-only",
+            "--diff-filter=d",
+            "--no-renames",
+            "-z",
+            parents[0],
+            commit,
+        )
+    else:
+        output = _git(repository, "ls-tree", "-r", "--name-only", "-z", commit)
+    return [filename for filename in output.split("\0") if filename]
+
+
+def get_touched_files(worktree: Path) -> List[str]:
+    output = _git(worktree, "status", "--porcelain", "-z", "--untracked-files=all")
+    return sorted(entry[3:] for entry in output.split("\0") if len(entry) > 3)
+
+
+def replay(
+    repository: Path,
+    commits: int,
+    hooks: Sequence[str],
+    revision: str = "HEAD",
+) -> List[Dict[str, Any]]:
+    """Run the hooks on each of the last commits and collect one result per run."""
+    repository = repository.resolve()
+    definitions = load_hook_definitions()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="repoma-replay-") as directory:
+        worktree = Path(directory) / "worktree"
+        _git(repository, "worktree", "add", "--detach", "-q", str(worktree), revision)
+        try:
+            for commit in get_commits(repository, commits, revision):
+                _git(worktree, "checkout", "--detach", "-f", "-q", commit)
+                changed_files = get_changed_files(worktree, commit)
+                configured_hooks, files, exclude = load_configured_hooks(
+                    worktree / ".pre-commit-config.yaml", definitions
+                )
+                for hook in hooks:
+                    definition = configured_hooks[hook]
+                    filenames = definition.select(changed_files, files, exclude)
+                    result: Dict[str, Any] = {
+                        "commit": commit,
+                        "hook": hook,
+                        "files": len(filenames),
+                    }
+                    if not filenames and not definition.always_run:
+                        result["skipped"] = True
+                        results.append(result)
+                        continue
+                    args = list(definition.args)
+                    if definition.pass_filenames:
+                        args.extend(filenames)
+                    measurement = run_hook(hook, args, worktree)
+                    result.update(
+                        skipped=False,
+                        seconds=measurement.seconds,
+                        max_rss_kb=measurement.max_rss_kb,
+                        exit_code=measurement.exit_code,
+                        touched=get_touched_files(worktree),
+                    )
+                    results.append(result)
+                    _git(worktree, "reset", "--hard", "-q")
+                    _git(worktree, "clean", "-d", "--force", "-q")
+                print(
+                    f"{commit[:10]}  {len(changed_files):>5} changed files", flush=True
+                )
+        finally:
+            _git(repository, "worktree", "remove", "--force", str(worktree))
+    return results
+
+
+def summarize_hooks(results: Sequence[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Aggregate the runs of each hook over all commits.
+
+    >>> results = [
+    ...     {"hook": "set-nb-cells", "skipped": True},
+    ...     {"hook": "set-nb-cells", "skipped": False, "seconds": 0.2,
+    ...      "max_rss_kb": 3000, "exit_code": 1, "touched": ["a.ipynb"]},
+    ...     {"hook": "set-nb-cells", "skipped": False, "seconds": 0.4,
+    ...      "max_rss_kb": 2000, "exit_code": 0, "touched": []},
+    ... ]
+    >>> summary = summarize_hooks(results)["set-nb-cells"]
+    >>> summary["runs"], summary["skipped"], summary["failed"], summary["median"]
+    (2, 1, 1, 0.3)
+    >>> summary["max_rss_kb"], summary["files_touched"]
+    (3000, 1)
+    """
+    summaries = {}
+    for hook in sorted({r["hook"] for r in results}):
+        hook_results = [r for r in results if r["hook"] == hook]
+        runs = [r for r in hook_results if not r["skipped"]]
+        summary: Dict[str, Any] = {
+            "runs": len(runs),
+            "skipped": len(hook_results) - len(runs),
+        }
+        if runs:
+            seconds = [r["seconds"] for r in runs]
+            summary.update(summarize(seconds))
+            summary["p99"] = percentile(seconds, 99)
+            summary["max_rss_kb"] = max(r["max_rss_kb"] for r in runs)
+            summary["failed"] = sum(1 for r in runs if r["exit_code"] != 0)
+            summary["files_touched"] = sum(len(r["touched"]) for r in runs)
+        summaries[hook] = summary
+    return summaries
+
+
+def _format_summary(hook: str, summary: Dict[str, Any]) -> str:
+    if not summary["runs"]:
+        return f"{hook:<22} skipped on all {summary['skipped']} commits"
+    return (
+        f"{hook:<22} {summary['runs']:>4} runs  median"
+        f" {1e3 * summary['median']:8.1f} ms  p90 {1e3 * summary['p90']:8.1f} ms"
+        f"  max RSS {summary['max_rss_kb'] / 1024:6.1f} MB"
+        f"  {summary['files_touched']:>4} files touched"
+    )
+
+
+def _git(cwd: Path, *args: str) -> str:
+    return subprocess.check_output(["git", *args], cwd=cwd, universal_newlines=True)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(__doc__)
+    parser.add_argument("repository", help="Path to a local git repository.")
+    parser.add_argument(
+        "--commits", default=20, help="Number of commits to replay.", type=int
+    )
+    parser.add_argument(
+        "--revision", default="HEAD", help="Revision of which to replay the history."
+    )
+    parser.add_argument(
+        "--hooks",
+        choices=sorted(HOOKS),
+        default=sorted(HOOKS),
+        help="Hooks to replay. Defaults to all hooks.",
+        nargs="+",
+    )
+    parser.add_argument(
+        "--output",
+        default="benchmark-replay.json",
+        help="JSON file to which the results are written.",
+    )
+    args = parser.parse_args(argv)
+    repository = Path(args.repository)
+    results = replay(repository, args.commits, args.hooks, args.revision)
+    summaries = summarize_hooks(results)
+    for hook, summary in summaries.items():
+        print(_format_summary(hook, summary))
+    write_results(
+        args.output,
+        "replay",
+        results,
+        repository=str(repository.resolve()),
+        revision=args.revision,
+        hooks=summaries,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
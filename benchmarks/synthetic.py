@@ -0,0 +1,328 @@
+r"""Time the hooks on generated ComPWA-style repositories of increasing size.
+
+.. code-block:: shell
+
+    python -m benchmarks.synthetic --sizes 1 2 4 8 --repeat 3
+    python -m benchmarks.synthetic --sizes 1 10 100 --dimension notebooks
+
+A `RepositorySpec` describes how large a generated repository is. Each size is a
+factor by which the dimensions of the base spec are multiplied: all of them, or
+only the one that is given with :code:`--dimension`. Every run of a hook starts
+from a fresh copy of the generated repository, because the hooks modify it.
+
+The results are written as JSON, including the exponent :math:`k` of a fit
+:math:`t \propto n^k` per hook, so that super-linear scaling stands out.
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from textwrap import dedent
+from typing import Any, Dict, List, Optional, Sequence
+
+import attr
+
+from benchmarks.common import (
+    HOOKS,
+    estimate_exponent,
+    run_hook,
+    summarize,
+    write_results,
+)
+
+
+@attr.s(frozen=True)
+class RepositorySpec:
+    """Dimensions of a generated repository."""
+
+    notebooks: int = attr.ib(default=4)
+    cells: int = attr.ib(default=10)
+    """Number of cells per notebook, half of which are code cells."""
+    output_size: int = attr.ib(default=1000)
+    """Number of characters in the output of each code cell."""
+    cspell_words: int = attr.ib(default=50)
+    precommit_repos: int = attr.ib(default=5)
+    hooks_per_repo: int = attr.ib(default=2)
+    extras: int = attr.ib(default=3)
+    """Number of optional dependency sections in :file:`setup.cfg`."""
+
+    def scale(self, factor: int, dimension: Optional[str] = None) -> "RepositorySpec":
+        """Multiply all dimensions, or only one, by a factor.
+
+        >>> RepositorySpec().scale(2, "notebooks").notebooks
+        8
+        """
+        if dimension is None:
+            return RepositorySpec(*(factor * v for v in attr.astuple(self)))
+        return attr.evolve(self, **{dimension: factor * getattr(self, dimension)})
+
+
+def generate(spec: RepositorySpec, path: Path) -> Path:
+    """Create a repository with these dimensions and stage it in git."""
+    path.mkdir(parents=True)
+    (path / "README.md").write_text("# Synthetic repository\n")
+    (path / "pyproject.toml").write_text("[tool.black]\nline-length = 88\n")
+    (path / "tox.ini").write_text("[tox]\nenvlist =\n    py,\n")
+    (path / "setup.cfg").write_text(_create_setup_cfg(spec))
+    (path / ".cspell.json").write_text(_create_cspell_config(spec))
+    (path / ".pre-commit-config.yaml").write_text(create_precommit_config(spec))
+    (path / "docs").mkdir()
+    for notebook_path in get_notebooks(spec):
+        notebook = _create_notebook(spec, package=f"package{notebook_path.stem}")
+        (path / notebook_path).write_text(json.dumps(notebook, indent=1) + "\n")
+    try:
+        subprocess.run(["git", "init", "-q"], cwd=path, check=True)
+        subprocess.run(["git", "add", "."], cwd=path, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        pass  # FileIndex falls back to walking the directory
+    return path
+
+
+def get_notebooks(spec: RepositorySpec) -> List[Path]:
+    return [Path("docs") / f"notebook{i:04d}.ipynb" for i in range(spec.notebooks)]
+
+
+def get_hook_args(hook: str, spec: RepositorySpec) -> List[str]:
+    notebooks = [str(path) for path in get_notebooks(spec)]
+    if hook == "check-dev-files":
+        return ["--no-cache"]
+    if hook == "format-setup-cfg":
+        return ["setup.cfg"]
+    if hook == "set-nb-cells":
+        return ["--add-install-cell", *notebooks]
+    return notebooks
+
+
+def _create_setup_cfg(spec: RepositorySpec) -> str:
+    extras = []
+    for i in range(spec.extras):
+        packages = "".join(f"\n    package{i}-{j} >=1.{j}" for j in range(3))
+        extras.append(f"extra{i} ={packages}")
+    dev = "".join(f"\n    %(extra{i})s" for i in range(spec.extras))
+    return (
+        dedent(
+            """
+        [metadata]
+        name = synthetic
+        description = Synthetic repository for benchmarks
+        author = Common Partial Wave Analysis
+        author_email = compwa-admin@ep1.rub.de
+        license = Apache License, Version 2.0
+        classifiers =
+            Programming Language :: Python :: 3.7
+            Programming Language :: Python :: 3.8
+        [options]
+        python_requires = >=3.7
+        install_requires =
+            attrs>=20.1.0
+        packages = find:
+        [options.extras_require]
+        """
+        ).lstrip()
+        + "\n".join([*extras, f"dev ={dev}"])
+        + "\n"
+    )
+
+
+def _create_cspell_config(spec: RepositorySpec) -> str:
+    words = [f"word{i:06d}" for i in range(spec.cspell_words)]
+    config = {
+        "version": "0.2",
+        "language": "en-US",
+        "ignorePaths": ["**/.cspell.json", "docs/*.ipynb"],
+        "words": words[::-1],  # unsorted, so that the hook has something to fix
+    }
+    return json.dumps(config, indent=4) + "\n"
+
+
+def create_precommit_config(spec: RepositorySpec) -> str:
+    lines = [
+        "repos:",
+        "  - repo: https://github.com/ComPWA/repo-maintenance",
+        "    rev: 0.0.132",
+        "    hooks:",
+        "      - id: check-dev-files",
+    ]
+    for i in range(spec.precommit_repos):
+        lines.append(f"  - repo: https://github.com/synthetic/hooks-{i}")
+        lines.append("    rev: v1.0.0")
+        lines.append("    hooks:")
+        for j in range(spec.hooks_per_repo):
+            lines.append(f"      - id: hook-{i}-{j}")
+            lines.append(f"        args: [--option={j}]")
+    return "\n".join(lines) + "\n"
+
+
+def _create_notebook(spec: RepositorySpec, package: str) -> Dict[str, Any]:
+    cells: List[Dict[str, Any]] = [
+        {
+            "cell_type": "code",
+            "execution_count": None,
+            "id": "install",
+            "metadata": {"tags": ["remove-cell"]},
+            "outputs": [],
+            "source": f"%pip install -q {package}==0.1.0 numpy==1.22.0",
+        }
+    ]
+    for i in range(1, spec.cells):
+        if i % 2:
+            cells.append(
+                {
+                    "cell_type": "markdown",
+                    "id": f"markdown-{i}",
+                    "metadata": {},
+                    "source": f"## Section {i}\n\nSome explanation of step {i}.",
+                }
+            )
+            continue
+        output = {
+            "name": "stdout",
+            "output_type": "stream",
+            "text": ("x" * 79 + "\n") * (spec.output_size // 80)
+            + "x" * (spec.output_size % 80),
+        }
+        cells.append(
+            {
+                "cell_type": "code",
+                "execution_count": i,
+                "id": f"code-{i}",
+                "metadata": {},
+                "outputs": [output],
+                "source": f"result_{i} = compute({i})\nprint(result_{i})",
+            }
+        )
+    return {
+        "cells": cells,
+        "metadata": {
+            "kernelspec": {
+                "display_name": "Python 3",
+                "language": "python",
+                "name": "python3",
+            },
+            "language_info": {"name": "python"},
+        },
+        "nbformat": 4,
+        "nbformat_minor": 5,
+    }
+
+
+def run_benchmarks(
+    sizes: Sequence[int],
+    hooks: Sequence[str],
+    repeat: int = 3,
+    base: Optional[RepositorySpec] = None,
+    dimension: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Time each hook at each size and collect the results per hook and size."""
+    if base is None:
+        base = RepositorySpec()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="repoma-benchmark-") as directory:
+        for size in sizes:
+            spec = base.scale(size, dimension)
+            template = generate(spec, Path(directory) / f"size-{size}")
+            for hook in hooks:
+                measurements = []
+                for _ in range(repeat):
+                    work_dir = Path(directory) / "run"
+                    shutil.rmtree(work_dir, ignore_errors=True)
+                    shutil.copytree(template, work_dir, symlinks=True)
+                    args = get_hook_args(hook, spec)
+                    measurements.append(run_hook(hook, args, work_dir))
+                seconds = [m.seconds for m in measurements]
+                result = {
+                    "hook": hook,
+                    "size": size,
+                    "spec": attr.asdict(spec),
+                    "seconds": seconds,
+                    **summarize(seconds),
+                    "max_rss_kb": max(m.max_rss_kb for m in measurements),
+                    "exit_codes": sorted({m.exit_code for m in measurements}),
+                }
+                print(_format_result(result), flush=True)
+                results.append(result)
+    return results
+
+
+def get_exponents(results: Sequence[Dict[str, Any]]) -> Dict[str, float]:
+    """Estimate how the median time of each hook scales with the size.
+
+    >>> results = [
+    ...     {"hook": "set-nb-cells", "size": 1, "median": 0.5},
+    ...     {"hook": "set-nb-cells", "size": 4, "median": 2.0},
+    ... ]
+    >>> get_exponents(results)
+    {'set-nb-cells': 1.0}
+    """
+    exponents = {}
+    for hook in sorted({r["hook"] for r in results}):
+        hook_results = [r for r in results if r["hook"] == hook]
+        if len(hook_results) < 2:
+            continue
+        exponent = estimate_exponent(
+            [r["size"] for r in hook_results], [r["median"] for r in hook_results]
+        )
+        exponents[hook] = round(exponent, 3)
+    return exponents
+
+
+def _format_result(result: Dict[str, Any]) -> str:
+    return (
+        f"{result['hook']:<22} size {result['size']:>4}  median"
+        f" {1e3 * result['median']:8.1f} ms  max RSS"
+        f" {result['max_rss_kb'] / 1024:6.1f} MB"
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(__doc__)
+    parser.add_argument(
+        "--sizes",
+        default=[1, 2, 4, 8],
+        help="Factors by which the repository is scaled.",
+        nargs="+",
+        type=int,
+    )
+    parser.add_argument(
+        "--dimension",
+        choices=[f.name for f in attr.fields(RepositorySpec)],
+        default=None,
+        help="Only scale this dimension instead of all of them.",
+    )
+    parser.add_argument(
+        "--hooks",
+        choices=sorted(HOOKS),
+        default=sorted(HOOKS),
+        help="Hooks to time. Defaults to all hooks.",
+        nargs="+",
+    )
+    parser.add_argument(
+        "--repeat", default=3, help="Number of runs per hook and size.", type=int
+    )
+    parser.add_argument(
+        "--output",
+        default="benchmark-synthetic.json",
+        help="JSON file to which the results are written.",
+    )
+    args = parser.parse_args(argv)
+    results = run_benchmarks(args.sizes, args.hooks, args.repeat, None, args.dimension)
+    exponents = get_exponents(results)
+    for hook, exponent in exponents.items():
+        print(f"{hook:<22} scales as n^{exponent}")
+    write_results(
+        args.output,
+        "synthetic",
+        results,
+        base=attr.asdict(RepositorySpec()),
+        dimension=args.dimension,
+        exponents=exponents,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
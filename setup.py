@@ -1,8 +1,26 @@
 # noqa
 
+import os
+import sys
+
 from setuptools import setup
+from setuptools.command.build_py import build_py
+
+
+class BuildWithTemplateBundle(build_py):
+    """Pack the templates into a single resource, see `repoma.utilities.templates`."""
+
+    def run(self) -> None:
+        super().run()
+        sys.path.insert(0, os.path.abspath("src"))
+        from repoma.utilities.templates import write_bundle
+
+        package_dir = os.path.join(self.build_lib, "repoma")
+        write_bundle(output_dir=package_dir, package_dir=package_dir)
+
 
 setup(
+    cmdclass={"build_py": BuildWithTemplateBundle},
     use_scm_version=True,
     setup_requires=["setuptools_scm"],
 )
@@ -3,3 +3,26 @@
 This package contains `pre-commit <https://pre-commit.com>` hooks that the
 `ComPWA repositories <https://github.com/ComPWA>` have in common.
 """
+
+from typing import TYPE_CHECKING, Callable, Optional, Union
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from repoma.api import Options, Report
+    from repoma.utilities.findings import Finding
+
+
+def check(
+    repo_root: Union["Path", str] = ".",
+    options: Optional["Options"] = None,
+    on_finding: Optional[Callable[["Finding"], None]] = None,
+) -> "Report":
+    """Run the checks of :code:`check-dev-files` on a repository.
+
+    See :func:`repoma.api.check`. The API is only imported when it is used, so
+    that the hooks start quickly.
+    """
+    from repoma.api import check as _check  # pylint: disable=import-outside-toplevel
+
+    return _check(repo_root, options, on_finding)
@@ -0,0 +1,213 @@
+"""Run the checks of :code:`check-dev-files` from Python.
+
+>>> import repoma
+>>> from repoma.api import Options
+>>> report = repoma.check("path/to/repo", Options(select=["cspell"]))  # doctest: +SKIP
+
+`check` resolves all paths against the given repository root instead of the
+current working directory. Several repositories can therefore be checked at the
+same time from different threads of one process. Problems are returned in a
+`Report` instead of being printed.
+"""
+
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
+
+import attr
+
+from repoma.errors import PrecommitError
+from repoma.utilities.cache import CACHE_DIR, ResultCache
+from repoma.utilities.executor import Executor, TimedOut, merge_messages
+from repoma.utilities.findings import Finding
+from repoma.utilities.registry import CheckRegistry
+from repoma.utilities.snapshot import RepositorySnapshot, get_active_snapshot
+
+
+def _to_list(names: Iterable[str]) -> List[str]:
+    return list(names)
+
+
+def _to_optional_list(names: Optional[Iterable[str]]) -> Optional[List[str]]:
+    return None if names is None else list(names)
+
+
+def _to_dict(timeouts: Mapping[str, float]) -> Dict[str, float]:
+    return dict(timeouts)
+
+
+@attr.s(frozen=True)
+class Options:
+    """Options of a run of the checks, like those of :code:`check-dev-files`."""
+
+    select: Optional[List[str]] = attr.ib(default=None, converter=_to_optional_list)
+    """Only run these checks. All checks run if this is `None`."""
+    skip: List[str] = attr.ib(factory=list, converter=_to_list)
+    no_python: bool = attr.ib(default=False)
+    """Skip the checks that only concern Python packages."""
+    ignore_author: bool = attr.ib(default=False)
+    no_prettierrc: bool = attr.ib(default=False)
+    pin_requirements: str = attr.ib(default="no")
+    """Frequency of the cron job that updates constraint files, or :code:`"no"`."""
+    jobs: int = attr.ib(default=1)
+    timeout: Optional[float] = attr.ib(default=None)
+    timeouts: Dict[str, float] = attr.ib(factory=dict, converter=_to_dict)
+    fix_until_stable: bool = attr.ib(default=False)
+    max_iterations: int = attr.ib(default=10)
+    use_cache: bool = attr.ib(default=True)
+    """Reuse results of a previous run, stored under :file:`.cache/repoma`."""
+    write: bool = attr.ib(default=True)
+    """Write fixes to the repository. Otherwise, they are only reported."""
+    read_staged: bool = attr.ib(default=False)
+    """Check the content that has been staged in git, see `.RepositorySnapshot`."""
+
+
+@attr.s(frozen=True)
+class CheckResult:
+    """Outcome of one check."""
+
+    name: str = attr.ib()
+    error_message: Optional[str] = attr.ib(default=None)
+    timed_out: bool = attr.ib(default=False)
+
+    @property
+    def passed(self) -> bool:
+        return self.error_message is None and not self.timed_out
+
+
+@attr.s(frozen=True)
+class Report:
+    """Outcome of a run of the checks on one repository."""
+
+    root: str = attr.ib()
+    results: List[CheckResult] = attr.ib(factory=list)
+    """Results of the checks that ran, in the order in which they were scheduled."""
+    error_messages: List[str] = attr.ib(factory=list)
+    timed_out: List[TimedOut] = attr.ib(factory=list)
+    modified_files: List[str] = attr.ib(factory=list)
+    """Files that were fixed, relative to :attr:`root`."""
+    diff: str = attr.ib(default="")
+    """Fixes that have not been written, as a unified diff relative to :attr:`root`."""
+
+    @property
+    def passed(self) -> bool:
+        return all(result.passed for result in self.results)
+
+    def merge_messages(self) -> str:
+        """Merge all error messages, like :code:`check-dev-files` prints them."""
+        return merge_messages(self.error_messages)
+
+
+def check(
+    repo_root: Union[Path, str] = ".",
+    options: Optional[Options] = None,
+    on_finding: Optional[Callable[[Finding], None]] = None,
+) -> Report:
+    """Run the checks of :code:`check-dev-files` on a repository.
+
+    If :code:`on_finding` is given, it is called with a `.Finding` for each
+    problem and each fixed file, as soon as the check has finished.
+
+    With :attr:`Options.read_staged`, fixes to files that also have unstaged edits
+    are not written. They are added to the error messages of the `Report` as a
+    diff instead.
+
+    Raises:
+        ValueError: If the options refer to checks that do not exist.
+    """
+    # pylint: disable=import-outside-toplevel
+    from repoma.check_dev_files import create_registry
+
+    if options is None:
+        options = Options()
+    registry = create_registry()
+    check_names = select_checks(registry, options)
+    snapshot = RepositorySnapshot(root=repo_root, read_staged=options.read_staged)
+    cache = None
+    if options.use_cache:
+        cache = ResultCache(Path(snapshot.root) / CACHE_DIR / "check-dev-files.json")
+    with snapshot.activate():
+        report = run_checks(registry, check_names, options, cache, None, on_finding)
+    if not options.write:
+        return attr.evolve(report, diff=snapshot.diff())
+    try:
+        snapshot.commit()
+    except PrecommitError as exception:
+        error_messages = [*report.error_messages, str(exception)]
+        report = attr.evolve(report, error_messages=error_messages)
+    if cache is not None:
+        cache.save()
+    return report
+
+
+def select_checks(registry: CheckRegistry, options: Options) -> List[str]:
+    """Get the names of the checks that should run with these options.
+
+    Raises:
+        ValueError: If the options refer to checks that do not exist.
+    """
+    skip = list(options.skip)
+    if options.pin_requirements == "no":
+        skip.append("update_pip_constraints")
+    unknown_checks = sorted(name for name in options.timeouts if name not in registry)
+    if unknown_checks:
+        raise ValueError(
+            f"Timeouts given for unknown checks: {', '.join(unknown_checks)}."
+            f" Available checks are: {', '.join(registry.names)}"
+        )
+    return registry.select(options.select, skip)
+
+
+def run_checks(
+    registry: CheckRegistry,
+    check_names: Sequence[str],
+    options: Options,
+    cache: Optional[ResultCache] = None,
+    changed_files: Optional[List[str]] = None,
+    on_finding: Optional[Callable[[Finding], None]] = None,
+) -> Report:
+    """Run checks on the repository of the active `.RepositorySnapshot`.
+
+    Fixes are staged in that snapshot, but not committed. If
+    :code:`changed_files` are given, only the checks that read or write those
+    files are run. See `check` for :code:`on_finding`.
+    """
+    snapshot = get_active_snapshot()
+    if snapshot is None:
+        raise RuntimeError("Checks can only run with an active RepositorySnapshot")
+    executor = Executor(
+        options.jobs, cache, options.timeout, options.timeouts, on_finding
+    )
+    check_options = attr.asdict(options)
+    for name in check_names:
+        check = registry.get(name)
+        if check.python_only and options.no_python:
+            continue
+        if changed_files is None or check.depends_on(changed_files):
+            executor.schedule(check, **check.get_arguments(check_options))
+    if options.fix_until_stable:
+        executor.execute_until_stable(options.max_iterations)
+    else:
+        executor.execute()
+    return Report(
+        root=snapshot.root,
+        results=[_to_check_result(n, r) for n, r in executor.results.items()],
+        error_messages=list(executor.error_messages),
+        timed_out=list(executor.timed_out),
+        modified_files=[snapshot.relative_path(path) for path in snapshot.changes()],
+    )
+
+
+def _to_check_result(name: str, result: Any) -> CheckResult:
+    if isinstance(result, TimedOut):
+        return CheckResult(name, timed_out=True)
+    return CheckResult(name, error_message=result)
@@ -1,31 +1,291 @@
 """A collection of scripts that check the file structure of a repository."""
 
 import argparse
+import os
 import sys
-from typing import Optional, Sequence
-
-from repoma.utilities.executor import Executor
-
-from . import (
-    black,
-    cspell,
-    editor_config,
-    flake8,
-    github_labels,
-    github_templates,
-    github_workflows,
-    gitpod,
-    nbstripout,
-    prettier,
-    pyupgrade,
-    setup_cfg,
-    tox,
-    update_pip_constraints,
+import time
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from repoma.api import Options, run_checks, select_checks
+from repoma.utilities import CONFIG_PATH
+from repoma.utilities.cache import CACHE_DIR, ResultCache
+from repoma.utilities.cli import (
+    add_diff_arguments,
+    add_format_argument,
+    add_memory_profile_argument,
+    add_staged_argument,
+    add_trace_argument,
+    commit_or_diff,
+    is_diff_mode,
+    profile_memory,
+    trace_to_file,
+    write_findings,
 )
+from repoma.utilities.findings import FindingWriter
+from repoma.utilities.registry import Check, CheckRegistry
+from repoma.utilities.snapshot import RepositorySnapshot
+
+__PRECOMMIT = CONFIG_PATH.precommit
+__README = CONFIG_PATH.readme
+__VSCODE_EXTENSIONS = CONFIG_PATH.vscode_extensions
+__WORKFLOWS = CONFIG_PATH.github_workflow_dir
+
+_CHECKS = [
+    Check(
+        "cspell",
+        "repoma.check_dev_files.cspell:main",
+        reads=[__PRECOMMIT],
+        writes=[
+            "cspell.json",
+            CONFIG_PATH.cspell,
+            CONFIG_PATH.editor_config,
+            CONFIG_PATH.prettier_ignore,
+            __PRECOMMIT,
+            __README,
+            __VSCODE_EXTENSIONS,
+        ],
+    ),
+    Check(
+        "editor_config",
+        "repoma.check_dev_files.editor_config:main",
+        reads=[CONFIG_PATH.editor_config, __PRECOMMIT],
+    ),
+    Check(
+        "github_labels",
+        "repoma.check_dev_files.github_labels:main",
+        writes=[
+            "labels.toml",
+            "**/requirements*.in",
+            "**/requirements*.txt",
+            CONFIG_PATH.setup_cfg,
+        ],
+    ),
+    Check(
+        "github_templates",
+        "repoma.check_dev_files.github_templates:main",
+        writes=[".github/ISSUE_TEMPLATE/**", ".github/pull_request_template.md"],
+    ),
+    Check(
+        "github_workflows",
+        "repoma.check_dev_files.github_workflows:main",
+        reads=[CONFIG_PATH.pip_constraints],
+        writes=[__WORKFLOWS / "milestone.yml"],
+    ),
+    Check(
+        "docs_workflows",
+        "repoma.check_dev_files.github_workflows:check_docs_workflow",
+        reads=["doc", "docs", CONFIG_PATH.pip_constraints],
+        writes=[__WORKFLOWS / "ci-docs.yml", __WORKFLOWS / "linkcheck.yml"],
+    ),
+    Check(
+        "gitpod",
+        "repoma.check_dev_files.gitpod:main",
+        reads=[
+            CONFIG_PATH.pip_constraints,
+            CONFIG_PATH.setup_cfg,
+            __VSCODE_EXTENSIONS,
+        ],
+        writes=[CONFIG_PATH.gitpod, __README],
+    ),
+    Check("nbstripout", "repoma.check_dev_files.nbstripout:main", writes=[__PRECOMMIT]),
+    Check(
+        "prettier",
+        "repoma.check_dev_files.prettier:main",
+        reads=[__PRECOMMIT],
+        writes=[
+            CONFIG_PATH.prettier,
+            ".prettierrc.*",
+            __README,
+            __VSCODE_EXTENSIONS,
+        ],
+        options=["no_prettierrc"],
+    ),
+    Check(
+        "black",
+        "repoma.check_dev_files.black:main",
+        reads=[CONFIG_PATH.pyproject, CONFIG_PATH.setup_cfg],
+        writes=[__PRECOMMIT],
+        python_only=True,
+    ),
+    Check(
+        "flake8",
+        "repoma.check_dev_files.flake8:main",
+        writes=[CONFIG_PATH.flake8, CONFIG_PATH.setup_cfg, CONFIG_PATH.tox],
+        python_only=True,
+    ),
+    Check(
+        "continuous_deployment",
+        "repoma.check_dev_files.github_workflows:create_continuous_deployment",
+        reads=[CONFIG_PATH.pip_constraints],
+        writes=[__WORKFLOWS / "cd.yml"],
+        python_only=True,
+    ),
+    Check(
+        "update_pip_constraints",
+        "repoma.check_dev_files.update_pip_constraints:main",
+        reads=[CONFIG_PATH.setup_cfg],
+        writes=[
+            CONFIG_PATH.pip_constraints,
+            __WORKFLOWS / "requirements-cron.yml",
+            __WORKFLOWS / "requirements-pr.yml",
+        ],
+        options=["pin_requirements"],
+        python_only=True,
+    ),
+    Check(
+        "pyupgrade",
+        "repoma.check_dev_files.pyupgrade:main",
+        reads=[CONFIG_PATH.setup_cfg],
+        writes=[__PRECOMMIT],
+        python_only=True,
+    ),
+    Check(
+        "setup_cfg",
+        "repoma.check_dev_files.setup_cfg:main",
+        reads=[__README],
+        writes=[CONFIG_PATH.setup_cfg],
+        options=["ignore_author"],
+        python_only=True,
+    ),
+    Check(
+        "tox",
+        "repoma.check_dev_files.tox:main",
+        writes=[
+            CONFIG_PATH.flake8,
+            CONFIG_PATH.pydocstyle,
+            CONFIG_PATH.pytest,
+            CONFIG_PATH.tox,
+        ],
+        python_only=True,
+    ),
+]
 
 
 def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = create_argument_parser()
+    args = parser.parse_args(argv)
+    if args.watch and (is_diff_mode(args) or args.staged):
+        parser.error("--watch cannot be combined with --diff or --staged")
+    options = create_options(args)
+    registry = create_registry()
+    try:
+        check_names = select_checks(registry, options)
+    except ValueError as exception:
+        parser.error(str(exception))
+    with trace_to_file(args.trace, "check-dev-files"), profile_memory(
+        args.memory_profile
+    ), write_findings(args.format) as writer:
+        cache = ResultCache() if options.use_cache else None
+        changed_files = None if args.all_files else _get_changed_files(args.filenames)
+        snapshot = RepositorySnapshot(read_staged=options.read_staged)
+        snapshot.preload(CONFIG_PATH)
+        run = partial(
+            _run, registry, check_names, options, args, snapshot, cache, writer
+        )
+        exit_code = run(changed_files)
+        if args.watch:
+            is_read = partial(_is_read_by_checks, registry, check_names)
+            return _watch(run, snapshot, exit_code, is_read)
+        return exit_code
+
+
+def _run(  # pylint: disable=too-many-arguments
+    registry: CheckRegistry,
+    check_names: List[str],
+    options: Options,
+    args: argparse.Namespace,
+    snapshot: RepositorySnapshot,
+    cache: Optional[ResultCache],
+    writer: Optional[FindingWriter],
+    changed_files: Optional[List[str]],
+) -> int:
+    on_finding = None if writer is None else writer.write
+    with snapshot.activate():
+        report = run_checks(
+            registry, check_names, options, cache, changed_files, on_finding
+        )
+    if cache is not None and options.write:
+        cache.save()
+    if writer is None:
+        if report.error_messages:
+            print(report.merge_messages())
+        for timed_out in report.timed_out:
+            print(f"{timed_out}, so it has been skipped")
+    if cache is not None:
+        print(cache.summary(), file=sys.stdout if writer is None else sys.stderr)
+    exit_code = 1 if report.error_messages else 0
+    return commit_or_diff(snapshot, args, exit_code)
+
+
+def _watch(
+    run: Callable[[Optional[List[str]]], int],
+    snapshot: RepositorySnapshot,
+    exit_code: int,
+    is_read: Callable[[str], bool],
+) -> int:
+    """Run the checks that are affected by changed files, until interrupted.
+
+    Fixes that the checks write themselves do not trigger a new run, because the
+    snapshot already has their content. Changes to files that none of the checks
+    read, like source code, are ignored.
+    """
+    # pylint: disable=import-outside-toplevel
+    from repoma.utilities.watch import create_watcher
+
+    with create_watcher(snapshot.root) as watcher:
+        print(
+            f"Watching for changes with {watcher.name}, press Ctrl+C to stop",
+            file=sys.stderr,
+        )
+        try:
+            while True:
+                changed_files = watcher.wait()
+                if changed_files is None:
+                    snapshot.invalidate(".")
+                    print("\nFiles changed, running all checks", file=sys.stderr)
+                else:
+                    changed_files = [
+                        filename
+                        for filename in snapshot.refresh(changed_files)
+                        if is_read(filename)
+                    ]
+                    if not changed_files:
+                        continue
+                    print(f"\nChanged: {', '.join(changed_files)}", file=sys.stderr)
+                start = time.perf_counter()
+                exit_code = run(changed_files)
+                elapsed = time.perf_counter() - start
+                print(f"Finished in {1e3 * elapsed:.0f} ms", file=sys.stderr)
+        except KeyboardInterrupt:
+            return exit_code
+
+
+def _is_read_by_checks(
+    registry: CheckRegistry, check_names: List[str], filename: str
+) -> bool:
+    return any(registry.get(name).depends_on([filename]) for name in check_names)
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    """Create the parser for the command-line arguments of :code:`check-dev-files`."""
     parser = argparse.ArgumentParser(__doc__)
+    parser.add_argument(
+        "filenames",
+        nargs="*",
+        help=(
+            "Files that changed, for instance the files that are staged for a"
+            " commit. Only the checks that concern these files are run. All"
+            " checks are run if no files are given."
+        ),
+    )
+    parser.add_argument(
+        "--all-files",
+        default=False,
+        action="store_true",
+        help="Run all checks, regardless of which files are given.",
+    )
     parser.add_argument(
         "--ignore-author",
         default=False,
@@ -38,11 +298,30 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         action="store_true",
         help="Skip check that concern config files for Python projects.",
     )
+    parser.add_argument(
+        "--select",
+        action="append",
+        default=None,
+        help=(
+            "Only run these checks. Can be given multiple times. Checks that are"
+            " not selected are not even imported."
+        ),
+        metavar="CHECK[,CHECK...]",
+        type=_to_check_names,
+    )
+    parser.add_argument(
+        "--skip",
+        action="append",
+        default=[],
+        help="Do not run these checks. Can be given multiple times.",
+        metavar="CHECK[,CHECK...]",
+        type=_to_check_names,
+    )
     parser.add_argument(
         "--no-docs",
         default=False,
         action="store_true",
-        help="Do not replace the ci-docs and linkcheck workflows.",
+        help="Deprecated, use --skip=docs_workflows.",
     )
     parser.add_argument(
         "--no-prettierrc",
@@ -54,7 +333,7 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         "--allow-labels",
         default=False,
         action="store_true",
-        help="Do not perform the check on labels.toml",
+        help="Deprecated, use --skip=github_labels.",
     )
     parser.add_argument(
         "--pin-requirements",
@@ -66,35 +345,187 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         ),
         type=str,
     )
-    args = parser.parse_args(argv)
-    is_python_repo = not args.no_python
-
-    executor = Executor()
-    executor(cspell.main)
-    executor(editor_config.main)
-    if not args.allow_labels:
-        executor(github_labels.main)
-    executor(github_templates.main)
-    executor(github_workflows.main, args.no_docs)
-    executor(gitpod.main)
-    executor(nbstripout.main)
-    executor(prettier.main, args.no_prettierrc)
-    if is_python_repo:
-        executor(black.main)
-        executor(flake8.main)
-        executor(github_workflows.create_continuous_deployment)
-        if args.pin_requirements != "no":
-            executor(
-                update_pip_constraints.main,
-                cron_frequency=args.pin_requirements,
-            )
-        executor(pyupgrade.main)
-        executor(setup_cfg.main, args.ignore_author)
-        executor(tox.main)
-    if executor.error_messages:
-        print(executor.merge_messages())
-        return 1
-    return 0
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=1,
+        help=(
+            "Number of checks that may run in parallel. Checks that touch the"
+            " same files always run one after the other. Use 0 to run one check"
+            " per CPU."
+        ),
+        type=int,
+    )
+    parser.add_argument(
+        "--no-cache",
+        default=False,
+        action="store_true",
+        help=(
+            "Run all checks, even if their files did not change since the"
+            f" previous run. Results are cached under {CACHE_DIR}/."
+        ),
+    )
+    parser.add_argument(
+        "--fix-until-stable",
+        default=False,
+        action="store_true",
+        help=(
+            "Run the checks that are affected by a fix again, until no more files"
+            " change. The fixes of all runs are reported together."
+        ),
+    )
+    parser.add_argument(
+        "--max-iterations",
+        default=10,
+        help="Maximum number of times that checks run with --fix-until-stable.",
+        type=int,
+    )
+    parser.add_argument(
+        "--timeout",
+        action="append",
+        default=[],
+        help=(
+            "Time budget in seconds for each check, or for one check if given as"
+            " CHECK=SECONDS. Can be given multiple times. Checks that take longer"
+            " are interrupted and reported, but do not make the hook fail."
+            " Defaults can be set in the [tool.repoma] table of pyproject.toml"
+            " with timeout = SECONDS and a [tool.repoma.timeouts] table."
+        ),
+        metavar="[CHECK=]SECONDS",
+        type=_to_timeout,
+    )
+    add_diff_arguments(parser)
+    add_format_argument(parser)
+    add_memory_profile_argument(parser)
+    add_staged_argument(parser)
+    add_trace_argument(parser)
+    parser.add_argument(
+        "--watch",
+        default=False,
+        action="store_true",
+        help=(
+            "Keep running and run the checks again whenever files change. Only"
+            " the checks that concern the changed files are run."
+        ),
+    )
+    return parser
+
+
+def create_options(args: argparse.Namespace, repo_root: str = ".") -> Options:
+    """Convert parsed arguments to `.Options` for a repository."""
+    pyproject = os.path.join(repo_root, CONFIG_PATH.pyproject)
+    timeout, timeouts = _load_timeouts(args.timeout, pyproject)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    if args.memory_profile:
+        jobs = 1
+    return Options(
+        select=_flatten(args.select) if args.select is not None else None,
+        skip=_flatten(args.skip) + _get_deprecated_skips(args),
+        no_python=args.no_python,
+        ignore_author=args.ignore_author,
+        no_prettierrc=args.no_prettierrc,
+        pin_requirements=args.pin_requirements,
+        jobs=jobs,
+        timeout=timeout,
+        timeouts=timeouts,
+        fix_until_stable=args.fix_until_stable,
+        max_iterations=args.max_iterations,
+        use_cache=not args.no_cache,
+        write=not is_diff_mode(args),
+        read_staged=args.staged,
+    )
+
+
+def create_registry() -> CheckRegistry:
+    """Register the checks of repoma and those of installed plugins."""
+    registry = CheckRegistry()
+    for check in _CHECKS:
+        registry.register(check)
+    registry.load_entry_points()
+    return registry
+
+
+def _get_deprecated_skips(args: argparse.Namespace) -> List[str]:
+    skip = []
+    if args.allow_labels:
+        skip.append("github_labels")
+    if args.no_docs:
+        skip.append("docs_workflows")
+    return skip
+
+
+def _to_check_names(value: str) -> List[str]:
+    """Split a comma-separated :code:`--select` or :code:`--skip` argument.
+
+    >>> _to_check_names("black, flake8,")
+    ['black', 'flake8']
+    """
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+def _flatten(lists: Iterable[List[str]]) -> List[str]:
+    return [item for sub_list in lists for item in sub_list]
+
+
+def _to_timeout(value: str) -> Tuple[Optional[str], float]:
+    """Convert a :code:`--timeout` argument to a check name and a number of seconds.
+
+    >>> _to_timeout("2.5")
+    (None, 2.5)
+    >>> _to_timeout("github_labels=10")
+    ('github_labels', 10.0)
+    """
+    check_name: Optional[str] = None
+    if "=" in value:
+        check_name, value = value.split("=", maxsplit=1)
+    try:
+        seconds = float(value)
+    except ValueError as exception:
+        raise argparse.ArgumentTypeError(
+            f"Invalid number of seconds: {value!r}"
+        ) from exception
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError("Timeout should be a positive number")
+    return check_name, seconds
+
+
+def _load_timeouts(
+    arguments: Sequence[Tuple[Optional[str], float]],
+    pyproject: Union[Path, str] = CONFIG_PATH.pyproject,
+) -> Tuple[Optional[float], Dict[str, float]]:
+    """Get the default time budget and the time budgets per check.
+
+    Budgets that are given on the command line override the ones that are
+    configured in :file:`pyproject.toml`.
+    """
+    timeout: Optional[float] = None
+    timeouts: Dict[str, float] = {}
+    if os.path.isfile(pyproject):
+        import toml  # pylint: disable=import-outside-toplevel
+
+        config = toml.load(pyproject).get("tool", {}).get("repoma", {})
+        timeout = config.get("timeout")
+        timeouts.update(config.get("timeouts", {}))
+    for check_name, seconds in arguments:
+        if check_name is None:
+            timeout = seconds
+        else:
+            timeouts[check_name] = seconds
+    return timeout, timeouts
+
+
+def _get_changed_files(filenames: Sequence[str]) -> Optional[List[str]]:
+    """Get the files for which checks should run, or `None` for all checks.
+
+    A change to the pre-commit config may be an update of repoma itself, which
+    can affect any of the checks.
+    """
+    if not filenames:
+        return None
+    changed_files = [Path(f).as_posix() for f in filenames]
+    if Path(__PRECOMMIT).as_posix() in changed_files:
+        return None
+    return changed_files
 
 
 if __name__ == "__main__":
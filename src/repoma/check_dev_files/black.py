@@ -6,14 +6,14 @@ from typing import List, Optional
 import toml
 
 from repoma.errors import PrecommitError
-from repoma.utilities import CONFIG_PATH, natural_sorting
+from repoma.utilities import CONFIG_PATH, exists, natural_sorting, parse
 from repoma.utilities.executor import Executor
-from repoma.utilities.precommit import PrecommitConfig, load_round_trip_precommit_config
+from repoma.utilities.precommit import Hook, load_precommit_document
 from repoma.utilities.setup_cfg import get_supported_python_versions
 
 
 def main() -> None:
-    if not CONFIG_PATH.pyproject.exists():
+    if not exists(CONFIG_PATH.pyproject):
         return
     config = _load_black_config()
     executor = Executor()
@@ -93,9 +93,9 @@ def _check_target_versions(config: dict) -> None:
 
 def _update_nbqa_hook() -> None:
     repo_url = "https://github.com/nbQA-dev/nbQA"
-    precommit_config = PrecommitConfig.load()
-    repo = precommit_config.find_repo(repo_url)
-    if repo is None:
+    document = load_precommit_document()
+    repo_index = document.get_repo_index(repo_url)
+    if repo_index is None:
         return
 
     hook_id = "nbqa-black"
@@ -105,18 +105,16 @@ def _update_nbqa_hook() -> None:
             "black>=22.1.0",
         ],
     }
-    repo_index = precommit_config.get_repo_index(repo_url)
-    hook_index = repo.get_hook_index(hook_id)
+    hook_index = document.get_hook_index(repo_index, hook_id)
     if hook_index is None:
-        config, yaml = load_round_trip_precommit_config()
-        config["repos"][repo_index]["hooks"].append(expected_config)
-        yaml.dump(config, CONFIG_PATH.precommit)
+        with document.edit() as config:
+            config["repos"][repo_index]["hooks"].append(expected_config)
         raise PrecommitError(f"Added {hook_id} to pre-commit config")
 
-    if repo.hooks[hook_index].dict(skip_defaults=True) != expected_config:
-        config, yaml = load_round_trip_precommit_config()
-        config["repos"][repo_index]["hooks"][hook_index] = expected_config
-        yaml.dump(config, CONFIG_PATH.precommit)
+    repo = document.config.repos[repo_index]
+    if repo.hooks[hook_index] != Hook(**expected_config):
+        with document.edit() as config:
+            config["repos"][repo_index]["hooks"][hook_index] = expected_config
         raise PrecommitError(f"Updated args of {hook_id} pre-commit hook")
     nbqa_config = _load_nbqa_black_config()
     if nbqa_config != ["--line-length=85"]:
@@ -143,6 +141,9 @@ def _load_nbqa_black_config(content: Optional[str] = None) -> List[str]:
 
 def _load_pyproject_toml(content: Optional[str] = None) -> dict:
     if content is None:
-        with open(CONFIG_PATH.pyproject) as stream:
-            return toml.load(stream, _dict=OrderedDict)
+        return parse(CONFIG_PATH.pyproject, __parse_toml)
+    return __parse_toml(content)
+
+
+def __parse_toml(content: str) -> dict:
     return toml.loads(content, _dict=OrderedDict)
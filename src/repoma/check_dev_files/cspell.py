@@ -4,9 +4,10 @@ See `cSpell
 <https://github.com/streetsidesoftware/cspell/tree/master/packages/cspell>`_.
 """
 
+import copy
+import io
 import itertools
 import json
-import os
 import textwrap
 from configparser import ConfigParser
 from pathlib import Path
@@ -15,10 +16,19 @@ from typing import Any, Iterable, List, Sequence, Union
 import yaml
 
 from repoma.errors import PrecommitError
-from repoma.utilities import CONFIG_PATH, REPOMA_DIR, rename_file
+from repoma.utilities import (
+    CONFIG_PATH,
+    exists,
+    parse,
+    read,
+    remove,
+    rename_file,
+    write,
+)
 from repoma.utilities.executor import Executor
-from repoma.utilities.precommit import PrecommitConfig, load_round_trip_precommit_config
+from repoma.utilities.precommit import Hook, PrecommitConfig, load_precommit_document
 from repoma.utilities.readme import add_badge, remove_badge
+from repoma.utilities.templates import get_template
 from repoma.utilities.vscode import (
     add_vscode_extension_recommendation,
     remove_vscode_extension_recommendation,
@@ -38,10 +48,6 @@ __BADGE_PATTERN = r"\[\!\[[Ss]pelling.*\]\(.*cspell.*\)\]\(.*cspell.*\)\n?"
 __REPO_URL = "https://github.com/streetsidesoftware/cspell-cli"
 
 
-with open(REPOMA_DIR / ".template" / CONFIG_PATH.cspell) as __STREAM:
-    __EXPECTED_CONFIG = json.load(__STREAM)
-
-
 def main() -> None:
     rename_file("cspell.json", str(CONFIG_PATH.cspell))
     executor = Executor()
@@ -66,33 +72,32 @@ def _update_cspell_repo_url(path: Path = CONFIG_PATH.precommit) -> None:
     old_url_patters = [
         r".*/mirrors-cspell(.git)?$",
     ]
-    config = PrecommitConfig.load(path)
+    document = load_precommit_document(path)
     for pattern in old_url_patters:
-        repo_index = config.get_repo_index(pattern)
+        repo_index = document.get_repo_index(pattern)
         if repo_index is None:
             continue
-        config_dict, yaml_parser = load_round_trip_precommit_config(path)
-        config_dict["repos"][repo_index]["repo"] = __REPO_URL
-        yaml_parser.dump(config_dict, path)
+        with document.edit() as config:
+            config["repos"][repo_index]["repo"] = __REPO_URL
         raise PrecommitError(
             f"Updated cSpell pre-commit repo URL to {__REPO_URL} in {path}"
         )
 
 
 def _remove_configuration() -> None:
-    if CONFIG_PATH.cspell.exists():
-        os.remove(CONFIG_PATH.cspell)
+    if exists(CONFIG_PATH.cspell):
+        remove(CONFIG_PATH.cspell)
         raise PrecommitError(
             f'"{CONFIG_PATH.cspell}" is no longer required and has been removed'
         )
-    if CONFIG_PATH.editor_config.exists():
-        with open(CONFIG_PATH.editor_config) as stream:
-            prettier_ignore_content = stream.readlines()
+    if exists(CONFIG_PATH.editor_config):
+        prettier_ignore_content = io.StringIO(
+            read(CONFIG_PATH.editor_config)
+        ).readlines()
         expected_line = str(CONFIG_PATH.cspell) + "\n"
         if expected_line in set(prettier_ignore_content):
             prettier_ignore_content.remove(expected_line)
-            with open(CONFIG_PATH.editor_config, "w") as stream:
-                stream.writelines(prettier_ignore_content)
+            write("".join(prettier_ignore_content), CONFIG_PATH.editor_config)
             raise PrecommitError(
                 f'"{CONFIG_PATH.cspell}" in {CONFIG_PATH.editor_config}'
                 " is no longer required and has been removed"
@@ -117,22 +122,20 @@ def _check_check_hook_options() -> None:
     """
     repo_dict = repo.dict(skip_defaults=True)
     expected_dict = yaml.safe_load(expected_yaml)[0]
-    if (
-        list(repo_dict) != list(expected_dict)
-        or [h.dict(skip_defaults=True) for h in repo.hooks] != expected_dict["hooks"]
-    ):
+    if list(repo_dict) != list(expected_dict) or repo.hooks != [
+        Hook(**hook) for hook in expected_dict["hooks"]
+    ]:
         raise PrecommitError(
             "cSpell pre-commit hook should have the following form:\n" + expected_yaml
         )
 
 
 def _fix_config_content() -> None:
-    if not CONFIG_PATH.cspell.exists():
-        with open(CONFIG_PATH.cspell, "w") as stream:
-            stream.write("{}")
+    if not exists(CONFIG_PATH.cspell):
+        write("{}", CONFIG_PATH.cspell)
     config = __get_config(CONFIG_PATH.cspell)
     fixed_sections = []
-    for section_name in __EXPECTED_CONFIG:
+    for section_name in __get_expected_config():
         if section_name in {"words", "ignoreWords"}:
             if section_name not in config:
                 fixed_sections.append('"' + section_name + '"')
@@ -171,15 +174,9 @@ def _sort_config_entries() -> None:
 
 
 def _check_editor_config() -> None:
-    if not CONFIG_PATH.editor_config.exists():
+    if not exists(CONFIG_PATH.editor_config):
         return
-    cfg = ConfigParser()
-    with open(CONFIG_PATH.editor_config) as stream:
-        # https://stackoverflow.com/a/24501036/13219025
-        cfg.read_file(
-            itertools.chain(["[global]"], stream),
-            source=str(CONFIG_PATH.editor_config),
-        )
+    cfg = parse(CONFIG_PATH.editor_config, __parse_editor_config)
     if not cfg.has_section(str(CONFIG_PATH.cspell)):
         raise PrecommitError(
             f'{CONFIG_PATH.editor_config} has no section "[{CONFIG_PATH.cspell}]"'
@@ -206,26 +203,37 @@ def _update_prettier_ignore() -> None:
         return
     prettier_ignore_path = ".prettierignore"
     expected_line = str(CONFIG_PATH.cspell) + "\n"
-    if not os.path.exists(prettier_ignore_path):
-        with open(prettier_ignore_path, "w") as stream:
-            stream.write(expected_line)
+    if not exists(prettier_ignore_path):
+        write(expected_line, prettier_ignore_path)
     else:
-        with open(prettier_ignore_path) as stream:
-            prettier_ignore_content = stream.readlines()
+        prettier_ignore_content = io.StringIO(read(prettier_ignore_path)).readlines()
         if expected_line in set(prettier_ignore_content):
             return
-        with open(prettier_ignore_path, "w+") as stream:
-            stream.write(expected_line)
+        write(expected_line, prettier_ignore_path)
     raise PrecommitError(f'Added "{CONFIG_PATH.cspell}" to {prettier_ignore_path}"')
 
 
+def __parse_editor_config(content: str) -> ConfigParser:
+    cfg = ConfigParser()
+    # https://stackoverflow.com/a/24501036/13219025
+    cfg.read_file(
+        itertools.chain(["[global]"], io.StringIO(content)),
+        source=str(CONFIG_PATH.editor_config),
+    )
+    return cfg
+
+
+def __get_expected_config() -> dict:
+    return get_template(Path(".template") / CONFIG_PATH.cspell).parsed
+
+
 def __get_expected_content(config: dict, section: str, *, extend: bool = False) -> Any:
     if section not in config:
-        return __EXPECTED_CONFIG[section]
+        return __get_expected_config()[section]
     section_content = config[section]
-    if section not in __EXPECTED_CONFIG:
+    if section not in __get_expected_config():
         return section_content
-    expected_section_content = __EXPECTED_CONFIG[section]
+    expected_section_content = __get_expected_config()[section]
     if isinstance(expected_section_content, str):
         return expected_section_content
     if isinstance(expected_section_content, list):
@@ -267,14 +275,12 @@ def __express_list_of_sections(sections: Sequence[str]) -> str:
 
 
 def __get_config(path: Union[str, Path]) -> dict:
-    with open(path) as stream:
-        return json.load(stream)
+    return copy.deepcopy(parse(path, json.loads))
 
 
 def __write_config(config: dict) -> None:
-    with open(CONFIG_PATH.cspell, "w") as stream:
-        json.dump(config, stream, indent=4, ensure_ascii=False)
-        stream.write("\n")
+    content = json.dumps(config, indent=4, ensure_ascii=False) + "\n"
+    write(content, CONFIG_PATH.cspell)
 
 
 def __sort_section(content: Iterable[str]) -> List[str]:
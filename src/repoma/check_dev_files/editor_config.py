@@ -5,15 +5,14 @@ pre-commit hook
 <https://github.com/editorconfig-checker/editorconfig-checker.python>`_.
 """
 
-import os
 from textwrap import dedent
 
-import yaml
-
 from repoma.errors import PrecommitError
+from repoma.utilities import CONFIG_PATH, exists
+from repoma.utilities.precommit import load_precommit_document
 
-__PRECOMMIT_CONFIG_FILE = ".pre-commit-config.yaml"
-__EDITORCONFIG_FILE = ".editorconfig"
+__PRECOMMIT_CONFIG_FILE = CONFIG_PATH.precommit
+__EDITORCONFIG_FILE = CONFIG_PATH.editor_config
 __EDITORCONFIG_URL = (
     "https://github.com/editorconfig-checker/editorconfig-checker.python"
 )
@@ -45,16 +44,15 @@ def main() -> None:
 
 
 def _has_editor_config() -> bool:
-    if not os.path.exists(__EDITORCONFIG_FILE):
+    if not exists(__EDITORCONFIG_FILE):
         return False
     return True
 
 
 def _has_precommit_hook() -> bool:
-    if not os.path.exists(__PRECOMMIT_CONFIG_FILE):
+    if not exists(__PRECOMMIT_CONFIG_FILE):
         return False
-    with open(__PRECOMMIT_CONFIG_FILE) as stream:
-        config = yaml.load(stream, Loader=yaml.SafeLoader)
+    config = load_precommit_document(__PRECOMMIT_CONFIG_FILE).data
     repos = config.get("repos")
     if repos is None:
         return False
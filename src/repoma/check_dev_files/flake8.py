@@ -7,7 +7,7 @@ from textwrap import dedent, indent
 from typing import Iterable, Optional
 
 from repoma.errors import PrecommitError
-from repoma.utilities import CONFIG_PATH, natural_sorting
+from repoma.utilities import CONFIG_PATH, exists, natural_sorting, read
 from repoma.utilities.cfg import extract_config_section, format_config, open_config
 from repoma.utilities.executor import Executor
 from repoma.utilities.setup_cfg import open_setup_cfg
@@ -81,7 +81,7 @@ def _extract_flake8_config() -> None:
 
 
 def _check_config_exists() -> None:
-    if not CONFIG_PATH.flake8.exists():
+    if not exists(CONFIG_PATH.flake8):
         raise PrecommitError(
             f"This repository has no {CONFIG_PATH.flake8} config file."
         )
@@ -109,8 +109,7 @@ def _check_comments_on_separate_line(
     input: Optional[io.StringIO] = None,  # noqa: A002
 ) -> None:
     if input is None:
-        with open(CONFIG_PATH.flake8) as stream:
-            lines = stream.readlines()
+        lines = io.StringIO(read(CONFIG_PATH.flake8)).readlines()
     else:
         lines = input.readlines()
     for line in lines:
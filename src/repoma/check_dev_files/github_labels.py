@@ -4,19 +4,19 @@ If it's still there remove it, because it has been superseded by the
 `github.com/ComPWA/meta <https://github.com/ComPWA/meta>`_ repository.
 """
 
-import os
+import io
 import pathlib
 from typing import List
 
 from repoma.errors import PrecommitError
-from repoma.utilities import CONFIG_PATH
+from repoma.utilities import CONFIG_PATH, exists, glob, read, remove, write
 
 __LABELS_CONFIG_FILE = "labels.toml"
 
 
 def main() -> None:
-    if os.path.exists(__LABELS_CONFIG_FILE):
-        os.remove(__LABELS_CONFIG_FILE)
+    if exists(__LABELS_CONFIG_FILE):
+        remove(__LABELS_CONFIG_FILE)
         raise PrecommitError(
             f'Repository contains a file "{__LABELS_CONFIG_FILE}" for the'
             " labels package (see https://pypi.org/project/labels). This file"
@@ -38,8 +38,7 @@ def main() -> None:
 
 
 def _check_has_labels_requirement(path: pathlib.Path) -> bool:
-    with open(path) as stream:
-        lines = stream.readlines()
+    lines = io.StringIO(read(path)).readlines()
     for line in lines:
         requirement = _get_package_name(line)
         if requirement == "labels":
@@ -49,9 +48,9 @@ def _check_has_labels_requirement(path: pathlib.Path) -> bool:
 
 def _get_requirement_files() -> List[pathlib.Path]:
     return [
-        *pathlib.Path(".").glob("**/requirements*.in"),
-        *pathlib.Path(".").glob("**/requirements*.txt"),
-        *pathlib.Path(".").glob(str(CONFIG_PATH.setup_cfg)),
+        *glob("**/requirements*.in"),
+        *glob("**/requirements*.txt"),
+        *glob(str(CONFIG_PATH.setup_cfg)),
     ]
 
 
@@ -71,15 +70,15 @@ def _remove_all_labels_requirement() -> None:
 
 
 def _remove_labels_requirement(path: pathlib.Path) -> None:
-    with open(path) as stream:
-        original_lines = stream.readlines()
-    with open(path, "w") as stream:
-        for line in original_lines:
-            requirement = line
-            requirement = requirement.split("<")[0]
-            requirement = requirement.split(">")[0]
-            requirement = requirement.split("=")[0]
-            requirement = requirement.split("!")[0]
-            requirement = requirement.strip()
-            if requirement != "labels":
-                stream.write(line)
+    original_lines = io.StringIO(read(path)).readlines()
+    new_lines = []
+    for line in original_lines:
+        requirement = line
+        requirement = requirement.split("<")[0]
+        requirement = requirement.split(">")[0]
+        requirement = requirement.split("=")[0]
+        requirement = requirement.split("!")[0]
+        requirement = requirement.strip()
+        if requirement != "labels":
+            new_lines.append(line)
+    write("".join(new_lines), path)
@@ -1,20 +1,15 @@
 """Check :file:`.github/workflows` folder content."""
 
-import os
 import re
 
 from repoma.errors import PrecommitError
-from repoma.utilities import CONFIG_PATH, REPOMA_DIR, write
+from repoma.utilities import CONFIG_PATH, exists, glob, is_directory, read, write
 from repoma.utilities.executor import Executor
+from repoma.utilities.templates import get_template
 
 
-def main(no_docs: bool) -> None:
-    executor = Executor()
-    executor(check_milestone_workflow)
-    if not no_docs:
-        executor(check_docs_workflow)
-    if executor.error_messages:
-        raise PrecommitError(executor.merge_messages())
+def main() -> None:
+    check_milestone_workflow()
 
 
 def create_continuous_deployment() -> None:
@@ -32,7 +27,7 @@ def check_milestone_workflow() -> None:
 
 
 def check_docs_workflow() -> None:
-    if os.path.exists("./docs/") or os.path.exists("./doc/"):
+    if _has_documentation():
         executor = Executor()
         executor(_copy_workflow_file, "ci-docs.yml")
         executor(_copy_workflow_file, "linkcheck.yml")
@@ -40,20 +35,22 @@ def check_docs_workflow() -> None:
             raise PrecommitError(executor.merge_messages())
 
 
+def _has_documentation() -> bool:
+    """Check whether git tracks or does not ignore files under :file:`doc(s)/`."""
+    return any(glob(f"{directory}/**") for directory in ["doc", "docs"])
+
+
 def _copy_workflow_file(filename: str) -> None:
-    expected_workflow_path = REPOMA_DIR / CONFIG_PATH.github_workflow_dir / filename
-    with open(expected_workflow_path) as stream:
-        expected_content = stream.read()
-    if not CONFIG_PATH.pip_constraints.exists():
+    workflow_path = f"{CONFIG_PATH.github_workflow_dir}/{filename}"
+    expected_content = get_template(workflow_path).content
+    if not is_directory(CONFIG_PATH.pip_constraints):
         expected_content = _remove_constraint_pinning(expected_content)
 
-    workflow_path = f"{CONFIG_PATH.github_workflow_dir}/{filename}"
-    if not os.path.exists(workflow_path):
+    if not exists(workflow_path):
         write(expected_content, target=workflow_path)
         raise PrecommitError(f'Created "{workflow_path}" workflow')
 
-    with open(workflow_path) as stream:
-        existing_content = stream.read()
+    existing_content = read(workflow_path)
     if existing_content != expected_content:
         write(expected_content, target=workflow_path)
         raise PrecommitError(f'Updated "{workflow_path}" workflow')
@@ -1,26 +1,25 @@
 """Extract :code:`.gitpod.yml` file from :code:`launch.json`."""
 
+import copy
 import json
-import os
-
-import yaml
+from pathlib import Path
 
 from repoma.errors import PrecommitError
-from repoma.utilities import CONFIG_PATH, REPOMA_DIR
+from repoma.utilities import CONFIG_PATH, exists, parse
 from repoma.utilities.readme import add_badge
 from repoma.utilities.setup_cfg import get_repo_url
-from repoma.utilities.yaml import write_yaml
+from repoma.utilities.templates import get_template
+from repoma.utilities.yaml import load_yaml, write_yaml
 
 __CONSTRAINTS_FILE = ".constraints/py3.8.txt"
 
 
 def main() -> None:
-    pin_dependencies = os.path.exists(__CONSTRAINTS_FILE)
+    pin_dependencies = exists(__CONSTRAINTS_FILE)
     error_message = ""
     expected_config = _generate_gitpod_config(pin_dependencies)
-    if CONFIG_PATH.gitpod.exists():
-        with open(CONFIG_PATH.gitpod) as stream:
-            existing_config = yaml.load(stream, Loader=yaml.SafeLoader)
+    if exists(CONFIG_PATH.gitpod):
+        existing_config = parse(CONFIG_PATH.gitpod, load_yaml)
         if existing_config != expected_config:
             error_message = "GitPod config does not have expected content"
     else:
@@ -40,15 +39,14 @@ def main() -> None:
 
 
 def _extract_extensions() -> dict:
-    if CONFIG_PATH.vscode_extensions.exists():
-        with open(CONFIG_PATH.vscode_extensions) as stream:
-            return json.load(stream)["recommendations"]
+    if exists(CONFIG_PATH.vscode_extensions):
+        return parse(CONFIG_PATH.vscode_extensions, json.loads)["recommendations"]
     return {}
 
 
 def _generate_gitpod_config(pin_dependencies: bool) -> dict:
-    with open(REPOMA_DIR / ".template" / CONFIG_PATH.gitpod) as stream:
-        gitpod_config = yaml.load(stream, Loader=yaml.SafeLoader)
+    template = get_template(Path(".template") / CONFIG_PATH.gitpod)
+    gitpod_config = copy.deepcopy(template.parsed)
     tasks = gitpod_config["tasks"]
     if pin_dependencies:
         tasks[0]["init"] = f"pip install -c {__CONSTRAINTS_FILE} -e .[dev]"
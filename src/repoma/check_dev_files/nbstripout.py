@@ -1,13 +1,10 @@
 """Check the nbstripout hook in the pre-commit config."""
 
-from typing import Optional, Tuple
-
 from ruamel.yaml.scalarstring import LiteralScalarString
 
 from repoma.errors import PrecommitError
-from repoma.utilities import CONFIG_PATH
-from repoma.utilities.precommit import PrecommitConfig, Repo
-from repoma.utilities.yaml import create_prettier_round_trip_yaml
+from repoma.utilities.precommit import load_precommit_document
+from repoma.utilities.yaml import update_round_trip_sequence
 
 # cspell:ignore nbconvert showmarkdowntxt
 __REPO_URL = "https://github.com/kynan/nbstripout"
@@ -30,25 +27,20 @@ __EXTRA_KEYS_ARGUMENT = [
 
 
 def main() -> None:
-    index, repo = _get_nbstripout_precommit_repo()
-    if repo is None or index is None:
+    document = load_precommit_document()
+    repo_index = document.get_repo_index(__REPO_URL)
+    if repo_index is None:
         return
-    _update_extra_keys_argument(index, repo)
-
-
-def _get_nbstripout_precommit_repo() -> Tuple[Optional[int], Optional[Repo]]:
-    config = PrecommitConfig.load()
-    repo = config.find_repo(__REPO_URL)
-    index = config.get_repo_index(__REPO_URL)
-    return index, repo
+    _update_extra_keys_argument(repo_index)
 
 
-def _update_extra_keys_argument(repo_index: int, repo: Repo) -> None:
+def _update_extra_keys_argument(repo_index: int) -> None:
     """Add an argument to strip additional metadata.
 
     For more info see https://github.com/kynan/nbstripout#stripping-metadata.
     """
-    index = repo.get_hook_index(__HOOK_ID)
+    document = load_precommit_document()
+    index = document.get_hook_index(repo_index, __HOOK_ID)
     if index is None:
         raise PrecommitError(
             f'The following repo is missing hook ID "{__HOOK_ID}": {__REPO_URL}'
@@ -57,9 +49,12 @@ def _update_extra_keys_argument(repo_index: int, repo: Repo) -> None:
         "--extra-keys",
         LiteralScalarString("\n".join(__EXTRA_KEYS_ARGUMENT) + "\n"),
     ]
+    repo = document.config.repos[repo_index]
     if repo.hooks[index].args == [str(s) for s in expected_args]:
         return
-    yaml = create_prettier_round_trip_yaml()
-    config = yaml.load(CONFIG_PATH.precommit)
-    config["repos"][repo_index]["hooks"][index]["args"] = expected_args
-    yaml.dump(config, CONFIG_PATH.precommit)
+    with document.edit() as config:
+        hook = config["repos"][repo_index]["hooks"][index]
+        if "args" in hook:
+            update_round_trip_sequence(hook["args"], expected_args)
+        else:
+            hook["args"] = expected_args
@@ -1,12 +1,13 @@
 """Check the configuration for `Prettier <https://prettier.io>`_."""
 
-import os
+from pathlib import Path
 
 from repoma.errors import PrecommitError
-from repoma.utilities import CONFIG_PATH, REPOMA_DIR
+from repoma.utilities import CONFIG_PATH, exists, read, remove, write
 from repoma.utilities.executor import Executor
 from repoma.utilities.precommit import PrecommitConfig
 from repoma.utilities.readme import add_badge, remove_badge
+from repoma.utilities.templates import get_template
 from repoma.utilities.vscode import (
     add_vscode_extension_recommendation,
     remove_vscode_extension_recommendation,
@@ -22,10 +23,6 @@ __BADGE = "[![code style: prettier](https://img.shields.io/badge/code_style-pret
 __BADGE_PATTERN = r"\[\!\[[Pp]rettier.*\]\(.*prettier.*\)\]\(.*prettier.*\)\n?"
 
 
-with open(REPOMA_DIR / ".template" / CONFIG_PATH.prettier) as __STREAM:
-    __EXPECTED_CONFIG = __STREAM.read()
-
-
 def main(no_prettierrc: bool) -> None:
     config = PrecommitConfig.load()
     repo = config.find_repo(r".*/mirrors-prettier")
@@ -41,8 +38,8 @@ def main(no_prettierrc: bool) -> None:
 
 
 def _remove_configuration() -> None:
-    if CONFIG_PATH.prettier.exists():
-        os.remove(CONFIG_PATH.prettier)
+    if exists(CONFIG_PATH.prettier):
+        remove(CONFIG_PATH.prettier)
         raise PrecommitError(
             f'"{CONFIG_PATH.prettier}" is no longer required and has been removed'
         )
@@ -52,20 +49,17 @@ def _remove_configuration() -> None:
 
 def _fix_config_content(no_prettierrc: bool) -> None:
     if no_prettierrc:
-        if CONFIG_PATH.prettier.exists():
-            os.remove(CONFIG_PATH.prettier)
+        if exists(CONFIG_PATH.prettier):
+            remove(CONFIG_PATH.prettier)
             raise PrecommitError(
                 f"Removed {CONFIG_PATH.prettier} as requested by --no-prettierrc"
             )
     else:
-        if not CONFIG_PATH.prettier.exists():
-            existing_content = ""
-        else:
-            with open(CONFIG_PATH.prettier) as stream:
-                existing_content = stream.read()
-        if existing_content != __EXPECTED_CONFIG:
-            with open(CONFIG_PATH.prettier, "w") as stream:
-                stream.write(__EXPECTED_CONFIG)
+        template = get_template(Path(".template") / CONFIG_PATH.prettier)
+        if not exists(CONFIG_PATH.prettier) or not template.matches(
+            read(CONFIG_PATH.prettier)
+        ):
+            write(template.content, CONFIG_PATH.prettier)
             raise PrecommitError(f"Updated {CONFIG_PATH.prettier} config file")
 
     wrong_config_paths = [  # https://prettier.io/docs/en/configuration.html
@@ -76,8 +70,8 @@ def _fix_config_content(no_prettierrc: bool) -> None:
         ".prettierrc.toml",
     ]
     for path in wrong_config_paths:
-        if os.path.exists(path):
-            os.remove(path)
+        if exists(path):
+            remove(path)
             raise PrecommitError(
                 f'Removed "{path}": "{CONFIG_PATH.prettier}" should suffice'
             )
@@ -4,8 +4,9 @@
 from repoma.errors import PrecommitError
 from repoma.utilities import CONFIG_PATH, natural_sorting
 from repoma.utilities.executor import Executor
-from repoma.utilities.precommit import PrecommitConfig, load_round_trip_precommit_config
+from repoma.utilities.precommit import Hook, load_precommit_document
 from repoma.utilities.setup_cfg import get_supported_python_versions
+from repoma.utilities.yaml import update_round_trip_sequence
 
 
 def main() -> None:
@@ -22,40 +23,43 @@ def _update_main_pyupgrade_hook() -> None:
     expected_args = [
         __get_pyupgrade_version_argument(),
     ]
-    precommit_config = PrecommitConfig.load()
-    repo = precommit_config.find_repo(repo_url)
-    if repo is None:
+    document = load_precommit_document()
+    repo_index = document.get_repo_index(repo_url)
+    if repo_index is None:
         raise PrecommitError(f"{CONFIG_PATH.precommit} is missing a hook: {repo_url}")
-    index = repo.get_hook_index(hook_id)
+    index = document.get_hook_index(repo_index, hook_id)
     if index is None:
-        config, yaml = load_round_trip_precommit_config()
-        config["repos"].append(
-            {
-                "repo": repo_url,
-                "rev": "v2.29.0",
-                "hooks": [
-                    {
-                        "id": hook_id,
-                        "args": expected_args,
-                    }
-                ],
-            }
-        )
-        yaml.dump(config, CONFIG_PATH.precommit)
+        with document.edit() as config:
+            config["repos"].append(
+                {
+                    "repo": repo_url,
+                    "rev": "v2.29.0",
+                    "hooks": [
+                        {
+                            "id": hook_id,
+                            "args": expected_args,
+                        }
+                    ],
+                }
+            )
         raise PrecommitError(f"Added {hook_id} pre-commit hook")
+    repo = document.config.repos[repo_index]
     if repo.hooks[index].args == expected_args:
         return
-    config, yaml = load_round_trip_precommit_config()
-    config["repos"][index]["hooks"]["args"] = expected_args
-    yaml.dump(config, CONFIG_PATH.precommit)
+    with document.edit() as config:
+        hook = config["repos"][repo_index]["hooks"][index]
+        if "args" in hook:
+            update_round_trip_sequence(hook["args"], expected_args)
+        else:
+            hook["args"] = expected_args
     raise PrecommitError(f"Updated args of {hook_id} pre-commit hook")
 
 
 def _update_nbqa_hook() -> None:
     repo_url = "https://github.com/nbQA-dev/nbQA"
-    precommit_config = PrecommitConfig.load()
-    repo = precommit_config.find_repo(repo_url)
-    if repo is None:
+    document = load_precommit_document()
+    repo_index = document.get_repo_index(repo_url)
+    if repo_index is None:
         return
 
     hook_id = "nbqa-pyupgrade"
@@ -65,18 +69,16 @@ def _update_nbqa_hook() -> None:
             __get_pyupgrade_version_argument(),
         ],
     }
-    repo_index = precommit_config.get_repo_index(repo_url)
-    hook_index = repo.get_hook_index(hook_id)
+    hook_index = document.get_hook_index(repo_index, hook_id)
     if hook_index is None:
-        config, yaml = load_round_trip_precommit_config()
-        config["repos"][repo_index]["hooks"].append(expected_config)
-        yaml.dump(config, CONFIG_PATH.precommit)
+        with document.edit() as config:
+            config["repos"][repo_index]["hooks"].append(expected_config)
         raise PrecommitError(f"Added {hook_id} to pre-commit config")
 
-    if repo.hooks[hook_index].dict(skip_defaults=True) != expected_config:
-        config, yaml = load_round_trip_precommit_config()
-        config["repos"][repo_index]["hooks"][hook_index] = expected_config
-        yaml.dump(config, CONFIG_PATH.precommit)
+    repo = document.config.repos[repo_index]
+    if repo.hooks[hook_index] != Hook(**expected_config):
+        with document.edit() as config:
+            config["repos"][repo_index]["hooks"][hook_index] = expected_config
         raise PrecommitError(f"Updated args of {hook_id} pre-commit hook")
 
 
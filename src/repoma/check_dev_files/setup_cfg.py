@@ -1,19 +1,18 @@
 """Apply a certain set of standards to the :file:`setup.cfg`."""
 
-import os
 import textwrap
 from collections import defaultdict
 
 from repoma.errors import PrecommitError
 from repoma.format_setup_cfg import write_formatted_setup_cfg
-from repoma.utilities import CONFIG_PATH
+from repoma.utilities import CONFIG_PATH, exists
 from repoma.utilities.cfg import copy_config
 from repoma.utilities.executor import Executor
 from repoma.utilities.setup_cfg import open_setup_cfg
 
 
 def main(ignore_author: bool) -> None:
-    if not CONFIG_PATH.setup_cfg.exists():
+    if not exists(CONFIG_PATH.setup_cfg):
         return
     executor = Executor()
     executor(_check_required_options)
@@ -66,7 +65,7 @@ def _update_author_data() -> None:
 
 
 def _fix_long_description() -> None:
-    if os.path.exists("README.md"):
+    if exists(CONFIG_PATH.readme):
         old_cfg = open_setup_cfg()
         new_cfg = copy_config(old_cfg)
         new_cfg.set("metadata", "long_description", "file: README.md")
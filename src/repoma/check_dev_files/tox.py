@@ -1,13 +1,13 @@
 """Check contents of a ``tox.ini`` file."""
 
 from repoma.errors import PrecommitError
-from repoma.utilities import CONFIG_PATH
+from repoma.utilities import CONFIG_PATH, exists
 from repoma.utilities.cfg import extract_config_section
 from repoma.utilities.executor import Executor
 
 
 def main() -> None:
-    if not CONFIG_PATH.tox.exists():
+    if not exists(CONFIG_PATH.tox):
         return
     executor = Executor()
     executor(
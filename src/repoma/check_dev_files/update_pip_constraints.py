@@ -5,56 +5,52 @@ See Also:
 - https://github.com/ComPWA/update-pre-commit
 """
 
+import copy
 from pathlib import Path
-
-from ruamel.yaml.main import YAML
-from ruamel.yaml.scalarstring import DoubleQuotedScalarString
+from typing import List
 
 from repoma.errors import PrecommitError
-from repoma.utilities import CONFIG_PATH, REPOMA_DIR
+from repoma.utilities import CONFIG_PATH, exists, read, remove
 from repoma.utilities.executor import Executor
 from repoma.utilities.setup_cfg import get_supported_python_versions
-from repoma.utilities.yaml import create_prettier_round_trip_yaml
+from repoma.utilities.templates import Template, get_template
+from repoma.utilities.yaml import (
+    create_prettier_round_trip_yaml,
+    load_yaml,
+    write_round_trip_yaml,
+)
 
 
-def main(cron_frequency: str) -> None:
+def main(pin_requirements: str) -> None:
     executor = Executor()
     executor(_remove_script, "pin_requirements.py")
     executor(_remove_script, "upgrade.sh")
-    executor(_update_github_workflows, cron_frequency)
+    executor(_update_github_workflows, pin_requirements)
     if executor.error_messages:
         raise PrecommitError(executor.merge_messages())
 
 
 def _remove_script(script_name: str) -> None:
     bash_script_name = CONFIG_PATH.pip_constraints / script_name
-    if bash_script_name.exists():
-        bash_script_name.unlink()
+    if exists(bash_script_name):
+        remove(bash_script_name)
         raise PrecommitError(f'Removed deprecated "{bash_script_name}" script')
 
 
 def _update_github_workflows(cron_frequency: str) -> None:
     def overwrite_workflow(workflow_file: str) -> None:
-        expected_workflow_path = (
-            REPOMA_DIR / CONFIG_PATH.github_workflow_dir / workflow_file
-        )
-        yaml = create_prettier_round_trip_yaml()
-        expected_data = yaml.load(expected_workflow_path)
+        template = get_template(CONFIG_PATH.github_workflow_dir / workflow_file)
         supported_python_versions = get_supported_python_versions()
-        formatted_python_versions = list(
-            map(DoubleQuotedScalarString, supported_python_versions)
-        )
-        expected_data["jobs"]["pip-constraints"]["strategy"]["matrix"][
-            "python-version"
-        ] = formatted_python_versions
         workflow_path = CONFIG_PATH.github_workflow_dir / workflow_file
         if "-cron-" in str(workflow_file):
             workflow_path = workflow_path.parent / "requirements-cron.yml"
-        if not workflow_path.exists():
-            __update_workflow(yaml, expected_data, workflow_path)
-        existing_data = yaml.load(workflow_path)
+        if not exists(workflow_path):
+            __update_workflow(template, supported_python_versions, workflow_path)
+        expected_data = copy.deepcopy(load_yaml(template.content))
+        __set_python_versions(expected_data, supported_python_versions)
+        existing_data = load_yaml(read(workflow_path))
         if existing_data != expected_data:
-            __update_workflow(yaml, expected_data, workflow_path)
+            __update_workflow(template, supported_python_versions, workflow_path)
 
     executor = Executor()
     if cron_frequency == "biweekly":
@@ -70,6 +66,20 @@ def _update_github_workflows(cron_frequency: str) -> None:
         raise PrecommitError(executor.merge_messages())
 
 
-def __update_workflow(yaml: YAML, config: dict, path: Path) -> None:
-    yaml.dump(config, path)
+def __update_workflow(
+    template: Template, python_versions: List[str], path: Path
+) -> None:
+    """Write the workflow with the round-trip parser, which keeps the comments."""
+    # pylint: disable=import-outside-toplevel
+    from ruamel.yaml.scalarstring import DoubleQuotedScalarString
+
+    yaml = create_prettier_round_trip_yaml()
+    config = yaml.load(template.content)
+    __set_python_versions(config, list(map(DoubleQuotedScalarString, python_versions)))
+    write_round_trip_yaml(yaml, config, path)
     raise PrecommitError(f'Updated "{path}" workflow')
+
+
+def __set_python_versions(config: dict, python_versions: List[str]) -> None:
+    matrix = config["jobs"]["pip-constraints"]["strategy"]["matrix"]
+    matrix["python-version"] = python_versions
@@ -0,0 +1,148 @@
+"""Run a repoma hook through the repoma daemon, see :mod:`repoma.daemon`.
+
+.. code-block:: shell
+
+    repoma-client check-dev-files --no-docs
+
+forwards the arguments, working directory, and environment to a daemon that has
+already imported everything that the hooks need. If no daemon is running, or if
+it runs another version of repoma, a new daemon is started in the background and
+the hook runs in this process.
+
+This module only imports the standard library, so that it starts quickly.
+"""
+
+import importlib
+import json
+import os
+import socket
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence
+
+HOOKS = {
+    "check-dev-files": "repoma.check_dev_files:main",
+    "fix-nbformat-version": "repoma.fix_nbformat_version:main",
+    "format-setup-cfg": "repoma.format_setup_cfg:main",
+    "pin-nb-requirements": "repoma.pin_nb_requirements:main",
+    "set-nb-cells": "repoma.set_nb_cells:main",
+}
+"""Hooks that the daemon can run, with the import path of their main function."""
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv or argv[0] not in HOOKS:
+        print(f"usage: repoma-client {{{','.join(HOOKS)}}} [ARGS...]", file=sys.stderr)
+        return 2
+    hook, *hook_argv = argv
+    response = request(
+        {
+            "command": "run",
+            "hook": hook,
+            "argv": hook_argv,
+            "cwd": os.getcwd(),
+            "env": dict(os.environ),
+        }
+    )
+    if response is None or "exit_code" not in response:
+        start_daemon()
+        return run_hook(hook, hook_argv)
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    return response["exit_code"]
+
+
+def run_hook(hook: str, argv: List[str]) -> int:
+    module_name, _, function_name = HOOKS[hook].partition(":")
+    function = getattr(importlib.import_module(module_name), function_name)
+    return function(argv)
+
+
+def request(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Send a request to the daemon and return its response.
+
+    Returns `None` if there is no daemon that can be reached.
+    """
+    socket_path = get_socket_path()
+    if socket_path is None:
+        return None
+    message = {**message, "build_id": get_build_id()}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(socket_path)
+            connection.sendall(json.dumps(message).encode() + b"\n")
+            connection.shutdown(socket.SHUT_WR)
+            response = receive(connection)
+    except (OSError, ValueError):
+        return None
+    return response
+
+
+def receive(connection: socket.socket) -> Dict[str, Any]:
+    """Read one JSON message until the other side stops sending."""
+    chunks = []
+    while True:
+        chunk = connection.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+def start_daemon() -> None:
+    """Start a daemon in the background, if the platform supports it."""
+    if get_socket_path() is None:
+        return
+    import subprocess  # pylint: disable=import-outside-toplevel
+
+    subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", "repoma.daemon", "serve"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def get_socket_path() -> Optional[str]:
+    """Path of the Unix socket of the daemon of the current user.
+
+    Can be overwritten with the :code:`REPOMA_DAEMON_SOCKET` environment
+    variable. Returns `None` on platforms without Unix sockets.
+    """
+    if not hasattr(socket, "AF_UNIX") or not hasattr(os, "fork"):
+        return None
+    socket_path = os.environ.get("REPOMA_DAEMON_SOCKET")
+    if socket_path is not None:
+        return socket_path
+    directory = os.path.join(tempfile.gettempdir(), f"repoma-{os.getuid()}")
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if os.stat(directory).st_uid != os.getuid():
+        return None
+    return os.path.join(directory, "daemon.sock")
+
+
+def get_build_id() -> str:
+    """Identify the installed version of repoma, to detect upgrades.
+
+    The build ID is computed for every request, so it is only derived from the
+    version and from the bundle of templates that is written when the package is
+    built. In an editable install, which has no bundle, stop the daemon with
+    :code:`repoma-daemon stop` to pick up changes to the code.
+    """
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        version = importlib.import_module("repoma.version").version  # type: ignore[attr-defined]
+    except ImportError:
+        version = "unknown"
+    try:
+        last_modified = os.stat(os.path.join(package_dir, "templates.json")).st_mtime_ns
+    except OSError:
+        last_modified = 0
+    return f"{version}+{last_modified}:{package_dir}:{sys.executable}"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+"""Long-lived process that runs repoma hooks for :mod:`repoma.client`.
+
+pre-commit starts a new Python process for every hook, and even several
+processes for a notebook hook. Each of those processes has to import
+:mod:`nbformat`, :mod:`ruamel.yaml`, :mod:`yaml` etc. before it can do any
+work. The daemon imports all hooks, loads the bundled templates, and compiles the
+notebook validator once. It then forks a child process for each request, so that
+hooks can run at the same time and cannot affect each other or the daemon.
+
+.. code-block:: shell
+
+    repoma-daemon serve   # run in the foreground
+    repoma-daemon status
+    repoma-daemon stop
+
+The daemon stops after it has not received a request for a while, or if a
+client has another version of repoma.
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import socket
+import sys
+import time
+import traceback
+from typing import Any, Dict, Optional, Sequence, Set
+
+from repoma.client import (
+    HOOKS,
+    get_build_id,
+    get_socket_path,
+    receive,
+    request,
+    run_hook,
+)
+
+IDLE_TIMEOUT = 600.0
+"""Seconds after which the daemon stops if it has not received any request."""
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(__doc__)
+    parser.add_argument("command", choices=["serve", "status", "stop"])
+    parser.add_argument(
+        "--idle-timeout",
+        default=IDLE_TIMEOUT,
+        help="Stop the daemon after this many seconds without requests.",
+        type=float,
+    )
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        socket_path = get_socket_path()
+        if socket_path is None:
+            print("The repoma daemon requires Unix sockets", file=sys.stderr)
+            return 1
+        serve(socket_path, args.idle_timeout)
+        return 0
+    response = request({"command": args.command})
+    if response is None:
+        print("The repoma daemon is not running")
+        return 1
+    print(json.dumps(response, indent=2))
+    return 0
+
+
+def serve(socket_path: str, idle_timeout: float = IDLE_TIMEOUT) -> None:
+    """Handle requests on a Unix socket until the daemon becomes idle.
+
+    Returns immediately if another daemon is already serving on this socket.
+    """
+    import fcntl  # pylint: disable=import-outside-toplevel
+
+    with open(socket_path + ".lock", "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(socket_path)
+        _warm_up()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(socket_path)
+            server.listen()
+            try:
+                _serve(server, idle_timeout)
+            finally:
+                os.remove(socket_path)
+
+
+def _serve(server: socket.socket, idle_timeout: float) -> None:
+    build_id = get_build_id()
+    started = time.time()
+    last_request = time.monotonic()
+    children: Set[int] = set()
+    server.settimeout(1.0)
+    while True:
+        children = {pid for pid in children if not _has_exited(pid)}
+        if not children and time.monotonic() - last_request > idle_timeout:
+            return
+        try:
+            connection, _ = server.accept()
+        except socket.timeout:
+            continue
+        last_request = time.monotonic()
+        with connection:
+            connection.settimeout(10.0)
+            try:
+                message = receive(connection)
+            except (OSError, ValueError):
+                continue
+            command = message.get("command")
+            if message.get("build_id") != build_id:
+                _send(connection, {"error": "repoma has been upgraded"})
+                return
+            if command == "stop":
+                _send(connection, {"stopped": os.getpid()})
+                return
+            if command == "status":
+                _send(
+                    connection,
+                    {"pid": os.getpid(), "build_id": build_id, "since": started},
+                )
+                continue
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    server.close()
+                    _send(connection, _handle(message))
+                finally:
+                    os._exit(0)  # pylint: disable=protected-access
+            children.add(pid)
+
+
+def _handle(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a hook in a forked process, as if it were started from the client."""
+    if message.get("command") != "run" or message.get("hook") not in HOOKS:
+        return {"error": f"Invalid request: {message}"}
+    os.chdir(message["cwd"])
+    os.environ.clear()
+    os.environ.update(message["env"])
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            exit_code = run_hook(message["hook"], message["argv"])
+        except SystemExit as exception:
+            exit_code = _get_exit_code(exception)
+        except Exception:  # pylint: disable=broad-except
+            traceback.print_exc()
+            exit_code = 1
+    return {
+        "exit_code": exit_code,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+    }
+
+
+def _get_exit_code(exception: SystemExit) -> int:
+    """Convert the code of a `SystemExit` like the interpreter does.
+
+    >>> _get_exit_code(SystemExit(2)), _get_exit_code(SystemExit("error"))
+    (2, 1)
+    >>> _get_exit_code(SystemExit())
+    0
+    """
+    if exception.code is None:
+        return 0
+    if isinstance(exception.code, int):
+        return exception.code
+    print(exception.code, file=sys.stderr)
+    return 1
+
+
+def _send(connection: socket.socket, response: Dict[str, Any]) -> None:
+    connection.sendall(json.dumps(response).encode())
+
+
+def _has_exited(pid: int) -> bool:
+    try:
+        exited_pid, _ = os.waitpid(pid, os.WNOHANG)
+    except ChildProcessError:
+        return True
+    return exited_pid == pid
+
+
+def _warm_up() -> None:
+    """Import everything that the hooks need, so that forked processes share it."""
+    # pylint: disable=import-outside-toplevel
+    import nbformat
+
+    from repoma.check_dev_files import create_registry
+    from repoma.utilities.templates import list_templates
+
+    for hook in HOOKS:
+        module_name = HOOKS[hook].partition(":")[0]
+        importlib.import_module(module_name)
+    registry = create_registry()
+    for name in registry.names:
+        registry.get(name).load()
+    list_templates(".github")
+    nbformat.validator.get_validator(version=4, version_minor=4)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,10 +9,23 @@ import sys
 from textwrap import dedent
 from typing import Optional, Sequence
 
-import nbformat
-
 from .errors import PrecommitError
+from .utilities.cli import (
+    add_diff_arguments,
+    add_format_argument,
+    add_memory_profile_argument,
+    add_staged_argument,
+    add_trace_argument,
+    commit_or_diff,
+    is_diff_mode,
+    profile_memory,
+    trace_to_file,
+    write_findings,
+)
 from .utilities.executor import Executor
+from .utilities.memory import measure_memory
+from .utilities.notebook import read_notebook, write_notebook
+from .utilities.snapshot import RepositorySnapshot
 
 BINARY_CELL_OUTPUT = [
     "image/jpeg",
@@ -24,31 +37,47 @@ BINARY_CELL_OUTPUT = [
 def main(argv: Optional[Sequence[str]] = None) -> int:
     parser = argparse.ArgumentParser(__doc__)
     parser.add_argument("filenames", nargs="*", help="Filenames to fix.")
+    add_diff_arguments(parser)
+    add_format_argument(parser)
+    add_memory_profile_argument(parser)
+    add_staged_argument(parser)
+    add_trace_argument(parser)
     args = parser.parse_args(argv)
-    executor = Executor()
-    for filename in args.filenames:
-        executor(set_nbformat_version, filename)
-        executor(remove_cell_ids, filename)
-        executor(check_svg_output_cells, filename)
-    if executor.error_messages:
-        print(executor.merge_messages())
-        return 1
-    return 0
+    with trace_to_file(args.trace, "fix-nbformat-version"), profile_memory(
+        args.memory_profile
+    ), write_findings(args.format) as writer:
+        executor = Executor(on_finding=None if writer is None else writer.write)
+        with RepositorySnapshot(read_staged=args.staged).activate() as snapshot:
+            for filename in args.filenames:
+                with measure_memory(filename):
+                    executor(set_nbformat_version, filename)
+                    executor(remove_cell_ids, filename)
+                    executor(check_svg_output_cells, filename)
+                snapshot.flush(filename, write=not is_diff_mode(args))
+        exit_code = 0
+        if executor.error_messages:
+            if writer is None:
+                print(executor.merge_messages())
+            exit_code = 1
+        return commit_or_diff(snapshot, args, exit_code)
 
 
 def set_nbformat_version(filename: str) -> None:
     notebook = open_notebook(filename)
     if notebook["nbformat_minor"] != 4:
         notebook["nbformat_minor"] = 4
-        nbformat.write(notebook, filename)
+        write_notebook(notebook, filename)
 
 
 def remove_cell_ids(filename: str) -> None:
     notebook = open_notebook(filename)
+    has_ids = False
     for cell in notebook["cells"]:
         if "id" in cell:
             del cell["id"]
-    nbformat.write(notebook, filename)
+            has_ids = True
+    if has_ids:
+        write_notebook(notebook, filename)
 
 
 def check_svg_output_cells(filename: str) -> None:
@@ -71,7 +100,7 @@ def check_svg_output_cells(filename: str) -> None:
 
 
 def open_notebook(filename: str) -> dict:
-    return nbformat.read(filename, as_version=nbformat.NO_CONVERT)
+    return read_notebook(filename)
 
 
 if __name__ == "__main__":
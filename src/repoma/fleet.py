@@ -0,0 +1,299 @@
+"""Check many local clones of repositories at once.
+
+.. code-block:: shell
+
+    repoma-fleet ~/git/ComPWA/* --jobs 8
+
+Each repository is checked with the arguments of the :code:`check-dev-files`
+hook in its :file:`.pre-commit-config.yaml`. The repositories are distributed
+over a pool of worker processes, each of which loads the bundled templates only
+once. No files are modified unless :code:`--fix` is given.
+
+The output is a summary per repository, followed by a drift report that lists
+which files differ from what repoma expects and which checks reported problems,
+in how many of the repositories.
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+import attr
+
+from repoma.api import Options, Report
+from repoma.utilities import CONFIG_PATH
+from repoma.utilities.cli import add_format_argument, write_findings
+from repoma.utilities.findings import Finding, FindingWriter
+
+
+@attr.s(frozen=True)
+class RepositoryResult:
+    """Report of one repository, or the reason why it could not be checked."""
+
+    root: str = attr.ib()
+    report: Optional[Report] = attr.ib(default=None)
+    error: Optional[str] = attr.ib(default=None)
+    findings: List[Finding] = attr.ib(factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return self.report is not None and self.report.passed
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(__doc__)
+    parser.add_argument(
+        "repositories",
+        nargs="+",
+        help="Root directories of repositories, or glob patterns that match them.",
+        metavar="REPO",
+    )
+    parser.add_argument(
+        "--fix",
+        default=False,
+        action="store_true",
+        help="Write the fixes to the repositories instead of only reporting them.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        default=0,
+        help="Number of worker processes. Use 0 to run one process per CPU.",
+        type=int,
+    )
+    parser.add_argument(
+        "--no-cache",
+        default=False,
+        action="store_true",
+        help="Do not reuse the results of previous runs in each repository.",
+    )
+    parser.add_argument(
+        "--verbose",
+        default=False,
+        action="store_true",
+        help="Print the problems that the checks reported for each repository.",
+    )
+    add_format_argument(parser)
+    args = parser.parse_args(argv)
+    roots = _find_repositories(args.repositories)
+    if not roots:
+        parser.error("None of the given paths is a directory")
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    start = time.perf_counter()
+    with write_findings(args.format) as writer:
+        results = check_repositories(
+            roots,
+            fix=args.fix,
+            use_cache=not args.no_cache,
+            jobs=jobs,
+            collect_findings=writer is not None,
+        )
+        if writer is not None:
+            _write_findings(writer, results)
+    elapsed = time.perf_counter() - start
+    output = sys.stdout if writer is None else sys.stderr
+    for result in results:
+        print(_summarize(result, fix=args.fix), file=output)
+        if args.verbose and result.report is not None and result.report.error_messages:
+            print(_indent(result.report.merge_messages()), file=output)
+    print(file=output)
+    print(create_drift_report(results), file=output)
+    print(f"Checked {len(results)} repositories in {elapsed:.1f}s", file=output)
+    return 0 if all(result.passed for result in results) else 1
+
+
+def check_repositories(
+    roots: Sequence[str],
+    fix: bool = False,
+    use_cache: bool = True,
+    jobs: int = 1,
+    collect_findings: bool = False,
+) -> List[RepositoryResult]:
+    """Check repositories in a pool of processes, see `check_repository`."""
+    if jobs <= 1 or len(roots) <= 1:
+        return [
+            check_repository(root, fix, use_cache, collect_findings) for root in roots
+        ]
+    # pylint: disable=import-outside-toplevel
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+
+    _initialize_worker()  # forked workers inherit the loaded templates
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(roots)), initializer=_initialize_worker
+    ) as pool:
+        function = partial(
+            check_repository,
+            fix=fix,
+            use_cache=use_cache,
+            collect_findings=collect_findings,
+        )
+        return list(pool.map(function, roots))
+
+
+def check_repository(
+    root: str, fix: bool = False, use_cache: bool = True, collect_findings: bool = False
+) -> RepositoryResult:
+    """Run the checks on a repository as its :code:`check-dev-files` hook would.
+
+    The `.Finding` instances of the checks are only collected if
+    :code:`collect_findings` is set.
+    """
+    from repoma.api import check  # pylint: disable=import-outside-toplevel
+
+    try:
+        options = _get_options(root)
+        options = attr.evolve(options, jobs=1, use_cache=use_cache, write=fix)
+        findings: List[Finding] = []
+        on_finding = findings.append if collect_findings else None
+        report = check(root, options, on_finding)
+        return RepositoryResult(root, report=report, findings=findings)
+    except Exception as exception:  # pylint: disable=broad-except
+        return RepositoryResult(root, error=f"{type(exception).__name__}: {exception}")
+
+
+def create_drift_report(results: Sequence[RepositoryResult]) -> str:
+    """List how many repositories have each modified file and each failing check.
+
+    >>> results = [
+    ...     RepositoryResult("a", Report("a", modified_files=[".cspell.json"])),
+    ...     RepositoryResult("b", Report("b", modified_files=[".cspell.json"])),
+    ...     RepositoryResult("c", error="ValueError: invalid"),
+    ... ]
+    >>> print(create_drift_report(results))
+    Drift in 2 of 3 repositories:
+      .cspell.json  2
+    Could not check 1 repository
+    """
+    reports = [result.report for result in results if result.report is not None]
+    file_counts = Counter(path for r in reports for path in r.modified_files)
+    check_counts = Counter(
+        result.name for r in reports for result in r.results if not result.passed
+    )
+    drifted = sum(1 for r in reports if r.modified_files or not r.passed)
+    lines = [f"Drift in {drifted} of {len(results)} repositories:"]
+    if file_counts:
+        lines.extend(_format_counts(file_counts))
+    if check_counts:
+        lines.append("Checks that reported problems:")
+        lines.extend(_format_counts(check_counts))
+    errors = len(results) - len(reports)
+    if errors:
+        lines.append(f"Could not check {errors} {_pluralize(errors, 'repository')}")
+    return "\n".join(lines)
+
+
+def _write_findings(writer: FindingWriter, results: Iterable[RepositoryResult]) -> None:
+    """Write the findings of all repositories, with paths relative to the cwd.
+
+    A repository that could not be checked is reported as a finding of its root.
+    """
+    for result in results:
+        if result.error is not None:
+            writer.write(Finding("repoma-fleet", result.error, result.root))
+        for finding in result.findings:
+            file = os.path.join(result.root, finding.file or "")
+            writer.write(attr.evolve(finding, file=Path(file).as_posix()))
+
+
+def _find_repositories(patterns: Iterable[str]) -> List[str]:
+    roots: List[str] = []
+    for pattern in patterns:
+        paths = sorted(glob.glob(os.path.expanduser(pattern))) or [pattern]
+        roots.extend(p for p in paths if os.path.isdir(p) and p not in roots)
+    return roots
+
+
+def _get_options(root: str) -> Options:
+    """Get the options of the :code:`check-dev-files` hook of a repository."""
+    # pylint: disable=import-outside-toplevel
+    from repoma.check_dev_files import create_argument_parser, create_options
+
+    parser = create_argument_parser()
+    hook_args = _get_hook_args(os.path.join(root, CONFIG_PATH.precommit))
+    stderr = io.StringIO()
+    try:
+        with contextlib.redirect_stderr(stderr):
+            args = parser.parse_args(hook_args)
+    except SystemExit as exception:
+        message = stderr.getvalue().strip().splitlines()[-1]
+        raise ValueError(f"Invalid check-dev-files arguments, {message}") from exception
+    return create_options(args, root)
+
+
+def _get_hook_args(precommit_config: str) -> List[str]:
+    if not os.path.isfile(precommit_config):
+        return []
+    # pylint: disable=import-outside-toplevel
+    from repoma.utilities.yaml import load_yaml
+
+    with open(precommit_config) as stream:
+        config = load_yaml(stream.read()) or {}
+    for repo in config.get("repos", []):
+        for hook in repo.get("hooks", []):
+            if hook.get("id") == "check-dev-files":
+                return [str(arg) for arg in hook.get("args", [])]
+    return []
+
+
+def _initialize_worker() -> None:
+    from repoma.utilities.templates import (  # pylint: disable=import-outside-toplevel
+        list_templates,
+    )
+
+    list_templates(".github")
+
+
+def _summarize(result: RepositoryResult, fix: bool) -> str:
+    """Summarize the result of one repository on a single line.
+
+    >>> _summarize(RepositoryResult("repo", Report("/repo")), fix=False)
+    'repo: OK'
+    """
+    if result.report is None:
+        return f"{result.root}: {result.error}"
+    report = result.report
+    problems = []
+    failed = sum(1 for r in report.results if r.error_message is not None)
+    if failed:
+        problems.append(f"{failed} {_pluralize(failed, 'check')} reported problems")
+    if report.timed_out:
+        problems.append(f"{len(report.timed_out)} timed out")
+    if report.modified_files:
+        n_files = len(report.modified_files)
+        verb = "fixed" if fix else "would change"
+        problems.append(f"{n_files} {_pluralize(n_files, 'file')} {verb}")
+    return f"{result.root}: {', '.join(problems) or 'OK'}"
+
+
+def _format_counts(counts: Counter) -> List[str]:
+    width = max(len(name) for name in counts)
+    return [f"  {name:<{width}}  {count}" for name, count in counts.most_common()]
+
+
+def _pluralize(count: int, noun: str) -> str:
+    """Pluralize a noun for a count.
+
+    >>> _pluralize(1, "check"), _pluralize(2, "check"), _pluralize(2, "repository")
+    ('check', 'checks', 'repositories')
+    """
+    if count == 1:
+        return noun
+    if noun.endswith("y"):
+        return noun[:-1] + "ies"
+    return noun + "s"
+
+
+def _indent(text: str) -> str:
+    return "\n".join(f"    {line}" if line else line for line in text.splitlines())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,7 +10,18 @@ from typing import Optional, Sequence, Union
 
 from repoma.utilities import CONFIG_PATH
 from repoma.utilities.cfg import format_config
+from repoma.utilities.cli import (
+    add_diff_arguments,
+    add_format_argument,
+    add_staged_argument,
+    add_trace_argument,
+    commit_or_diff,
+    trace_to_file,
+    write_findings,
+)
+from repoma.utilities.findings import record
 from repoma.utilities.setup_cfg import open_setup_cfg
+from repoma.utilities.snapshot import RepositorySnapshot
 
 
 def format_setup_cfg() -> None:
@@ -19,10 +30,11 @@ def format_setup_cfg() -> None:
 
 
 def write_formatted_setup_cfg(cfg: ConfigParser) -> None:
-    with open(CONFIG_PATH.setup_cfg, "w") as stream:
-        cfg.write(stream)
+    stream = io.StringIO()
+    cfg.write(stream)
+    stream.seek(0)
     _format_setup_cfg(
-        input=CONFIG_PATH.setup_cfg,
+        input=stream,
         output=CONFIG_PATH.setup_cfg,
     )
 
@@ -49,10 +61,19 @@ def _format_setup_cfg(
 def main(argv: Optional[Sequence[str]] = None) -> int:
     parser = argparse.ArgumentParser(__doc__)
     parser.add_argument("filenames", nargs="*", help="Filenames to check.")
+    add_diff_arguments(parser)
+    add_format_argument(parser)
+    add_staged_argument(parser)
+    add_trace_argument(parser)
     args = parser.parse_args(argv)
-    if str(CONFIG_PATH.setup_cfg) in args.filenames:
-        format_setup_cfg()
-    return 0
+    with trace_to_file(args.trace, "format-setup-cfg"), write_findings(
+        args.format
+    ) as writer:
+        with RepositorySnapshot(read_staged=args.staged).activate() as snapshot:
+            if str(CONFIG_PATH.setup_cfg) in args.filenames:
+                with record(writer, "format-setup-cfg", CONFIG_PATH.setup_cfg):
+                    format_setup_cfg()
+        return commit_or_diff(snapshot, args, exit_code=0)
 
 
 if __name__ == "__main__":
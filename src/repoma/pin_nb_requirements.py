@@ -10,15 +10,29 @@ import argparse
 import sys
 from typing import List, Optional, Sequence
 
-import nbformat
-
 from .errors import PrecommitError
+from .utilities.cli import (
+    add_diff_arguments,
+    add_format_argument,
+    add_memory_profile_argument,
+    add_staged_argument,
+    add_trace_argument,
+    commit_or_diff,
+    is_diff_mode,
+    profile_memory,
+    trace_to_file,
+    write_findings,
+)
+from .utilities.findings import record
+from .utilities.memory import measure_memory
+from .utilities.notebook import read_notebook
+from .utilities.snapshot import RepositorySnapshot
 
 __PIP_INSTALL_STATEMENT = "%pip install -q "
 
 
 def check_pinned_requirements(filename: str) -> None:
-    notebook = nbformat.read(filename, as_version=nbformat.NO_CONVERT)
+    notebook = read_notebook(filename)
     for cell in notebook["cells"]:
         if cell["cell_type"] != "code":
             continue
@@ -96,20 +110,35 @@ def __check_metadata(filename: str, metadata: dict) -> None:
 def main(argv: Optional[Sequence[str]] = None) -> int:
     parser = argparse.ArgumentParser(__doc__)
     parser.add_argument("filenames", nargs="*", help="Filenames to check.")
+    add_diff_arguments(parser)
+    add_format_argument(parser)
+    add_memory_profile_argument(parser)
+    add_staged_argument(parser)
+    add_trace_argument(parser)
     args = parser.parse_args(argv)
 
-    errors: List[PrecommitError] = []
-    for filename in args.filenames:
-        try:
-            check_pinned_requirements(filename)
-        except PrecommitError as exception:
-            errors.append(exception)
-    if errors:
-        for error in errors:
-            error_msg = "\n ".join(error.args)
-            print(error_msg)
-        return 1
-    return 0
+    with trace_to_file(args.trace, "pin-nb-requirements"), profile_memory(
+        args.memory_profile
+    ), write_findings(args.format) as writer:
+        errors: List[PrecommitError] = []
+        with RepositorySnapshot(read_staged=args.staged).activate() as snapshot:
+            for filename in args.filenames:
+                try:
+                    with measure_memory(filename), record(
+                        writer, "pin-nb-requirements", filename
+                    ):
+                        check_pinned_requirements(filename)
+                except PrecommitError as exception:
+                    errors.append(exception)
+                snapshot.flush(filename, write=not is_diff_mode(args))
+        exit_code = 0
+        if errors:
+            if writer is None:
+                for error in errors:
+                    error_msg = "\n ".join(error.args)
+                    print(error_msg)
+            exit_code = 1
+        return commit_or_diff(snapshot, args, exit_code)
 
 
 if __name__ == "__main__":
@@ -23,12 +23,23 @@ import sys
 from textwrap import dedent
 from typing import Optional, Sequence
 
-import nbformat
-
+from repoma.utilities.cli import (
+    add_diff_arguments,
+    add_format_argument,
+    add_memory_profile_argument,
+    add_staged_argument,
+    add_trace_argument,
+    commit_or_diff,
+    is_diff_mode,
+    profile_memory,
+    trace_to_file,
+    write_findings,
+)
+from repoma.utilities.findings import record
+from repoma.utilities.memory import measure_memory
+from repoma.utilities.notebook import read_notebook, write_notebook
 from repoma.utilities.setup_cfg import open_setup_cfg
-
-__SETUP_CFG = open_setup_cfg()
-__PACKAGE_NAME = __SETUP_CFG["metadata"]["name"]
+from repoma.utilities.snapshot import RepositorySnapshot
 
 __CONFIG_CELL_CONTENT = """
 %config InlineBackend.figure_formats = ['svg']
@@ -45,9 +56,9 @@ __CONFIG_CELL_METADATA: dict = {
     "tags": ["remove-cell"],
 }
 
-__INSTALL_CELL_CONTENT = f"""
-# WARNING: advised to install a specific version, e.g. {__PACKAGE_NAME}==0.1.2
-%pip install -q {__PACKAGE_NAME}
+__INSTALL_CELL_CONTENT = """
+# WARNING: advised to install a specific version, e.g. {package_name}==0.1.2
+%pip install -q {package_name}
 """
 __INSTALL_CELL_METADATA: dict = {
     **__CONFIG_CELL_METADATA,
@@ -91,40 +102,59 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
         action="store_true",
         help="Do not add configuration cell.",
     )
+    add_diff_arguments(parser)
+    add_format_argument(parser)
+    add_memory_profile_argument(parser)
+    add_staged_argument(parser)
+    add_trace_argument(parser)
     args = parser.parse_args(argv)
 
-    for filename in args.filenames:
-        cell_id = 0
-        if args.add_install_cell:
-            cell_content = __INSTALL_CELL_CONTENT.strip("\n")
-            if args.extras_require:
-                extras = args.extras_require.strip()
-                cell_content += f"[{extras}]"
-            if args.additional_packages:
-                packages = [s.strip() for s in args.additional_packages.split(",")]
-                cell_content += " " + " ".join(packages)
-            _update_cell(
-                filename,
-                new_content=cell_content,
-                new_metadata=__INSTALL_CELL_METADATA,
-                cell_id=cell_id,
-            )
-            cell_id += 1
-        if not args.no_config_cell:
-            config_cell_content = __CONFIG_CELL_CONTENT
-            if "ipython" in args.additional_packages.lower():
-                config_cell_content = config_cell_content.replace(
-                    "import os",
-                    "import os\n\nfrom IPython.display import display  # noqa: F401",
-                )
-            _update_cell(
-                filename,
-                new_content=config_cell_content.strip("\n"),
-                new_metadata=__CONFIG_CELL_METADATA,
-                cell_id=cell_id,
-            )
-        _insert_autolink_concat(filename)
-    return 0
+    with trace_to_file(args.trace, "set-nb-cells"), profile_memory(
+        args.memory_profile
+    ), write_findings(args.format) as writer:
+        with RepositorySnapshot(read_staged=args.staged).activate() as snapshot:
+            for filename in args.filenames:
+                with measure_memory(filename), record(writer, "set-nb-cells", filename):
+                    cell_id = 0
+                    if args.add_install_cell:
+                        cell_content = _get_install_cell_content()
+                        if args.extras_require:
+                            extras = args.extras_require.strip()
+                            cell_content += f"[{extras}]"
+                        if args.additional_packages:
+                            packages = [
+                                s.strip() for s in args.additional_packages.split(",")
+                            ]
+                            cell_content += " " + " ".join(packages)
+                        _update_cell(
+                            filename,
+                            new_content=cell_content,
+                            new_metadata=__INSTALL_CELL_METADATA,
+                            cell_id=cell_id,
+                        )
+                        cell_id += 1
+                    if not args.no_config_cell:
+                        config_cell_content = __CONFIG_CELL_CONTENT
+                        if "ipython" in args.additional_packages.lower():
+                            config_cell_content = config_cell_content.replace(
+                                "import os",
+                                "import os\n\nfrom IPython.display import display  #"
+                                " noqa: F401",
+                            )
+                        _update_cell(
+                            filename,
+                            new_content=config_cell_content.strip("\n"),
+                            new_metadata=__CONFIG_CELL_METADATA,
+                            cell_id=cell_id,
+                        )
+                    _insert_autolink_concat(filename)
+                snapshot.flush(filename, write=not is_diff_mode(args))
+        return commit_or_diff(snapshot, args, exit_code=0)
+
+
+def _get_install_cell_content() -> str:
+    package_name = open_setup_cfg()["metadata"]["name"]
+    return __INSTALL_CELL_CONTENT.format(package_name=package_name).strip("\n")
 
 
 def _update_cell(
@@ -135,7 +165,9 @@ def _update_cell(
 ) -> None:
     if _skip_notebook(filename):
         return
-    notebook = nbformat.read(filename, as_version=nbformat.NO_CONVERT)
+    import nbformat  # pylint: disable=import-outside-toplevel
+
+    notebook = read_notebook(filename)
     exiting_cell = notebook["cells"][cell_id]
     new_cell = nbformat.v4.new_code_cell(
         new_content,
@@ -147,13 +179,15 @@ def _update_cell(
     else:
         notebook["cells"].insert(cell_id, new_cell)
     nbformat.validate(notebook)
-    nbformat.write(notebook, filename)
+    write_notebook(notebook, filename)
 
 
 def _insert_autolink_concat(filename: str) -> None:
     if _skip_notebook(filename, ignore_statement="<!-- no autolink-concat -->"):
         return
-    notebook = nbformat.read(filename, as_version=nbformat.NO_CONVERT)
+    import nbformat  # pylint: disable=import-outside-toplevel
+
+    notebook = read_notebook(filename)
     expected_cell_content = """
     ```{autolink-concat}
     ```
@@ -169,14 +203,14 @@ def _insert_autolink_concat(filename: str) -> None:
         del new_cell["id"]  # following nbformat_minor = 4
         notebook["cells"].insert(cell_id, new_cell)
         nbformat.validate(notebook)
-        nbformat.write(notebook, filename)
+        write_notebook(notebook, filename)
         return
 
 
 def _skip_notebook(
     filename: str, ignore_statement: str = "<!-- no-set-nb-cells -->"
 ) -> bool:
-    notebook = nbformat.read(filename, as_version=nbformat.NO_CONVERT)
+    notebook = read_notebook(filename)
     for cell in notebook["cells"]:
         if cell["cell_type"] != "markdown":
             continue
@@ -3,12 +3,16 @@
 import io
 import os
 import re
+import shutil
 from pathlib import Path
-from typing import List, NamedTuple, Union
+from typing import Callable, List, NamedTuple, TypeVar, Union
 
 import repoma
 from repoma.errors import PrecommitError
 
+from .snapshot import RepositorySnapshot, get_active_snapshot, write_if_changed
+from .trace import span
+
 
 class _ConfigFilePaths(NamedTuple):
     cspell: Path = Path(".cspell.json")
@@ -30,39 +34,123 @@ class _ConfigFilePaths(NamedTuple):
 
 
 CONFIG_PATH = _ConfigFilePaths()
+T = TypeVar("T")
 
 REPOMA_DIR = Path(repoma.__file__).parent.absolute()
 
 
 def read(input: Union[Path, io.TextIOBase, str]) -> str:  # noqa: A002
     if isinstance(input, (Path, str)):
-        with open(input) as input_stream:
-            return input_stream.read()
+        with span("read", "io", path=input):
+            snapshot = get_active_snapshot()
+            if snapshot is not None:
+                return snapshot.read_text(input)
+            with open(input) as input_stream:
+                return input_stream.read()
     if isinstance(input, io.TextIOBase):
         return input.read()
     raise TypeError(f"Cannot read from {type(input).__name__}")
 
 
+def exists(path: Union[Path, str]) -> bool:
+    """Check whether a file exists, through the active snapshot if there is one."""
+    snapshot = get_active_snapshot()
+    if snapshot is not None:
+        return snapshot.exists(path)
+    return os.path.isfile(path)
+
+
+def is_directory(path: Union[Path, str]) -> bool:
+    """Check whether a directory exists, through the active snapshot if there is one."""
+    snapshot = get_active_snapshot()
+    if snapshot is not None:
+        return snapshot.is_directory(path)
+    return os.path.isdir(path)
+
+
+def glob(pattern: str) -> List[Path]:
+    """Find the files that match a pattern, relative to the repository root."""
+    snapshot = get_active_snapshot()
+    if snapshot is None:
+        snapshot = RepositorySnapshot()
+    return [Path(path) for path in snapshot.glob(pattern)]
+
+
+def parse(path: Union[Path, str], parser: Callable[[str], T]) -> T:
+    """Parse the content of a file, through the active snapshot if there is one.
+
+    See `.RepositorySnapshot.parse`.
+    """
+    with span("parse", "parse", path=path, parser=parser.__name__):
+        snapshot = get_active_snapshot()
+        if snapshot is not None:
+            return snapshot.parse(path, parser)
+        return parser(read(path))
+
+
 def write(content: str, target: Union[Path, io.TextIOBase, str]) -> None:
-    if isinstance(target, str):
-        target = Path(target)
-    if isinstance(target, Path):
-        target.parent.mkdir(exist_ok=True)
-        with open(target, "w") as output_stream:
-            output_stream.write(content)
+    """Write text to a file or stream.
+
+    If there is an active `.RepositorySnapshot`, the file is only written once
+    that snapshot is committed. Files are not rewritten if their content does not
+    change.
+    """
+    if isinstance(target, (Path, str)):
+        with span("write", "io", path=target):
+            snapshot = get_active_snapshot()
+            if snapshot is not None:
+                snapshot.write_text(target, content)
+            else:
+                write_if_changed(target, content.encode())
     elif isinstance(target, io.TextIOBase):
         target.write(content)
     else:
         raise TypeError(f"Cannot write from {type(target).__name__}")
 
 
+def remove(path: Union[Path, str]) -> None:
+    """Remove a file or a directory with all of its content."""
+    snapshot = get_active_snapshot()
+    if snapshot is not None:
+        snapshot.remove(path)
+    elif os.path.isdir(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+
 def rename_file(old: str, new: str) -> None:
     """Rename a file and raise a `.PrecommitError`."""
-    if os.path.exists(old):
-        os.rename(old, new)
+    if exists(old):
+        snapshot = get_active_snapshot()
+        if snapshot is not None:
+            snapshot.rename(old, new)
+        else:
+            os.rename(old, new)
         raise PrecommitError(f"File {old} has been renamed to {new}")
 
 
+def list_files(directory: Union[Path, str]) -> List[str]:
+    """List all files under a directory, relative to that directory."""
+    snapshot = get_active_snapshot()
+    if snapshot is None:
+        return sorted(
+            os.path.relpath(os.path.join(root, filename), directory)
+            for root, _, filenames in os.walk(directory)
+            for filename in filenames
+        )
+    if not snapshot.is_directory(directory):
+        return []
+    files: List[str] = []
+    for name in snapshot.listdir(directory):
+        path = os.path.join(directory, name)
+        if snapshot.is_directory(path):
+            files.extend(os.path.join(name, f) for f in list_files(path))
+        else:
+            files.append(name)
+    return files
+
+
 def natural_sorting(text: str) -> List[Union[float, str]]:
     # https://stackoverflow.com/a/5967539/13219025
     return [
@@ -0,0 +1,159 @@
+"""Persistent cache of check results, keyed by the content of their files.
+
+A check that is executed on the same files with the same arguments and the
+same version of repoma gives the same result, so there is no need to run it
+again. `ResultCache` stores the result of each check under a fingerprint of its
+input, see `ResultCache.fingerprint`.
+"""
+
+import hashlib
+import importlib
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import attr
+
+from . import REPOMA_DIR
+from .snapshot import RepositorySnapshot, get_active_snapshot
+from .trace import span
+
+CACHE_DIR = Path(".cache/repoma")
+_FORMAT_VERSION = 1
+
+
+@attr.s
+class ResultCache:
+    """Results of checks, stored in a JSON file.
+
+    Only the entries that were used or added in the current run are written back
+    by `save`, so the cache file does not grow over time.
+    """
+
+    path: Path = attr.ib(default=CACHE_DIR / "check-dev-files.json", converter=Path)
+    hits: int = attr.ib(default=0, init=False)
+    misses: int = attr.ib(default=0, init=False)
+    _stored: Dict[str, Optional[str]] = attr.ib(factory=dict, init=False)
+    _used: Dict[str, Optional[str]] = attr.ib(factory=dict, init=False)
+    _saved: Optional[Dict[str, Optional[str]]] = attr.ib(default=None, init=False)
+    _lock: threading.Lock = attr.ib(factory=threading.Lock, init=False)
+
+    def __attrs_post_init__(self) -> None:
+        try:
+            with open(self.path) as stream:
+                content = json.load(stream)
+        except (OSError, ValueError):
+            return
+        if content.get("format") == _FORMAT_VERSION:
+            self._stored.update(content.get("results", {}))
+            self._saved = dict(self._stored)
+
+    def fingerprint(
+        self, name: str, paths: Iterable[str], arguments: Any
+    ) -> Optional[str]:
+        """Compute a key from the input of a check.
+
+        The key is a hash of the name of the check, the :func:`repr` of its
+        arguments, the content of all files that match ``paths``, and the
+        version and bundled files of repoma itself.
+
+        Returns `None` if one of the files has been modified with
+        `.RepositorySnapshot.write_later` and has not been rendered yet. Such a
+        file is being fixed in the current run, so rendering it just to hash it
+        would only cost time.
+        """
+        with span("fingerprint", "cache", check=name):
+            expanded_paths = sorted(set(_expand(paths)))
+            snapshot = _get_snapshot()
+            if any(snapshot.is_deferred(path) for path in expanded_paths):
+                return None
+            hasher = hashlib.sha256()
+            hasher.update(_get_repoma_digest().encode())
+            hasher.update(f"\0{name}\0{arguments!r}\0".encode())
+            for path in expanded_paths:
+                hasher.update(_hash_path(path).encode())
+            return hasher.hexdigest()
+
+    def get(self, key: str) -> Tuple[bool, Optional[str]]:
+        """Get the error message of a cached result, if there is one."""
+        with self._lock:
+            if key in self._stored:
+                self.hits += 1
+                self._used[key] = self._stored[key]
+                return True, self._stored[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: str, error_message: Optional[str]) -> None:
+        with self._lock:
+            self._stored[key] = error_message
+            self._used[key] = error_message
+
+    def save(self) -> None:
+        """Write the used entries to the cache file, if they differ from its content."""
+        with self._lock:
+            used = dict(self._used)
+        if used == self._saved:
+            return
+        os.makedirs(self.path.parent, exist_ok=True)
+        gitignore = self.path.parent / ".gitignore"
+        if not gitignore.exists():
+            gitignore.write_text("# Created by repoma\n*\n")
+        content = {"format": _FORMAT_VERSION, "results": used}
+        with open(self.path, "w") as stream:
+            json.dump(content, stream, indent=0, sort_keys=True)
+        self._saved = used
+
+    def summary(self) -> str:
+        return f"Cache: {self.hits} hits, {self.misses} misses"
+
+
+def _expand(patterns: Iterable[str]) -> List[str]:
+    paths = []
+    for pattern in patterns:
+        if not any(c in pattern for c in "*?["):
+            paths.append(pattern)
+            continue
+        if pattern.endswith("**"):
+            pattern += "/*"
+        paths.extend(_get_snapshot().glob(pattern))
+    return paths
+
+
+def _hash_path(path: str) -> str:
+    snapshot = _get_snapshot()
+    if snapshot.exists(path):
+        content = snapshot.read_bytes(path)
+        return f"\0file:{path}\0{hashlib.sha256(content).hexdigest()}"
+    if snapshot.is_directory(path):
+        listing = "\n".join(snapshot.listdir(path))
+        return f"\0dir:{path}\0{listing}"
+    return f"\0missing:{path}"
+
+
+def _get_snapshot() -> RepositorySnapshot:
+    snapshot = get_active_snapshot()
+    if snapshot is None:
+        return RepositorySnapshot()
+    return snapshot
+
+
+@lru_cache(maxsize=None)
+def _get_repoma_digest() -> str:
+    hasher = hashlib.sha256()
+    try:
+        version_module = importlib.import_module("repoma.version")
+        hasher.update(str(version_module.version).encode())  # type: ignore[attr-defined]
+    except ImportError:
+        pass
+    for directory, subdirectories, filenames in os.walk(REPOMA_DIR):
+        subdirectories[:] = sorted(d for d in subdirectories if d != "__pycache__")
+        for filename in sorted(filenames):
+            path = os.path.join(directory, filename)
+            hasher.update(os.path.relpath(path, REPOMA_DIR).encode())
+            with open(path, "rb") as stream:
+                hasher.update(stream.read())
+    return hasher.hexdigest()
@@ -8,7 +8,7 @@ from typing import Callable, Iterable, List, Optional, Tuple, Union
 
 from repoma.errors import PrecommitError
 
-from . import CONFIG_PATH, read, write
+from . import CONFIG_PATH, exists, parse, read, write
 
 
 def copy_config(cfg: ConfigParser) -> ConfigParser:
@@ -52,9 +52,10 @@ def __split_config(
 
 
 def __write_config(cfg: ConfigParser, output_path: Union[Path, str]) -> None:
-    with open(output_path, "w") as stream:
-        cfg.write(stream)
-    format_config(input=output_path, output=output_path)
+    stream = io.StringIO()
+    cfg.write(stream)
+    stream.seek(0)
+    format_config(input=stream, output=output_path)
 
 
 def format_config(
@@ -83,23 +84,26 @@ def format_config(
 
 
 def open_config(definition: Union[Path, io.TextIOBase, str]) -> ConfigParser:
-    cfg = ConfigParser()
+    """Parse a config file.
+
+    A config that is loaded from a path is shared by all checks in a run (see
+    `.RepositorySnapshot`), so use `copy_config` before modifying it.
+    """
     if isinstance(definition, io.TextIOBase):
         text = definition.read()
-        cfg.read_string(text)
-    elif isinstance(definition, (Path, str)):
-        if isinstance(definition, str):
-            path = Path(definition)
-        else:
-            path = definition
-        if not path.exists():
-            raise PrecommitError(f'Config file "{path}" does not exist')
-        cfg.read(path)
-    else:
-        raise TypeError(
-            f"Cannot create a {ConfigParser.__name__} from a"
-            f" {type(definition).__name__}"
-        )
+        return _parse_config(text)
+    if isinstance(definition, (Path, str)):
+        if not exists(definition):
+            raise PrecommitError(f'Config file "{definition}" does not exist')
+        return parse(definition, _parse_config)
+    raise TypeError(
+        f"Cannot create a {ConfigParser.__name__} from a {type(definition).__name__}"
+    )
+
+
+def _parse_config(content: str) -> ConfigParser:
+    cfg = ConfigParser()
+    cfg.read_string(content)
     return cfg
 
 
@@ -107,8 +111,9 @@ def write_config(cfg: ConfigParser, output: Union[Path, io.TextIOBase, str]) ->
     if isinstance(output, io.TextIOBase):
         cfg.write(output)
     elif isinstance(output, (Path, str)):
-        with open(output) as stream:
-            cfg.write(stream)
+        stream = io.StringIO()
+        cfg.write(stream)
+        write(stream.getvalue(), output)
     else:
         raise TypeError(
             f"Cannot write a {ConfigParser.__name__} to a {type(output).__name__}"
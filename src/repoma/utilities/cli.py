@@ -0,0 +1,177 @@
+"""Command-line options that are shared by all hooks."""
+
+import argparse
+import sys
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from repoma.errors import PrecommitError
+
+from .findings import FORMATS, FindingWriter, create_writer
+from .memory import MemoryProfiler
+from .snapshot import RepositorySnapshot
+from .trace import Tracer, span
+
+EXIT_CLEAN = 0
+"""Exit code in :code:`--diff` mode if no file would change and there are no errors."""
+EXIT_WOULD_CHANGE = 1
+"""Exit code in :code:`--diff` mode if files would be modified."""
+EXIT_ERRORS = 3
+"""Exit code in :code:`--diff` mode if no file would change, but there are errors."""
+
+
+def add_diff_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--diff",
+        default=False,
+        action="store_true",
+        help=(
+            "Do not modify any files, but print a unified diff of the fixes."
+            f" Exits with {EXIT_CLEAN} if nothing would change, with"
+            f" {EXIT_WOULD_CHANGE} if files would change, and with {EXIT_ERRORS}"
+            " if there are only problems that cannot be fixed automatically."
+        ),
+    )
+    parser.add_argument(
+        "--diff-output",
+        default=None,
+        help=(
+            "Write the diff to this patch file instead of printing it. A diff is"
+            " only printed if the --format is text."
+        ),
+        metavar="PATCH_FILE",
+        type=str,
+    )
+
+
+def add_staged_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--staged",
+        default=False,
+        action="store_true",
+        help=(
+            "Check the content that has been staged in git instead of the content"
+            " in the working tree. Files that are not in the git index are read"
+            " from disk. Combine with --diff to leave unstaged edits untouched."
+        ),
+    )
+
+
+def is_diff_mode(args: argparse.Namespace) -> bool:
+    return args.diff or args.diff_output is not None
+
+
+def commit_or_diff(
+    snapshot: RepositorySnapshot, args: argparse.Namespace, exit_code: int
+) -> int:
+    """Write the changes of a run to disk, or only show them in :code:`--diff` mode.
+
+    Args:
+        snapshot: The snapshot that contains the staged changes.
+        args: Parsed arguments of a parser with :func:`add_diff_arguments`.
+        exit_code: The exit code of the hook if the changes are written.
+
+    Returns:
+        The exit code of the hook.
+    """
+    if not is_diff_mode(args):
+        try:
+            snapshot.commit()
+        except PrecommitError as exception:
+            output_format = getattr(args, "format", "text")
+            print(exception, file=sys.stdout if output_format == "text" else sys.stderr)
+            return 1
+        return exit_code
+    diff = snapshot.diff()
+    if args.diff_output is None:
+        if getattr(args, "format", "text") == "text":
+            sys.stdout.write(diff)
+    else:
+        with open(args.diff_output, "w") as stream:
+            stream.write(diff)
+    if diff:
+        return EXIT_WOULD_CHANGE
+    if exit_code != 0:
+        return EXIT_ERRORS
+    return EXIT_CLEAN
+
+
+def add_format_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default="text",
+        help=(
+            "Report problems and fixed files as lines of JSON or as a SARIF log"
+            " on stdout, instead of as text. Each finding has the name of the"
+            " check, the file, whether it has been fixed, the duration of the"
+            " check and the number of bytes written."
+        ),
+    )
+
+
+@contextmanager
+def write_findings(output_format: str) -> Iterator[Optional[FindingWriter]]:
+    """Create a writer for the :code:`--format`, or `None` for plain text."""
+    writer = create_writer(output_format)
+    if writer is None:
+        yield None
+        return
+    try:
+        yield writer
+    finally:
+        writer.close()
+
+
+def add_trace_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--trace",
+        default=None,
+        help=(
+            "Record where time is spent and write it to this file in Chrome's"
+            " trace-event format, which can be viewed with https://ui.perfetto.dev"
+        ),
+        metavar="TRACE_FILE",
+        type=str,
+    )
+
+
+@contextmanager
+def trace_to_file(output_path: Optional[str], name: str) -> Iterator[None]:
+    """Record spans within this context and dump them if there is an output path."""
+    if output_path is None:
+        yield
+        return
+    tracer = Tracer()
+    try:
+        with tracer.activate(), span(name, "hook"):
+            yield
+    finally:
+        tracer.dump(output_path)
+
+
+def add_memory_profile_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--memory-profile",
+        default=False,
+        action="store_true",
+        help=(
+            "Measure the memory that is allocated per check and per file with"
+            " tracemalloc and print the lines that allocated most memory."
+            " Checks are then executed one after the other."
+        ),
+    )
+
+
+@contextmanager
+def profile_memory(enabled: bool) -> Iterator[None]:
+    """Measure memory within this context and print a report to stderr."""
+    if not enabled:
+        yield
+        return
+    profiler = MemoryProfiler()
+    try:
+        with profiler.activate():
+            yield
+    finally:
+        print(profiler.report(), file=sys.stderr)
@@ -1,25 +1,507 @@
 """Collect `.PrecommitError` instances from several executed functions."""
 
-from typing import Any, Callable, List
+import importlib
+import threading
+import time
+from fnmatch import fnmatch
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 import attr
 
 from repoma.errors import PrecommitError
 
+from .cache import ResultCache
+from .findings import Finding, FindingRecorder
+from .memory import measure_memory
+from .snapshot import RepositorySnapshot, get_active_snapshot
+from .trace import span
+
+T = TypeVar("T")
+
+
+_INTERRUPT_GRACE_PERIOD = 1.0
+"""Seconds to wait for a check to stop after it has been interrupted."""
+
+
+def _to_patterns(paths: Iterable[Union[Path, str]]) -> FrozenSet[str]:
+    return frozenset(Path(p).as_posix() for p in paths)
+
+
+@attr.s(frozen=True)
+class Task:
+    """A function that only touches the files that it declares.
+
+    File paths are relative to the repository root and may contain glob
+    patterns, like :code:`.github/**`.
+
+    The :attr:`function` can also be given as an import path, like
+    :code:`"repoma.check_dev_files.cspell:main"`. The module of that function
+    is then only imported once the task runs.
+    """
+
+    name: str = attr.ib()
+    function: Union[Callable[..., None], str] = attr.ib()
+    reads: FrozenSet[str] = attr.ib(converter=_to_patterns, factory=frozenset)
+    writes: FrozenSet[str] = attr.ib(converter=_to_patterns, factory=frozenset)
+
+    def conflicts_with(self, other: "Task") -> bool:
+        """Check whether this task has to run before or after another task.
+
+        >>> readme = Task("readme", print, writes=["README.md"])
+        >>> github = Task("github", print, reads=[".github/**"])
+        >>> workflow = Task("workflow", print, writes=[".github/workflows/cd.yml"])
+        >>> readme.conflicts_with(github)
+        False
+        >>> github.conflicts_with(workflow)
+        True
+        """
+        return _overlap(self.writes, other.reads | other.writes) or _overlap(
+            other.writes, self.reads
+        )
+
+    def depends_on(self, filenames: Iterable[Union[Path, str]]) -> bool:
+        """Check whether this task reads or writes any of the given files.
+
+        >>> github = Task("github", print, writes=[".github/**"])
+        >>> github.depends_on([".github/workflows/ci.yml", "README.md"])
+        True
+        >>> github.depends_on(["src/repoma/__init__.py"])
+        False
+        """
+        return _overlap(self.reads | self.writes, _to_patterns(filenames))
+
+    def load(self) -> Callable[..., None]:
+        """Get the function of this task, importing it if necessary.
+
+        >>> Task("dedent", "textwrap:dedent").load()  # doctest: +ELLIPSIS
+        <function dedent at ...>
+        """
+        if isinstance(self.function, str):
+            return _import_function(self.function)
+        return self.function
+
+
+@lru_cache(maxsize=None)
+def _import_function(import_path: str) -> Callable[..., None]:
+    module_name, _, function_name = import_path.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, function_name)
+
+
+def _overlap(patterns: Iterable[str], other_patterns: Iterable[str]) -> bool:
+    return any(
+        _pattern_overlap(pattern, other)
+        for pattern in patterns
+        for other in other_patterns
+    )
+
+
+def _pattern_overlap(pattern: str, other: str) -> bool:
+    """Check whether two path patterns may refer to the same file.
+
+    >>> _pattern_overlap(".github/**", ".github/workflows/cd.yml")
+    True
+    >>> _pattern_overlap("**/requirements*.txt", "requirements-dev.txt")
+    True
+    >>> _pattern_overlap(".constraints", ".constraints/py3.8.txt")
+    True
+    >>> _pattern_overlap(".flake8", "setup.cfg")
+    False
+    """
+    if pattern == other or fnmatch(pattern, other) or fnmatch(other, pattern):
+        return True
+    for first, second in [(pattern, other), (other, pattern)]:
+        if first.startswith("**/") and fnmatch(second, first[3:]):
+            return True
+        directory = first.split("*")[0].rstrip("/")
+        if directory and second.startswith(directory + "/"):
+            return True
+    return False
+
+
+@attr.s(frozen=True)
+class TimedOut:
+    """Result of a task that did not finish within its time budget."""
+
+    name: str = attr.ib()
+    elapsed: float = attr.ib()
+
+    def __str__(self) -> str:
+        return f'Check "{self.name}" timed out after {self.elapsed:.1f}s'
+
+
+_Result = Union[None, str, TimedOut]
+
 
 @attr.s(on_setattr=attr.setters.frozen)
 class Executor:
-    """Execute functions and collect any `.PrecommitError` exceptions."""
+    """Execute functions and collect any `.PrecommitError` exceptions.
 
+    Functions that are passed to :meth:`__call__` are executed immediately.
+    Tasks that are passed to :meth:`schedule` are executed by :meth:`execute`.
+    Up to :attr:`jobs` of those tasks run at the same time, as long as they do
+    not touch the same files. Error messages are collected in the order in which
+    the functions and tasks were submitted.
+
+    If a :attr:`cache` is given, the result of a task is taken from that cache
+    when its files have not changed since a previous run.
+
+    A scheduled task that runs longer than its time budget in :attr:`timeouts`
+    (or :attr:`timeout` if it has none) is interrupted and collected in
+    :attr:`timed_out`. Such a task runs in a separate thread, so that the
+    executor can stop waiting for it. The task is interrupted as soon as it
+    executes Python code again, which may be too late for a task that blocks in
+    a single call. The changes of a task with a time budget are staged in a
+    `~.RepositorySnapshot.fork` of the active snapshot, so that a task that
+    timed out can no longer modify any files, even if it keeps running.
+
+    The outcome of each scheduled task is also collected by task name in
+    :attr:`results`: its error message, a `TimedOut`, or `None` if it passed.
+
+    If :attr:`on_finding` is given, it is called with a `.Finding` for each
+    problem and each modified file, as soon as the function or task that caused
+    it has finished.
+    """
+
+    jobs: int = attr.ib(default=1, validator=attr.validators.instance_of(int))
+    cache: Optional[ResultCache] = attr.ib(default=None)
+    timeout: Optional[float] = attr.ib(default=None)
+    timeouts: Mapping[str, float] = attr.ib(factory=dict)
+    on_finding: Optional[Callable[[Finding], None]] = attr.ib(default=None)
     error_messages: List[str] = attr.ib(factory=list, init=False)
+    timed_out: List[TimedOut] = attr.ib(factory=list, init=False)
+    results: Dict[str, _Result] = attr.ib(factory=dict, init=False)
+    _scheduled: List[Tuple[Task, tuple, dict]] = attr.ib(factory=list, init=False)
 
     def __call__(self, function: Callable, *args: Any, **kwargs: Any) -> None:
-        try:
-            function(*args, **kwargs)
-        except PrecommitError as exception:
-            error_message = str("\n".join(exception.args))
+        name = _get_name(function)
+        with span(name, "check"), measure_memory(name):
+            if self.on_finding is None:
+                error_message = _run(function, *args, **kwargs)
+            else:
+                file = next(iter(args), None)
+                if not isinstance(file, (Path, str)):
+                    file = None
+                with FindingRecorder(self.on_finding, name, file) as recorder:
+                    error_message = _run(function, *args, **kwargs)
+                    recorder.message = error_message
+        if error_message is not None:
             self.error_messages.append(error_message)
 
+    def schedule(self, task: Task, *args: Any, **kwargs: Any) -> None:
+        self._scheduled.append((task, args, kwargs))
+
+    def execute(self) -> None:
+        """Run all scheduled tasks and collect their error messages."""
+        scheduled = list(self._scheduled)
+        self._scheduled.clear()
+        for result in self.__execute(scheduled):
+            if isinstance(result, TimedOut):
+                self.timed_out.append(result)
+            elif result is not None:
+                self.error_messages.append(result)
+
+    def execute_until_stable(self, max_iterations: int) -> int:
+        """Run scheduled tasks again until they no longer modify any files.
+
+        After the first run, only the tasks that depend on the files that were
+        modified in the previous run are executed again. Error messages that
+        occur more than once are collected only once. This only works with an
+        active `.RepositorySnapshot`, otherwise all tasks are executed once.
+
+        Returns:
+            The number of times that tasks were executed.
+        """
+        if max_iterations < 1:
+            raise ValueError("There should be at least one iteration")
+        all_scheduled = list(self._scheduled)
+        self._scheduled.clear()
+        snapshot = get_active_snapshot()
+        scheduled = all_scheduled
+        error_messages: List[str] = []
+        for iteration in range(1, max_iterations + 1):
+            staged_before = _get_staged_content(snapshot)
+            for result in self.__execute(scheduled):
+                if isinstance(result, TimedOut):
+                    self.timed_out.append(result)
+                elif result is not None and result not in error_messages:
+                    error_messages.append(result)
+            if snapshot is None:
+                break
+            staged_after = _get_staged_content(snapshot)
+            modified_files = sorted(
+                snapshot.relative_path(path)
+                for path in set(staged_before) | set(staged_after)
+                if staged_before.get(path) != staged_after.get(path)
+            )
+            if not modified_files:
+                break
+            scheduled = [
+                item for item in all_scheduled if item[0].depends_on(modified_files)
+            ]
+        else:
+            error_messages.append(
+                f"Files were still modified after {max_iterations} iterations:\n  "
+                + "\n  ".join(modified_files)
+            )
+        self.error_messages.extend(error_messages)
+        return iteration
+
+    def __execute(self, scheduled: List[Tuple[Task, tuple, dict]]) -> List[_Result]:
+        timed_scheduled = [
+            (task, self.timeouts.get(task.name, self.timeout), args, kwargs)
+            for task, args, kwargs in scheduled
+        ]
+        run_task: Callable[..., _Result] = _run_task
+        if self.on_finding is not None:
+            run_task = partial(_run_reported_task, self.on_finding)
+        if self.jobs <= 1 or len(scheduled) <= 1:
+            results = [
+                run_task(self.cache, timeout, task, *args, **kwargs)
+                for task, timeout, args, kwargs in timed_scheduled
+            ]
+        else:
+            results = _execute_in_parallel(
+                timed_scheduled, self.jobs, self.cache, run_task
+            )
+        for (task, *_), result in zip(scheduled, results):
+            # keep the first problem of a task that is fixed in a later iteration
+            if self.results.get(task.name) is None:
+                self.results[task.name] = result
+        return results
+
     def merge_messages(self) -> str:
-        stripped_messages = (s.strip() for s in self.error_messages)
-        return "\n--------------------\n".join(stripped_messages)
+        return merge_messages(self.error_messages)
+
+
+def merge_messages(error_messages: Iterable[str]) -> str:
+    stripped_messages = (s.strip() for s in error_messages)
+    return "\n--------------------\n".join(stripped_messages)
+
+
+def _get_staged_content(
+    snapshot: Optional[RepositorySnapshot],
+) -> Dict[str, Optional[bytes]]:
+    if snapshot is None:
+        return {}
+    return {path: new for path, (_, new) in snapshot.changes().items()}
+
+
+def _execute_in_parallel(
+    scheduled: List[Tuple[Task, Optional[float], tuple, dict]],
+    jobs: int,
+    cache: Optional[ResultCache],
+    run_task: Callable[..., _Result],
+) -> List[_Result]:
+    # pylint: disable=import-outside-toplevel
+    from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+    dependencies = {
+        i: {j for j in range(i) if task.conflicts_with(scheduled[j][0])}
+        for i, (task, *_) in enumerate(scheduled)
+    }
+    snapshot = get_active_snapshot()
+    results: Dict[int, _Result] = {}
+    running: Dict[Future, int] = {}
+    exceptions: Dict[int, BaseException] = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while True:
+            finished = set(results) | set(exceptions)
+            started = finished | set(running.values())
+            for i, (task, timeout, args, kwargs) in enumerate(scheduled):
+                if exceptions or i in started or not dependencies[i] <= finished:
+                    continue
+                future = pool.submit(
+                    _run_with_snapshot,
+                    snapshot,
+                    run_task,
+                    cache,
+                    timeout,
+                    task,
+                    *args,
+                    **kwargs,
+                )
+                running[future] = i
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                exception = future.exception()
+                if exception is None:
+                    results[i] = future.result()
+                else:
+                    exceptions[i] = exception
+    if exceptions:
+        raise exceptions[min(exceptions)]
+    return [results[i] for i in range(len(scheduled))]
+
+
+def _run_with_snapshot(
+    snapshot: Optional[RepositorySnapshot],
+    function: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    if snapshot is None:
+        return function(*args, **kwargs)
+    with snapshot.activate():
+        return function(*args, **kwargs)
+
+
+def _run_task(
+    cache: Optional[ResultCache],
+    timeout: Optional[float],
+    task: Task,
+    *args: Any,
+    **kwargs: Any,
+) -> _Result:
+    start = time.perf_counter()
+    with span(task.name, "check"), measure_memory(task.name):
+        try:
+            if cache is None:
+                return _run_with_timeout(timeout, task.load(), *args, **kwargs)
+            return _run_cached(cache, timeout, task, *args, **kwargs)
+        except _Timeout:
+            return TimedOut(task.name, time.perf_counter() - start)
+
+
+def _run_reported_task(
+    on_finding: Callable[[Finding], None],
+    cache: Optional[ResultCache],
+    timeout: Optional[float],
+    task: Task,
+    *args: Any,
+    **kwargs: Any,
+) -> _Result:
+    """Run a task like `_run_task` and report its findings.
+
+    Tasks that run at the same time never write the same files, so the files
+    that a task modified are those of the modified files that it depends on.
+    """
+    owns = partial(_depends_on, task)
+    with FindingRecorder(on_finding, task.name, owns=owns) as recorder:
+        result = _run_task(cache, timeout, task, *args, **kwargs)
+        if result is not None:
+            recorder.message = str(result)
+    return result
+
+
+def _depends_on(task: Task, path: str) -> bool:
+    return task.depends_on([path])
+
+
+def _run_cached(
+    cache: ResultCache,
+    timeout: Optional[float],
+    task: Task,
+    *args: Any,
+    **kwargs: Any,
+) -> Optional[str]:
+    paths = task.reads | task.writes
+    arguments = args, sorted(kwargs.items())
+    key = cache.fingerprint(task.name, paths, arguments)
+    if key is not None:
+        is_cached, error_message = cache.get(key)
+        if is_cached:
+            return error_message
+    error_message = _run_with_timeout(timeout, task.load(), *args, **kwargs)
+    # a task that fixed its files has to run again on the next occasion
+    if key is not None and cache.fingerprint(task.name, paths, arguments) == key:
+        cache.put(key, error_message)
+    return error_message
+
+
+class _Timeout(Exception):
+    pass
+
+
+class _Interrupt(BaseException):
+    """Raised in a check that is interrupted; not caught by :code:`except Exception`."""
+
+
+def _run_with_timeout(
+    timeout: Optional[float], function: Callable, *args: Any, **kwargs: Any
+) -> Optional[str]:
+    """Run a function like `_run`, but raise `_Timeout` if it takes too long.
+
+    The function runs in a separate thread, which may still be running after the
+    timeout. Its changes are therefore staged in a fork of the active
+    `.RepositorySnapshot`, which is only merged if it finishes in time.
+    """
+    if timeout is None:
+        return _run(function, *args, **kwargs)
+    outcome: Dict[str, Any] = {}
+
+    def target() -> None:
+        try:
+            outcome["result"] = _run_with_snapshot(
+                fork, _run, function, *args, **kwargs
+            )
+        except _Interrupt:
+            pass
+        except BaseException as exception:  # pylint: disable=broad-except
+            outcome["exception"] = exception
+
+    snapshot = get_active_snapshot()
+    fork = None if snapshot is None else snapshot.fork()
+    worker = threading.Thread(target=target, name=_get_name(function), daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        _interrupt(worker)
+        worker.join(_INTERRUPT_GRACE_PERIOD)
+        raise _Timeout
+    if "exception" in outcome:
+        raise outcome["exception"]
+    if snapshot is not None and fork is not None:
+        snapshot.merge(fork)
+    return outcome["result"]
+
+
+def _interrupt(thread: threading.Thread) -> None:
+    """Raise `_Interrupt` in another thread, once it executes Python code again."""
+    import ctypes  # pylint: disable=import-outside-toplevel
+
+    pythonapi = getattr(ctypes, "pythonapi", None)  # only available on CPython
+    if pythonapi is None or thread.ident is None:
+        return
+    pythonapi.PyThreadState_SetAsyncExc(
+        ctypes.c_ulong(thread.ident), ctypes.py_object(_Interrupt)
+    )
+
+
+def _get_name(function: Callable) -> str:
+    """Get a short name for a function that is shown in a trace.
+
+    >>> from repoma.check_dev_files import cspell
+    >>> _get_name(cspell.main)
+    'cspell.main'
+    """
+    name = getattr(function, "__qualname__", repr(function))
+    module = getattr(function, "__module__", None)
+    if module is None:
+        return name
+    return f"{module.split('.')[-1]}.{name}"
+
+
+def _run(function: Callable, *args: Any, **kwargs: Any) -> Optional[str]:
+    try:
+        function(*args, **kwargs)
+    except PrecommitError as exception:
+        return str("\n".join(exception.args))
+    return None
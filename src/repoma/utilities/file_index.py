@@ -0,0 +1,247 @@
+"""Index of the files in a repository that can be queried with glob patterns.
+
+Recursive globs like :code:`Path(".").glob("**/requirements*.txt")` walk through
+:file:`.git`, :file:`.tox`, virtual environments, and :file:`node_modules`. A
+`FileIndex` is created once from :code:`git ls-files`, so it only contains the
+files that are tracked by git or that are not ignored by git. Outside a git
+repository, the index falls back to a walk that skips the files and directories
+that are listed in the :file:`.gitignore` of the repository root.
+
+>>> index = FileIndex(".", ["docs/conf.py", "requirements.txt", "src/a/requirements.in"])
+>>> index.match("**/requirements*.*")
+['requirements.txt', 'src/a/requirements.in']
+>>> index.match("docs/**")
+['docs/conf.py']
+"""
+
+import os
+import re
+import subprocess
+from fnmatch import fnmatch
+from functools import lru_cache
+from pathlib import Path
+from typing import (
+    Collection,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Pattern,
+    Set,
+    Tuple,
+    Union,
+)
+
+import attr
+
+from .trace import span
+
+
+def _to_sorted_tuple(paths: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(sorted(paths))
+
+
+@attr.s(frozen=True)
+class FileIndex:
+    """Paths of the files in a repository, relative to its root with forward slashes.
+
+    The index is not updated when files change. Files that git tracks, but that
+    have been deleted from the working tree, are also listed.
+    """
+
+    root: str = attr.ib()
+    files: Tuple[str, ...] = attr.ib(converter=_to_sorted_tuple)
+
+    @classmethod
+    def create(cls, root: Union[Path, str] = ".") -> "FileIndex":
+        """Index the files under a directory with git, or by walking it."""
+        root = os.path.abspath(root)
+        with span("index files", "io", path=root):
+            files = _list_git_files(root)
+            if files is None:
+                files = _walk(root)
+        return cls(root, files)
+
+    def match(self, pattern: str) -> List[str]:
+        """Get the files that match a glob pattern, like `pathlib.Path.glob`.
+
+        A :code:`**` matches any number of directories. A pattern that ends with
+        :code:`**` matches all files under a directory.
+        """
+        regex = _compile(pattern)
+        return [path for path in self.files if regex.match(path)]
+
+
+def _list_git_files(root: str) -> Optional[List[str]]:
+    """List the files that git tracks or does not ignore, or `None` if it cannot."""
+    try:
+        output = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return sorted({path for path in output.decode().split("\0") if path})
+
+
+def list_directories(
+    root: Union[Path, str] = ".", exclude: Iterable[Union[Path, str]] = ()
+) -> List[str]:
+    """List the directories under a root that are not ignored, relative to it.
+
+    Directories are ignored like in a `FileIndex`: with git, which takes all
+    :file:`.gitignore` files and the global excludes into account, or else with
+    the :file:`.gitignore` of the root. The :file:`.git` directory and the
+    directories in :code:`exclude` are always skipped. The root itself is listed
+    as :code:`"."`.
+    """
+    root = os.fspath(root)
+    excluded = {Path(path).as_posix().strip("/") for path in exclude}
+    ignored_directories = _list_ignored_git_directories(root)
+    return [
+        directory
+        for directory, _ in _walk_directories(root, excluded, ignored_directories)
+    ]
+
+
+def _list_ignored_git_directories(root: str) -> Optional[Set[str]]:
+    """List the directories that git ignores, or `None` if it cannot."""
+    try:
+        output = subprocess.run(
+            [
+                "git",
+                "ls-files",
+                "-z",
+                "--others",
+                "--ignored",
+                "--exclude-standard",
+                "--directory",
+            ],
+            cwd=root,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return {
+        path.rstrip("/") for path in output.decode().split("\0") if path.endswith("/")
+    }
+
+
+def _walk(root: str) -> List[str]:
+    files: List[str] = []
+    for directory, filenames in _walk_directories(root):
+        prefix = "" if directory == "." else directory + "/"
+        files.extend(prefix + name for name in filenames)
+    return files
+
+
+def _walk_directories(
+    root: str,
+    excluded: Collection[str] = (),
+    ignored_directories: Optional[Collection[str]] = None,
+) -> Iterator[Tuple[str, List[str]]]:
+    """Walk the directories and files that are not ignored by git.
+
+    If :code:`ignored_directories` is not given, directories are ignored if they
+    are listed in the :file:`.gitignore` of the root.
+    """
+    ignored = _load_gitignore(root)
+    for directory, subdirectories, filenames in os.walk(root):
+        relative_dir = Path(os.path.relpath(directory, root)).as_posix()
+        prefix = "" if relative_dir == "." else relative_dir + "/"
+        subdirectories[:] = [
+            name
+            for name in subdirectories
+            if name != ".git"
+            and prefix + name not in excluded
+            and not _is_ignored_directory(prefix + name, ignored, ignored_directories)
+        ]
+        yield relative_dir, [
+            name for name in filenames if not _is_ignored(prefix + name, ignored, False)
+        ]
+
+
+def _is_ignored_directory(
+    path: str, patterns: Iterable[str], ignored_directories: Optional[Collection[str]]
+) -> bool:
+    if ignored_directories is None:
+        return _is_ignored(path, patterns, is_directory=True)
+    return path in ignored_directories
+
+
+def _load_gitignore(root: str) -> List[str]:
+    path = os.path.join(root, ".gitignore")
+    if not os.path.isfile(path):
+        return []
+    with open(path) as stream:
+        lines = (line.strip() for line in stream)
+        return [line for line in lines if line and not line.startswith(("#", "!"))]
+
+
+def _is_ignored(path: str, patterns: Iterable[str], is_directory: bool) -> bool:
+    """Check whether a path is ignored by the patterns of a :file:`.gitignore`.
+
+    Negated patterns are not supported.
+
+    >>> _is_ignored("src/.tox", [".tox/"], is_directory=True)
+    True
+    >>> _is_ignored("docs/_build", ["/_build"], is_directory=True)
+    False
+    >>> _is_ignored("docs/api/index.rst", ["docs/api/*"], is_directory=False)
+    True
+    """
+    name = path.rsplit("/", maxsplit=1)[-1]
+    for pattern in patterns:
+        if pattern.endswith("/"):
+            if not is_directory:
+                continue
+            pattern = pattern.rstrip("/")
+        if "/" in pattern:
+            if fnmatch(path, pattern.lstrip("/")):
+                return True
+        elif fnmatch(name, pattern):
+            return True
+    return False
+
+
+@lru_cache(maxsize=None)
+def _compile(pattern: str) -> Pattern[str]:
+    """Convert a glob pattern to a regular expression for relative file paths.
+
+    >>> bool(_compile("**/requirements*.txt").match("requirements-dev.txt"))
+    True
+    >>> bool(_compile(".github/**").match(".github/workflows/ci.yml"))
+    True
+    >>> bool(_compile("*.cfg").match("src/setup.cfg"))
+    False
+    """
+    if pattern.endswith("**"):
+        pattern += "/*"
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        elif pattern[i] == "[" and "]" in pattern[i + 1 :]:
+            end = pattern.index("]", i + 1)
+            characters = pattern[i + 1 : end]
+            if characters.startswith("!"):
+                characters = "^" + characters[1:]
+            regex += f"[{characters}]"
+            i = end + 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return re.compile(regex + r"\Z")
@@ -0,0 +1,248 @@
+"""Machine-readable reports of what the hooks found, for :code:`--format`.
+
+With :code:`--format json`, each `Finding` is written to the output as a line of
+JSON as soon as its check has finished:
+
+>>> import io
+>>> stream = io.StringIO()
+>>> writer = JsonLinesWriter(stream)
+>>> writer.write(Finding("black", "Fixed", ".vscode/settings.json", fixed=True))
+>>> print(stream.getvalue(), end="")
+{"check": "black", "message": "Fixed", "file": ".vscode/settings.json", "fixed": true, "duration": 0.0, "bytes_written": 0}
+
+:code:`--format sarif` writes a `SARIF 2.1.0
+<https://docs.oasis-open.org/sarif/sarif/v2.1.0/sarif-v2.1.0.html>`_ log
+instead. That is one JSON document, but its results are also written one by one,
+so that a report of thousands of notebooks is never kept in memory.
+"""
+
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from types import TracebackType
+from typing import Callable, Dict, Iterator, Optional, TextIO, Type, Union
+
+import attr
+
+from repoma.errors import PrecommitError
+
+from .snapshot import get_active_snapshot
+
+FORMATS = ("text", "json", "sarif")
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+@attr.s(frozen=True)
+class Finding:
+    """A problem that a check reported, or a file that it fixed."""
+
+    check: str = attr.ib()
+    message: Optional[str] = attr.ib(default=None)
+    """Error message of the check, or `None` if it fixed a file without one."""
+    file: Optional[str] = attr.ib(default=None)
+    """Path relative to the repository root, if the finding concerns one file."""
+    fixed: bool = attr.ib(default=False)
+    """The check has fixed the file, or would fix it in :code:`--diff` mode."""
+    duration: float = attr.ib(default=0.0)
+    """Seconds that the check took in total."""
+    bytes_written: int = attr.ib(default=0)
+
+
+@attr.s
+class JsonLinesWriter:
+    """Write each `Finding` as a line of JSON."""
+
+    stream: TextIO = attr.ib(factory=lambda: sys.stdout)
+    _lock: threading.Lock = attr.ib(factory=threading.Lock, init=False)
+
+    def write(self, finding: Finding) -> None:
+        line = json.dumps(attr.asdict(finding)) + "\n"
+        with self._lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+    def close(self) -> None:
+        pass
+
+
+@attr.s
+class SarifWriter:
+    """Write findings as the results of a SARIF log, one result at a time.
+
+    The :code:`tool` section with the rules comes after the results, so that the
+    rules do not have to be known in advance. `close` has to be called to finish
+    the document.
+    """
+
+    stream: TextIO = attr.ib(factory=lambda: sys.stdout)
+    _rules: Dict[str, int] = attr.ib(factory=dict, init=False)
+    _lock: threading.Lock = attr.ib(factory=threading.Lock, init=False)
+
+    def write(self, finding: Finding) -> None:
+        with self._lock:
+            if not self._rules:
+                self.stream.write('{"runs": [{"results": [\n')
+            else:
+                self.stream.write(",\n")
+            rule_index = self._rules.setdefault(finding.check, len(self._rules))
+            self.stream.write(json.dumps(_to_sarif_result(finding, rule_index)))
+            self.stream.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._rules:
+                self.stream.write('{"runs": [{"results": [\n')
+            rules = [{"id": name} for name in self._rules]
+            tool = {"driver": {"name": "repoma", "rules": rules}}
+            self.stream.write(
+                f"\n], {_dumps_entry('tool', tool)}}}], "
+                f"{_dumps_entry('$schema', SARIF_SCHEMA)}, "
+                f"{_dumps_entry('version', '2.1.0')}}}\n"
+            )
+            self.stream.flush()
+            self._rules.clear()
+
+
+FindingWriter = Union[JsonLinesWriter, SarifWriter]
+
+
+def create_writer(
+    output_format: str, stream: Optional[TextIO] = None
+) -> Optional[FindingWriter]:
+    """Create a writer for a :code:`--format`, or `None` for plain text."""
+    if stream is None:
+        stream = sys.stdout
+    if output_format == "json":
+        return JsonLinesWriter(stream)
+    if output_format == "sarif":
+        return SarifWriter(stream)
+    if output_format == "text":
+        return None
+    raise ValueError(f'No output format "{output_format}". Choose from {FORMATS}')
+
+
+@attr.s
+class FindingRecorder:
+    """Measure a check and report its findings once it has finished.
+
+    Use as a context manager around the check. The files that it modified are
+    detected through the active `.RepositorySnapshot`. A `.PrecommitError` that
+    the check raises is reported and then raised again. Alternatively, set the
+    :attr:`message` of a check that does not raise its errors.
+    """
+
+    on_finding: Callable[[Finding], None] = attr.ib()
+    check: str = attr.ib()
+    file: Optional[Union[Path, str]] = attr.ib(default=None)
+    """File of findings that do not concern a modified file, if there is one."""
+    owns: Callable[[str], bool] = attr.ib(default=lambda path: True)
+    """Select the modified files that belong to this check, for instance if
+    other checks run at the same time."""
+    message: Optional[str] = attr.ib(default=None)
+    _start: float = attr.ib(default=0.0, init=False)
+    _staged_before: Dict[str, Optional[bytes]] = attr.ib(factory=dict, init=False)
+
+    def __enter__(self) -> "FindingRecorder":
+        self._staged_before = _get_staged_content()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exception_type: Optional[Type[BaseException]],
+        exception: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if isinstance(exception, PrecommitError):
+            self.message = "\n".join(exception.args)
+        elif exception is not None:
+            return
+        duration = time.perf_counter() - self._start
+        for finding in self.__create_findings(duration):
+            self.on_finding(finding)
+
+    def __create_findings(self, duration: float) -> Iterator[Finding]:
+        modified_files = self.__get_modified_files()
+        if not modified_files and self.message is not None:
+            file = None if self.file is None else Path(self.file).as_posix()
+            yield Finding(self.check, self.message, file, duration=duration)
+        for path, content in modified_files.items():
+            yield Finding(
+                self.check,
+                self.message,
+                path,
+                fixed=True,
+                duration=duration,
+                bytes_written=len(content or b""),
+            )
+
+    def __get_modified_files(self) -> Dict[str, Optional[bytes]]:
+        snapshot = get_active_snapshot()
+        if snapshot is None:
+            return {}
+        before = self._staged_before
+        after = _get_staged_content()
+        modified_files = {}
+        for key in sorted(set(before) | set(after)):
+            if key in before and before[key] == after.get(key):
+                continue
+            path = snapshot.relative_path(key)
+            if self.owns(path):
+                modified_files[path] = after.get(key)
+        return modified_files
+
+
+@contextmanager
+def record(
+    writer: Optional[FindingWriter],
+    check: str,
+    file: Optional[Union[Path, str]] = None,
+) -> Iterator[None]:
+    """Report the findings of a check with a `FindingRecorder`, if there is a writer."""
+    if writer is None:
+        yield
+        return
+    with FindingRecorder(writer.write, check, file):
+        yield
+
+
+def _get_staged_content() -> Dict[str, Optional[bytes]]:
+    snapshot = get_active_snapshot()
+    if snapshot is None:
+        return {}
+    return snapshot.staged()
+
+
+def _to_sarif_result(finding: Finding, rule_index: int) -> dict:
+    """Convert a `Finding` to a result in a SARIF log.
+
+    >>> result = _to_sarif_result(Finding("cspell", "Missing words"), rule_index=0)
+    >>> result["ruleId"], result["level"], result["message"]
+    ('cspell', 'error', {'text': 'Missing words'})
+    """
+    message = finding.message
+    if message is None:
+        message = f"{finding.file} has been fixed"
+    result: dict = {
+        "ruleId": finding.check,
+        "ruleIndex": rule_index,
+        "level": "warning" if finding.fixed else "error",
+        "message": {"text": message.strip()},
+    }
+    if finding.file is not None:
+        result["locations"] = [
+            {"physicalLocation": {"artifactLocation": {"uri": finding.file}}}
+        ]
+    result["properties"] = {
+        "fixed": finding.fixed,
+        "duration": finding.duration,
+        "bytesWritten": finding.bytes_written,
+    }
+    return result
+
+
+def _dumps_entry(key: str, value: object) -> str:
+    return f"{json.dumps(key)}: {json.dumps(value)}"
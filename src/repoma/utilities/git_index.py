@@ -0,0 +1,167 @@
+"""Read the content of files as it has been staged in the git index.
+
+During a commit, the hooks should validate the staged content of files, not
+their content in the working tree, which may contain unstaged edits. A
+`GitIndex` lists the blobs in the index with :code:`git ls-files --stage` and
+reads them through a single long-lived :code:`git cat-file --batch` process.
+Several blobs are requested at once, so that reading many small files only costs
+one round trip to that process.
+"""
+
+import hashlib
+import subprocess
+import threading
+from typing import IO, Dict, Iterable, List, Optional, Tuple
+
+import attr
+
+from .trace import span
+
+_BATCH_SIZE = 256
+"""Number of blobs that are requested at once.
+
+The requests of one batch are written before any content is read back, so they
+have to fit in the buffer of the pipe to :code:`git cat-file`.
+"""
+_REGULAR_FILE_MODES = {"100644", "100755"}
+
+
+@attr.s
+class GitIndex:
+    """Blobs of the regular files in the git index of a repository.
+
+    Paths are relative to :attr:`root`, with forward slashes.
+    Files that are not in the index, symbolic links, submodules, and files with
+    merge conflicts are not listed.
+    """
+
+    root: str = attr.ib()
+    _blobs: Optional[Dict[str, str]] = attr.ib(default=None, init=False)
+    _process: Optional["subprocess.Popen[bytes]"] = attr.ib(default=None, init=False)
+    _lock: threading.Lock = attr.ib(factory=threading.Lock, init=False)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.__get_blobs()
+
+    def has_blob(self, path: str, content: bytes) -> bool:
+        """Check whether a file has been staged with exactly this content."""
+        object_name = self.__get_blobs().get(path)
+        if object_name is None:
+            return False
+        return object_name == hash_blob(content, len(object_name))
+
+    def read(self, path: str) -> Optional[bytes]:
+        """Staged content of a file, or `None` if it is not in the index."""
+        return self.read_many([path]).get(path)
+
+    def read_many(self, paths: Iterable[str]) -> Dict[str, bytes]:
+        """Staged content of several files, read in as few round trips as possible.
+
+        Paths that are not in the index are left out of the result.
+        """
+        blobs = self.__get_blobs()
+        requests = [(path, blobs[path]) for path in paths if path in blobs]
+        if not requests:
+            return {}
+        content = {}
+        with self._lock, span("git cat-file", "io", files=len(requests)):
+            process = self.__get_process()
+            for i in range(0, len(requests), _BATCH_SIZE):
+                batch = requests[i : i + _BATCH_SIZE]
+                content.update(_read_batch(process, batch))
+        return content
+
+    def close(self) -> None:
+        """Stop the :code:`git cat-file` process. It is restarted when needed."""
+        with self._lock:
+            process, self._process = self._process, None
+            if process is None:
+                return
+            assert process.stdin is not None
+            assert process.stdout is not None
+            process.stdin.close()
+            process.wait()
+            process.stdout.close()
+
+    def __enter__(self) -> "GitIndex":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def __get_blobs(self) -> Dict[str, str]:
+        with self._lock:
+            if self._blobs is None:
+                self._blobs = _list_staged_blobs(self.root)
+            return self._blobs
+
+    def __get_process(self) -> "subprocess.Popen[bytes]":
+        if self._process is None:
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.root,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        return self._process
+
+
+def hash_blob(content: bytes, length: int = 40) -> str:
+    """Compute the name that git gives to a blob with this content.
+
+    Repositories with :code:`--object-format=sha256` have names of 64 characters.
+
+    >>> hash_blob(b"")
+    'e69de29bb2d1d6434b8b29ae775ad8c2e48c5391'
+    """
+    hasher = hashlib.sha256() if length == 64 else hashlib.sha1()
+    hasher.update(f"blob {len(content)}\0".encode())
+    hasher.update(content)
+    return hasher.hexdigest()
+
+
+def _list_staged_blobs(root: str) -> Dict[str, str]:
+    """Map the paths of the regular files in the index to the hashes of their blobs.
+
+    Returns an empty `dict` if the directory is not in a git repository.
+    """
+    with span("git ls-files", "io", path=root):
+        try:
+            output = subprocess.run(
+                ["git", "ls-files", "--stage", "-z"],
+                cwd=root,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                check=True,
+            ).stdout
+        except (OSError, subprocess.CalledProcessError):
+            return {}
+    blobs = {}
+    for entry in output.decode().split("\0"):
+        if not entry:
+            continue
+        info, path = entry.split("\t", maxsplit=1)
+        mode, object_name, stage = info.split(" ")
+        if mode in _REGULAR_FILE_MODES and stage == "0":
+            blobs[path] = object_name
+    return blobs
+
+
+def _read_batch(
+    process: "subprocess.Popen[bytes]", batch: List[Tuple[str, str]]
+) -> Dict[str, bytes]:
+    stdin: Optional[IO[bytes]] = process.stdin
+    stdout: Optional[IO[bytes]] = process.stdout
+    assert stdin is not None
+    assert stdout is not None
+    stdin.write(b"".join(f"{name}\n".encode() for _, name in batch))
+    stdin.flush()
+    content = {}
+    for path, _ in batch:
+        header = stdout.readline().decode().split()
+        if len(header) != 3:
+            raise OSError(f"Could not read {path} from the git index: {header}")
+        size = int(header[2])
+        content[path] = stdout.read(size)
+        stdout.read(1)  # newline that terminates the content
+    return content
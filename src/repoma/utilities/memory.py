@@ -0,0 +1,187 @@
+"""Measure the memory that checks allocate, with :mod:`tracemalloc`.
+
+Memory is only measured while a `MemoryProfiler` is activated. Measurements can
+be nested, for instance a check within the handling of one file. Measurements
+assume that checks run one after the other, not in parallel.
+"""
+
+import os
+import tracemalloc
+from contextlib import contextmanager, suppress
+from typing import ContextManager, Iterator, List, Optional
+
+import attr
+
+_ACTIVE_PROFILER: Optional["MemoryProfiler"] = None
+
+
+@attr.s(frozen=True)
+class MemoryUsage:
+    """Memory that was allocated within one measurement, in bytes."""
+
+    name: str = attr.ib()
+    depth: int = attr.ib()
+    peak: int = attr.ib()
+    """Largest amount of memory that was allocated at any time during the check."""
+    net: int = attr.ib()
+    """Memory that was still allocated after the check."""
+    top_site: Optional[str] = attr.ib(default=None)
+    """Source line that allocated most of the :attr:`net` memory."""
+
+
+@attr.s
+class _Frame:
+    start: int = attr.ib()
+    peak: int = attr.ib()
+
+
+@attr.s(on_setattr=attr.setters.frozen)
+class MemoryProfiler:
+    """Collection of `MemoryUsage` records.
+
+    Peak memory can only be measured per check on Python 3.9 and higher. On
+    older versions, the peak is the highest usage since the profiler was
+    activated.
+    """
+
+    top: int = attr.ib(default=10)
+    records: List[MemoryUsage] = attr.ib(factory=list, init=False)
+    _pending: List[Optional[MemoryUsage]] = attr.ib(factory=list, init=False)
+    _stack: List[_Frame] = attr.ib(factory=list, init=False)
+    _snapshots: List[tracemalloc.Snapshot] = attr.ib(factory=list, init=False)
+
+    @contextmanager
+    def activate(self) -> Iterator["MemoryProfiler"]:
+        global _ACTIVE_PROFILER  # pylint: disable=global-statement
+        previous = _ACTIVE_PROFILER
+        was_tracing = tracemalloc.is_tracing()
+        if not was_tracing:
+            tracemalloc.start()
+        self._snapshots.append(_take_snapshot())
+        _ACTIVE_PROFILER = self
+        try:
+            yield self
+        finally:
+            _ACTIVE_PROFILER = previous
+            self._snapshots.append(_take_snapshot())
+            if not was_tracing:
+                tracemalloc.stop()
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        before = _take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1].peak = max(self._stack[-1].peak, peak)
+        _reset_peak()
+        frame = _Frame(start=current, peak=current)
+        index = len(self._pending)
+        self._pending.append(None)
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(frame.peak, peak)
+            self._pending[index] = MemoryUsage(
+                name=name,
+                depth=len(self._stack),
+                peak=peak - frame.start,
+                net=current - frame.start,
+                top_site=_get_top_site(before, _take_snapshot()),
+            )
+            del before
+            if self._stack:
+                self._stack[-1].peak = max(self._stack[-1].peak, peak)
+            _reset_peak()
+            if not self._stack:
+                self.records.extend(r for r in self._pending if r is not None)
+                self._pending.clear()
+
+    def report(self) -> str:
+        """Render the records and the lines that allocated most memory."""
+        lines = ["Memory usage (peak, net):"]
+        for record in self.records:
+            indent = "  " * (record.depth + 1)
+            line = (
+                f"{_format_size(record.peak):>10} {_format_size(record.net, sign=True):>11}"
+            )
+            line += f"{indent}{record.name}"
+            if record.top_site is not None:
+                line += f"  [{record.top_site}]"
+            lines.append(line)
+        if len(self._snapshots) >= 2:
+            lines.append(f"Top {self.top} allocation sites:")
+            statistics = self._snapshots[-1].compare_to(self._snapshots[0], "lineno")
+            for statistic in statistics[: self.top]:
+                frame = statistic.traceback[0]
+                location = f"{_relative_path(frame.filename)}:{frame.lineno}"
+                size = _format_size(statistic.size_diff, sign=True)
+                lines.append(f"{size:>11}  {location}")
+        return "\n".join(lines)
+
+
+def measure_memory(name: str) -> ContextManager[None]:
+    """Measure the memory that is allocated in a :code:`with` block.
+
+    Does nothing if there is no active `MemoryProfiler`.
+    """
+    profiler = _ACTIVE_PROFILER
+    if profiler is None:
+        return suppress()
+    return profiler.measure(name)
+
+
+def _take_snapshot() -> tracemalloc.Snapshot:
+    snapshot = tracemalloc.take_snapshot()
+    return snapshot.filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+    )
+
+
+def _get_top_site(
+    before: tracemalloc.Snapshot, after: tracemalloc.Snapshot
+) -> Optional[str]:
+    statistics = after.compare_to(before, "lineno")
+    if not statistics or statistics[0].size_diff <= 0:
+        return None
+    statistic = statistics[0]
+    frame = statistic.traceback[0]
+    size = _format_size(statistic.size_diff, sign=True)
+    return f"{size} at {_relative_path(frame.filename)}:{frame.lineno}"
+
+
+def _reset_peak() -> None:
+    reset_peak = getattr(tracemalloc, "reset_peak", None)  # Python 3.9+
+    if reset_peak is not None:
+        reset_peak()
+
+
+def _relative_path(filename: str) -> str:
+    relative_path = os.path.relpath(filename)
+    if relative_path.startswith(".."):
+        return filename
+    return relative_path
+
+
+def _format_size(size: int, sign: bool = False) -> str:
+    """Format a number of bytes.
+
+    >>> _format_size(3 * 1024**2)
+    '3.0 MiB'
+    >>> _format_size(-2048, sign=True)
+    '-2.0 KiB'
+    """
+    prefix = "+" if sign and size >= 0 else ""
+    value = float(size)
+    for unit in ["B", "KiB", "MiB"]:
+        if abs(value) < 1024 or unit == "MiB":
+            break
+        value /= 1024
+    if unit == "B":
+        return f"{prefix}{size} B"
+    return f"{prefix}{value:.1f} {unit}"
@@ -0,0 +1,32 @@
+"""Read and write Jupyter notebooks through :mod:`repoma.utilities`.
+
+:mod:`nbformat` is only imported once a notebook is read or written, because
+it takes long to import.
+"""
+
+import io
+from pathlib import Path
+from typing import TYPE_CHECKING, Union
+
+from . import read, write
+from .trace import span
+
+if TYPE_CHECKING:
+    from nbformat import NotebookNode
+
+
+def read_notebook(filename: Union[Path, str]) -> "NotebookNode":
+    import nbformat  # pylint: disable=import-outside-toplevel
+
+    content = read(filename)
+    with span("nbformat.reads", "parse", path=filename):
+        return nbformat.reads(content, as_version=nbformat.NO_CONVERT)
+
+
+def write_notebook(notebook: dict, filename: Union[Path, str]) -> None:
+    import nbformat  # pylint: disable=import-outside-toplevel
+
+    stream = io.StringIO()
+    with span("nbformat.write", "parse", path=filename):
+        nbformat.write(notebook, stream)
+    write(stream.getvalue(), filename)
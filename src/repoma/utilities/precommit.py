@@ -1,59 +1,261 @@
-# pylint: disable=no-name-in-module
-"""Helper functions for modifying :file:`.pre-commit.config.yaml`."""
+r"""Helper functions for modifying :file:`.pre-commit.config.yaml`.
 
-import os.path
+All checks share one `PrecommitDocument` per run, which is loaded with
+`load_precommit_document`. Its typed `~PrecommitDocument.config` view is used to
+look up repos and hooks and its round-trip tree is modified in place with
+`~PrecommitDocument.edit`. The round-trip tree is only parsed if a check modifies
+the file, and the file is rendered only once, after all checks that modify it
+have run. The exceptions are checks that run with a time budget, and runs that
+report findings with :code:`--format json` or :code:`sarif`, which render the file
+after each check that modified it:
+
+>>> document = PrecommitDocument.loads(
+...     "repos:\n  - repo: https://github.com/psf/black\n"
+...     "    rev: 22.3.0\n    hooks:\n      - id: black\n"
+... )
+>>> repo_index = document.get_repo_index(r".*/black$")
+>>> document.get_hook_index(repo_index, "black")
+0
+>>> document.config.repos[repo_index].rev
+'22.3.0'
+"""
+
+import io
 import re
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    overload,
+)
 
-import yaml
-from pydantic import BaseModel
-from ruamel.yaml import YAML
+import attr
 
 from repoma.errors import PrecommitError
 
-from . import CONFIG_PATH
-from .yaml import create_prettier_round_trip_yaml
+from . import CONFIG_PATH, exists, parse, write
+from .snapshot import get_active_snapshot
+from .trace import span
+from .yaml import create_prettier_round_trip_yaml, load_yaml
+
+if TYPE_CHECKING:
+    from ruamel.yaml import YAML
+
+T = TypeVar("T")
+ModelType = TypeVar("ModelType", bound="_Model")
+_REQUIRED: Any = object()
+
+
+class _Field(Generic[T]):
+    """Attribute of a `_Model` that is validated once it is accessed."""
+
+    __slots__ = ("name", "validate", "default")
+
+    def __init__(self, validate: Callable[[Any], T], default: Any = _REQUIRED) -> None:
+        self.name = ""
+        self.validate = validate
+        self.default = default
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    @overload
+    def __get__(self, instance: None, owner: type) -> "_Field[T]":
+        ...
+
+    @overload
+    def __get__(self, instance: "_Model", owner: type) -> T:
+        ...
+
+    def __get__(
+        self, instance: Optional["_Model"], owner: type
+    ) -> Union["_Field[T]", T]:
+        # pylint: disable=protected-access
+        if instance is None:
+            return self
+        values = instance._values
+        if self.name in values:
+            return values[self.name]
+        value = instance._data.get(self.name, self.default)
+        if value is _REQUIRED:
+            raise PrecommitError(
+                f"{type(instance).__name__} in {CONFIG_PATH.precommit} is missing"
+                f' field "{self.name}"'
+            )
+        try:
+            validated = self.validate(value)
+        except (TypeError, ValueError) as exception:
+            raise PrecommitError(
+                f'Field "{self.name}" of {type(instance).__name__} in'
+                f" {CONFIG_PATH.precommit} is invalid: {exception}"
+            ) from exception
+        values[self.name] = validated
+        return validated
+
+
+class _Model:
+    """Typed view of a mapping of which the fields are validated lazily.
+
+    Only the fields that are accessed are validated, so a check that looks at
+    one hook does not pay for validating the entire configuration. Models are
+    equal if the same fields have been set to equal values.
+    """
+
+    __slots__ = ("_data", "_values")
+    _fields: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)  # type: ignore[call-arg]
+        cls._fields = tuple(
+            name for name, value in vars(cls).items() if isinstance(value, _Field)
+        )
+
+    def __init__(self, **data: Any) -> None:
+        self._data = data
+        self._values: Dict[str, Any] = {}
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        assert isinstance(other, _Model)
+        fields_set = self.__get_fields_set()
+        if fields_set != other.__get_fields_set():
+            return False
+        return all(getattr(self, name) == getattr(other, name) for name in fields_set)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in self.__get_fields_set()
+        )
+        return f"{type(self).__name__}({fields})"
+
+    def dict(self, skip_defaults: bool = False) -> Dict[str, Any]:  # noqa: A003
+        """Convert to built-in types, like the :code:`dict` method of pydantic."""
+        return {
+            name: _to_builtin(getattr(self, name), skip_defaults)
+            for name in self._fields
+            if not skip_defaults or name in self._data
+        }
+
+    def __get_fields_set(self) -> List[str]:
+        return [name for name in self._fields if name in self._data]
+
+
+def _to_builtin(value: Any, skip_defaults: bool) -> Any:
+    if isinstance(value, _Model):
+        return value.dict(skip_defaults)
+    if isinstance(value, list):
+        return [_to_builtin(item, skip_defaults) for item in value]
+    return value
+
+
+def _to_bool(value: Any) -> bool:
+    """Convert to `bool` the way pydantic does.
+
+    >>> _to_bool("yes"), _to_bool(0)
+    (True, False)
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        value = value.lower()
+    if value in {0, "0", "off", "f", "false", "n", "no"}:
+        return False
+    if value in {1, "1", "on", "t", "true", "y", "yes"}:
+        return True
+    raise ValueError(f"{value!r} is not a boolean")
+
+
+def _to_str(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return str(value)
+    raise TypeError(f"{value!r} is not a string")
+
+
+def _to_str_list(value: Any) -> List[str]:
+    if not isinstance(value, (list, tuple)):
+        raise TypeError(f"{value!r} is not a list")
+    return [_to_str(item) for item in value]
 
 
-def load_round_trip_precommit_config(
-    path: Path = CONFIG_PATH.precommit,
-) -> Tuple[dict, YAML]:
-    yaml_parser = create_prettier_round_trip_yaml()
-    config = yaml_parser.load(path)
-    return config, yaml_parser
+def _optional(validate: Callable[[Any], T]) -> Callable[[Any], Optional[T]]:
+    def validate_optional(value: Any) -> Optional[T]:
+        if value is None:
+            return None
+        return validate(value)
 
+    return validate_optional
 
-class PrecommitCi(BaseModel):
+
+def _to_model(model: Type[ModelType]) -> Callable[[Any], ModelType]:
+    def validate_model(value: Any) -> ModelType:
+        if isinstance(value, model):
+            return value
+        if isinstance(value, Mapping):
+            return model(**value)
+        raise TypeError(f"{value!r} is not a mapping")
+
+    return validate_model
+
+
+def _to_model_list(model: Type[ModelType]) -> Callable[[Any], List[ModelType]]:
+    validate_model = _to_model(model)
+
+    def validate_list(value: Any) -> List[ModelType]:
+        if not isinstance(value, (list, tuple)):
+            raise TypeError(f"{value!r} is not a list")
+        return [validate_model(item) for item in value]
+
+    return validate_list
+
+
+class PrecommitCi(_Model):
     """https://pre-commit.ci/#configuration."""
 
-    autofix_commit_msg: str = "[pre-commit.ci] auto fixes [...]"
-    autofix_prs: bool = True
-    autoupdate_commit_msg: str = "[pre-commit.ci] pre-commit autoupdate"
-    autoupdate_schedule: str = "weekly"
-    skip: List[str] = []
-    submodules: bool = False
+    __slots__ = ()
+    autofix_commit_msg = _Field(_to_str, "[pre-commit.ci] auto fixes [...]")
+    autofix_prs = _Field(_to_bool, True)
+    autoupdate_commit_msg = _Field(_to_str, "[pre-commit.ci] pre-commit autoupdate")
+    autoupdate_schedule = _Field(_to_str, "weekly")
+    skip = _Field(_to_str_list, [])
+    submodules = _Field(_to_bool, False)
 
 
-class Hook(BaseModel):
+class Hook(_Model):
     """https://pre-commit.com/#pre-commit-configyaml---hooks."""
 
-    id: str  # noqa: A003
-    args: List[str] = []
-    name: Optional[str] = None
-    additional_dependencies: List[str] = []
-    files: Optional[str] = None
-    exclude: Optional[str] = None
-    types: Optional[List[str]] = None
-    alias: Optional[str] = None
+    __slots__ = ()
+    id = _Field(_to_str)  # noqa: A003
+    args = _Field(_to_str_list, [])
+    name = _Field(_optional(_to_str), None)
+    additional_dependencies = _Field(_to_str_list, [])
+    files = _Field(_optional(_to_str), None)
+    exclude = _Field(_optional(_to_str), None)
+    types = _Field(_optional(_to_str_list), None)
+    alias = _Field(_optional(_to_str), None)
 
 
-class Repo(BaseModel):
+class Repo(_Model):
     """https://pre-commit.com/#pre-commit-configyaml---repos."""
 
-    repo: str
-    rev: Optional[str] = None
-    hooks: List[Hook]
+    __slots__ = ()
+    repo = _Field(_to_str)
+    rev = _Field(_optional(_to_str), None)
+    hooks = _Field(_to_model_list(Hook))
 
     def get_hook_index(self, hook_id: str) -> Optional[int]:
         for i, hook in enumerate(self.hooks):
@@ -62,22 +264,20 @@ class Repo(BaseModel):
         return None
 
 
-class PrecommitConfig(BaseModel):
+class PrecommitConfig(_Model):
     """https://pre-commit.com/#pre-commit-configyaml---top-level."""
 
-    repos: List[Repo]
-    ci: Optional[PrecommitCi] = None
-    files: str = ""
-    exclude: str = "^$"
-    fail_fast: bool = False
+    __slots__ = ()
+    repos = _Field(_to_model_list(Repo))
+    ci = _Field(_optional(_to_model(PrecommitCi)), None)
+    files = _Field(_to_str, "")
+    exclude = _Field(_to_str, "^$")
+    fail_fast = _Field(_to_bool, False)
 
     @classmethod
     def load(cls, path: Union[Path, str] = CONFIG_PATH.precommit) -> "PrecommitConfig":
-        if not os.path.exists(path):
-            raise PrecommitError(f"This repository contains no {path}")
-        with open(path) as stream:
-            definition = yaml.safe_load(stream)
-        return PrecommitConfig(**definition)
+        """Load the typed view of the shared `PrecommitDocument`."""
+        return load_precommit_document(path).config
 
     def find_repo(self, search_pattern: str) -> Optional[Repo]:
         for repo in self.repos:
@@ -92,3 +292,118 @@ class PrecommitConfig(BaseModel):
             if re.search(search_pattern, url):
                 return i
         return None
+
+
+@attr.s(eq=False)
+class PrecommitDocument:
+    """Document of a :file:`.pre-commit-config.yaml`.
+
+    Repos and hooks are looked up through the typed `config` view of the
+    :attr:`data`. Look-ups by URL pattern and hook ID are indexed, so repeated
+    look-ups by different checks are cheap. The view and the indices are
+    recreated after the :attr:`tree` has been modified with `edit`.
+    """
+
+    content: str = attr.ib()
+    path: Union[Path, str] = attr.ib(default=CONFIG_PATH.precommit)
+    _tree: Any = attr.ib(default=None, init=False)
+    _yaml_parser: Optional["YAML"] = attr.ib(default=None, init=False)
+    _config: Optional[PrecommitConfig] = attr.ib(default=None, init=False)
+    _repo_indices: Dict[str, Optional[int]] = attr.ib(factory=dict, init=False)
+    _hook_indices: Dict[int, Dict[str, int]] = attr.ib(factory=dict, init=False)
+
+    @classmethod
+    def loads(cls, content: str) -> "PrecommitDocument":
+        return cls(content)
+
+    @property
+    def data(self) -> Any:
+        """Parsed content for reading only.
+
+        This is the :attr:`tree` once that has been loaded and otherwise the
+        shared result of `.load_yaml`, so it should not be modified.
+        """
+        if self._tree is not None:
+            return self._tree
+        return load_yaml(self.content)
+
+    @property
+    def tree(self) -> Any:
+        """Round-trip representation of the content, which keeps comments.
+
+        The slow round-trip parser is only run once the tree is accessed, which
+        is usually by a check that is about to `edit` the document.
+        """
+        if self._tree is None:
+            self._yaml_parser = create_prettier_round_trip_yaml()
+            with span("load YAML", "parse", path=self.path):
+                self._tree = self._yaml_parser.load(self.content)
+        return self._tree
+
+    @property
+    def config(self) -> PrecommitConfig:
+        """Typed view of the :attr:`data`, created once after each `edit`."""
+        if self._config is None:
+            self._config = PrecommitConfig(**self.data)
+        return self._config
+
+    def find_repo(self, search_pattern: str) -> Optional[Repo]:
+        index = self.get_repo_index(search_pattern)
+        if index is None:
+            return None
+        return self.config.repos[index]
+
+    def get_repo_index(self, search_pattern: str) -> Optional[int]:
+        if search_pattern not in self._repo_indices:
+            index = self.config.get_repo_index(search_pattern)
+            self._repo_indices[search_pattern] = index
+        return self._repo_indices[search_pattern]
+
+    def get_hook_index(self, repo_index: int, hook_id: str) -> Optional[int]:
+        if repo_index not in self._hook_indices:
+            hooks = self.config.repos[repo_index].hooks
+            self._hook_indices[repo_index] = {
+                hook.id: i for i, hook in reversed(list(enumerate(hooks)))
+            }
+        return self._hook_indices[repo_index].get(hook_id)
+
+    @contextmanager
+    def edit(self) -> Iterator[Any]:
+        """Modify the :attr:`tree` in place and have the file rewritten.
+
+        With an active `.RepositorySnapshot`, the file is rendered with `dumps`
+        only once it is needed, so that the document is not rendered again by
+        each check that modifies it. The file is not rewritten if the edit raises
+        an exception.
+        """
+        yield self.tree
+        self._config = None
+        self._repo_indices.clear()
+        self._hook_indices.clear()
+        snapshot = get_active_snapshot()
+        if snapshot is None:
+            write(self.dumps(), self.path)
+        else:
+            snapshot.write_later(self.path, self.dumps, _parse_precommit_document)
+
+    def dumps(self) -> str:
+        tree = self.tree
+        stream = io.StringIO()
+        with span("dump YAML", "parse", path=self.path):
+            self._yaml_parser.dump(tree, stream)  # type: ignore[union-attr]
+        return stream.getvalue()
+
+
+def load_precommit_document(
+    path: Union[Path, str] = CONFIG_PATH.precommit
+) -> PrecommitDocument:
+    """Load the `PrecommitDocument` that is shared through the active snapshot."""
+    if not exists(path):
+        raise PrecommitError(f"This repository contains no {path}")
+    document = parse(path, _parse_precommit_document)
+    document.path = path
+    return document
+
+
+def _parse_precommit_document(content: str) -> PrecommitDocument:
+    return PrecommitDocument.loads(content)
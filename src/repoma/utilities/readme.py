@@ -1,20 +1,21 @@
 """Helper functions for modifying :file:`README.md`."""
 
-import os.path
+import io
 import re
 
 from repoma.errors import PrecommitError
 
-__README_PATH = "README.md"
+from . import CONFIG_PATH, exists, read, write
+
+__README_PATH = CONFIG_PATH.readme
 
 
 def add_badge(badge: str) -> None:  # noqa: R701
-    if not os.path.exists(__README_PATH):
+    if not exists(__README_PATH):
         raise PrecommitError(
             f"This repository contains no {__README_PATH}, so cannot add badge"
         )
-    with open(__README_PATH) as stream:
-        lines = stream.readlines()
+    lines = io.StringIO(read(__README_PATH)).readlines()
     stripped_lines = {s.strip("\n") for s in lines}
     stripped_lines = {s.strip("<br>") for s in stripped_lines}
     stripped_lines = {s.strip("<br />") for s in stripped_lines}
@@ -29,19 +30,17 @@ def add_badge(badge: str) -> None:  # noqa: R701
             error_message += f"{__README_PATH} contains no title, so cannot add badge"
             raise PrecommitError(error_message)
         lines.insert(insert_position + 1, f"\n{badge}")
-        with open(__README_PATH, "w") as stream:
-            stream.writelines(lines)
+        write("".join(lines), __README_PATH)
         error_message += "Problem has been fixed."
         raise PrecommitError(error_message)
 
 
 def remove_badge(badge_pattern: str) -> None:
-    if not os.path.exists(__README_PATH):
+    if not exists(__README_PATH):
         raise PrecommitError(
             f"This repository contains no {__README_PATH}, so cannot add badge"
         )
-    with open(__README_PATH) as stream:
-        lines = stream.readlines()
+    lines = io.StringIO(read(__README_PATH)).readlines()
     badge_line = None
     for line in lines:
         if re.match(badge_pattern, line):
@@ -50,8 +49,7 @@ def remove_badge(badge_pattern: str) -> None:
     if badge_line is None:
         return
     lines.remove(badge_line)
-    with open(__README_PATH, "w") as stream:
-        stream.writelines(lines)
+    write("".join(lines), __README_PATH)
     raise PrecommitError(
         f"A badge has been removed from {__README_PATH}:\n\n  {badge_line}"
     )
@@ -0,0 +1,162 @@
+"""Registry of the checks that :code:`check-dev-files` can run.
+
+A check is declared with its name and the files that it reads and writes, so
+that it can be selected and scheduled without importing its module. Other
+packages can provide checks through the :code:`repoma.checks` entry point group:
+
+.. code-block:: ini
+
+    [options.entry_points]
+    repoma.checks =
+        my_check = my_package.repoma_checks:MY_CHECK
+
+where :code:`MY_CHECK` is a `Check` with the name :code:`my_check`. An entry
+point is only loaded if its check is selected, so the module that it points to
+should give the check function as an import path rather than import it. The
+installed packages are only searched for entry points once a name is needed
+that has not been registered otherwise, and only once per process.
+"""
+
+import sys
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import attr
+
+from .executor import Task
+
+ENTRY_POINT_GROUP = "repoma.checks"
+
+
+def _to_tuple(names: Iterable[str]) -> Tuple[str, ...]:
+    return tuple(names)
+
+
+@attr.s(frozen=True)
+class Check(Task):
+    """A `.Task` that can be selected by name.
+
+    >>> check = Check(
+    ...     "setup_cfg",
+    ...     "repoma.check_dev_files.setup_cfg:main",
+    ...     python_only=True,
+    ...     options=["ignore_author"],
+    ... )
+    >>> check.get_arguments({"ignore_author": True, "no_python": False})
+    {'ignore_author': True}
+    """
+
+    python_only: bool = attr.ib(default=False, kw_only=True)
+    """Only run this check on repositories of a Python package."""
+    options: Tuple[str, ...] = attr.ib(converter=_to_tuple, default=(), kw_only=True)
+    """Names of command-line options that are passed as keyword arguments."""
+
+    def get_arguments(self, options: Mapping[str, Any]) -> Dict[str, Any]:
+        """Get the keyword arguments of the check function from parsed options."""
+        missing = sorted(set(self.options) - set(options))
+        if missing:
+            raise ValueError(
+                f'Check "{self.name}" requires unknown options: {", ".join(missing)}'
+            )
+        return {name: options[name] for name in self.options}
+
+
+@attr.s(on_setattr=attr.setters.frozen)
+class CheckRegistry:
+    """Checks by name, in the order in which they were registered.
+
+    Checks can be registered lazily with a function that returns the `Check`.
+    That function is only called when the check is requested with :meth:`get`.
+
+    >>> registry = CheckRegistry()
+    >>> registry.register(Check("first", "repoma.check_dev_files.tox:main"))
+    >>> registry.register_lazy("second", lambda: Check("second", print))
+    >>> registry.select(skip=["first"])
+    ['second']
+    >>> registry.get("second").load()
+    <built-in function print>
+    """
+
+    _loaders: Dict[str, Callable[[], Check]] = attr.ib(factory=dict, init=False)
+    _checks: Dict[str, Check] = attr.ib(factory=dict, init=False)
+    _entry_point_groups: List[str] = attr.ib(factory=list, init=False)
+
+    def __contains__(self, name: object) -> bool:
+        if name not in self._loaders:
+            self.__register_entry_points()
+        return name in self._loaders
+
+    @property
+    def names(self) -> List[str]:
+        self.__register_entry_points()
+        return list(self._loaders)
+
+    def register(self, check: Check) -> None:
+        self.register_lazy(check.name, lambda: check)
+
+    def register_lazy(self, name: str, loader: Callable[[], Check]) -> None:
+        if name in self._loaders:
+            raise ValueError(f'There is already a check with the name "{name}"')
+        self._loaders[name] = loader
+
+    def load_entry_points(self, group: str = ENTRY_POINT_GROUP) -> None:
+        """Register the checks that installed packages provide, without loading them.
+
+        The entry points are only looked up once the :attr:`names` are needed or
+        a name is requested that has not been registered yet.
+        """
+        self._entry_point_groups.append(group)
+
+    def __register_entry_points(self) -> None:
+        while self._entry_point_groups:
+            group = self._entry_point_groups.pop(0)
+            for entry_point in _get_entry_points(group):
+                self.register_lazy(entry_point.name, entry_point.load)
+
+    def get(self, name: str) -> Check:
+        if name not in self._checks:
+            if name not in self:
+                raise KeyError(f'There is no check with the name "{name}"')
+            check = self._loaders[name]()
+            if not isinstance(check, Check):
+                raise TypeError(f'Check "{name}" was registered as a {type(check)}')
+            if check.name != name:
+                raise ValueError(
+                    f'Check "{name}" was registered with the name "{check.name}"'
+                )
+            self._checks[name] = check
+        return self._checks[name]
+
+    def select(
+        self, select: Optional[Iterable[str]] = None, skip: Iterable[str] = ()
+    ) -> List[str]:
+        """Get the names of the selected checks, in order of registration.
+
+        All checks are selected if :code:`select` is `None`.
+
+        Raises:
+            ValueError: If one of the given names has not been registered.
+        """
+        selected = set(self.names if select is None else select)
+        skipped = set(skip)
+        unknown = sorted(name for name in selected | skipped if name not in self)
+        if unknown:
+            raise ValueError(
+                f"Unknown checks: {', '.join(unknown)}."
+                f" Available checks are: {', '.join(self.names)}"
+            )
+        return [name for name in self._loaders if name in selected - skipped]
+
+
+@lru_cache(maxsize=None)
+def _get_entry_points(group: str) -> List[Any]:
+    # pylint: disable=import-outside-toplevel
+    if sys.version_info < (3, 8):
+        from importlib_metadata import entry_points
+
+        return list(entry_points(group=group))
+    from importlib.metadata import entry_points
+
+    if sys.version_info < (3, 10):
+        return list(entry_points().get(group, []))
+    return list(entry_points(group=group))
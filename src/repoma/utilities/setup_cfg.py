@@ -5,7 +5,7 @@ from typing import List
 
 from repoma.errors import PrecommitError
 
-from . import CONFIG_PATH
+from . import CONFIG_PATH, exists
 from .cfg import open_config
 
 
@@ -67,6 +67,6 @@ def get_repo_url() -> str:
 
 
 def open_setup_cfg() -> ConfigParser:
-    if not CONFIG_PATH.setup_cfg.exists():
+    if not exists(CONFIG_PATH.setup_cfg):
         raise PrecommitError("This repository contains no setup.cfg file")
     return open_config(CONFIG_PATH.setup_cfg)
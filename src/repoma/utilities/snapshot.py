@@ -0,0 +1,693 @@
+"""Run-scoped view of the files in a repository that is shared by all checks.
+
+A single :code:`check-dev-files` run used to read and parse the same
+configuration files over and over again and wrote files as soon as a check
+modified them. A `RepositorySnapshot` reads each file only once and also keeps
+the parsed forms of that content.
+
+Writes and removals are kept in memory as well, so later reads see the modified
+content. Repeated edits to the same file are merged and nothing touches the disk
+until `RepositorySnapshot.commit` is called. Files of which the content did not
+change are not rewritten at all, so that their modification time stays the same.
+A parsed object that several checks modify in place can even be serialized only
+once, with `RepositorySnapshot.write_later`.
+
+Hooks that process large files one by one release each of them with
+`RepositorySnapshot.flush`, so that the snapshot does not keep all of them in
+memory. Changes that may have to be thrown away are staged in a
+`RepositorySnapshot.fork` and only taken over with `RepositorySnapshot.merge`.
+
+The loaders and writers in :mod:`repoma.utilities` use the snapshot that has been
+activated with `RepositorySnapshot.activate` for the current thread and fall
+back to the disk if there is no active snapshot. Relative paths are resolved
+against the :attr:`~RepositorySnapshot.root` of the active snapshot, not against
+the working directory, so that threads can check different repositories.
+
+A snapshot with :code:`read_staged=True` reads files from the git index instead
+of the working tree, through a `.GitIndex`. Files that are not in the index are
+still read from disk. Fixes to files that also have unstaged edits are not
+written, because that would overwrite those edits.
+"""
+
+import difflib
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import attr
+
+from repoma.errors import PrecommitError
+
+from .file_index import FileIndex
+from .git_index import GitIndex
+from .trace import span
+
+T = TypeVar("T")
+
+_ACTIVE = threading.local()
+
+
+def _to_absolute_path(path: Union[Path, str]) -> str:
+    return os.path.abspath(path)
+
+
+@attr.s(on_setattr=attr.setters.frozen)
+class RepositorySnapshot:
+    """Raw content and parsed forms of the files in a repository.
+
+    Parsed objects are shared between all callers of `parse`, so they should be
+    copied before they are modified.
+    """
+
+    root: str = attr.ib(default=".", converter=_to_absolute_path)
+    """Directory against which relative paths are resolved."""
+    read_staged: bool = attr.ib(default=False, kw_only=True)
+    """Read the content that has been staged in git instead of the working tree."""
+    _parent: Optional["RepositorySnapshot"] = attr.ib(
+        default=None, kw_only=True, repr=False
+    )
+    """Snapshot of which this is a `fork`, with which it shares the indices."""
+    _content: Dict[str, Optional[bytes]] = attr.ib(factory=dict, init=False)
+    _parsed: Dict[Tuple[str, Callable], Any] = attr.ib(factory=dict, init=False)
+    _staged: Dict[str, Optional[bytes]] = attr.ib(factory=dict, init=False)
+    _deferred: Dict[str, Tuple[Callable[[], str], Callable]] = attr.ib(
+        factory=dict, init=False
+    )
+    _removed_directories: Set[str] = attr.ib(factory=set, init=False)
+    _base: Dict[str, Optional[bytes]] = attr.ib(factory=dict, init=False)
+    _lock: threading.RLock = attr.ib(factory=threading.RLock, init=False)
+    _file_index: Dict[str, FileIndex] = attr.ib(factory=dict, init=False)
+    _git_index: Dict[str, GitIndex] = attr.ib(factory=dict, init=False)
+    _activations: Dict[str, int] = attr.ib(factory=dict, init=False)
+
+    def exists(self, path: Union[Path, str]) -> bool:
+        with self._lock:
+            if self.__to_key(path) in self._deferred:
+                return True
+        return self.__load(path) is not None
+
+    def is_directory(self, path: Union[Path, str]) -> bool:
+        key = self.__to_key(path)
+        prefix = key + os.sep
+        with self._lock:
+            if any(
+                k.startswith(prefix) and content is not None
+                for k, content in self._staged.items()
+            ):
+                return True
+            return not self.__is_removed(key) and os.path.isdir(key)
+
+    def listdir(self, path: Union[Path, str]) -> List[str]:
+        """Names of the files and directories in a directory, like `os.listdir`."""
+        key = self.__to_key(path)
+        prefix = key + os.sep
+        with self._lock:
+            names: Set[str] = set()
+            if not self.__is_removed(key) and os.path.isdir(key):
+                names.update(
+                    name
+                    for name in os.listdir(key)
+                    if not self.__is_removed(os.path.join(key, name))
+                )
+            for staged_path, content in self._staged.items():
+                if not staged_path.startswith(prefix):
+                    continue
+                relative_path = staged_path[len(prefix) :]
+                name = relative_path.split(os.sep)[0]
+                if content is not None:
+                    names.add(name)
+                elif name == relative_path:
+                    names.discard(name)
+            return sorted(names)
+
+    def read_bytes(self, path: Union[Path, str]) -> bytes:
+        content = self.__load(path)
+        if content is None:
+            raise FileNotFoundError(f"No such file: '{path}'")
+        return content
+
+    def read_text(self, path: Union[Path, str]) -> str:
+        return self.__get_parsed(path, _decode, self.read_bytes)
+
+    def parse(self, path: Union[Path, str], parser: Callable[[str], T]) -> T:
+        """Parse the text content of a file and cache the result.
+
+        The result is cached per ``parser``, so ``parser`` should be a function
+        that is defined once (not a :code:`lambda` that is created on every
+        call).
+        """
+        return self.__get_parsed(path, parser, self.read_text)
+
+    def preload(self, paths: Iterable[Union[Path, str]]) -> None:
+        """Load the content of several files at once.
+
+        With :attr:`read_staged`, all files are read from the git index in one
+        round trip, instead of one after the other.
+        """
+        with self._lock:
+            keys = {self.__to_key(path) for path in paths}
+            keys = {k for k in keys if k not in self._content}
+            self._content.update(self.__read_many(sorted(keys)))
+
+    def write_bytes(self, path: Union[Path, str], content: bytes) -> None:
+        """Stage new content for a file, to be written by `commit`."""
+        key = self.__to_key(path)
+        with self._lock:
+            self._deferred.pop(key, None)
+            self.__forget(key)
+            self._content[key] = content
+            self._staged[key] = content
+
+    def write_text(self, path: Union[Path, str], content: str) -> None:
+        self.write_bytes(path, content.encode())
+
+    def write_later(
+        self,
+        path: Union[Path, str],
+        render: Callable[[], str],
+        parser: Callable[[str], Any],
+    ) -> None:
+        """Stage content for a file that is only rendered once it is needed.
+
+        Use this for the object that `parse` returns for ``parser`` if it is
+        modified in place. ``render`` is called once the file is read through
+        something else than that ``parser``, once the staged changes are
+        requested, or on `commit`. Several modifications therefore result in a
+        single serialization. The parsed object itself stays cached.
+        """
+        key = self.__to_key(path)
+        with self._lock:
+            self._deferred[key] = render, parser
+
+    def is_deferred(self, path: Union[Path, str]) -> bool:
+        """Check whether a file has been staged with `write_later` and not rendered."""
+        with self._lock:
+            return self.__to_key(path) in self._deferred
+
+    def remove(self, path: Union[Path, str]) -> None:
+        """Stage the removal of a file or of a directory with all of its content."""
+        key = self.__to_key(path)
+        with self._lock:
+            self._deferred.pop(key, None)
+            if self.is_directory(key):
+                self.__remove_directory(key)
+                return
+            if not self.exists(key):
+                raise FileNotFoundError(f"No such file or directory: '{path}'")
+            self.__forget(key)
+            self._content[key] = None
+            self._staged[key] = None
+
+    def fork(self) -> "RepositorySnapshot":
+        """Create a snapshot that stages its changes separately from this one.
+
+        The fork starts from the content and the staged changes of this snapshot.
+        Its own changes only become visible here once they are taken over with
+        `merge`, so they can also be thrown away, for instance those of a check
+        that did not finish in time. Files are parsed again in the fork, so that
+        objects that a check modifies in place are not shared either.
+        """
+        with self._lock:
+            self.__render_deferred()
+            fork = RepositorySnapshot(
+                self.root, read_staged=self.read_staged, parent=self
+            )
+            fork._content.update(self._content)
+            fork._staged.update(self._staged)
+            fork._base.update(self._staged)
+            fork._removed_directories.update(self._removed_directories)
+        return fork
+
+    def merge(self, fork: "RepositorySnapshot") -> None:
+        """Stage the changes that have been made in a `fork` of this snapshot."""
+        if fork._parent is not self:
+            raise ValueError("Can only merge a fork of this snapshot")
+        staged = fork.staged()
+        with self._lock:
+            for directory in sorted(fork._removed_directories):
+                if directory not in self._removed_directories:
+                    self.__remove_directory(directory)
+            for key, content in sorted(staged.items()):
+                if key in fork._base and fork._base[key] == content:
+                    continue
+                if content is None:
+                    self._deferred.pop(key, None)
+                    self.__forget(key)
+                    self._content[key] = None
+                    self._staged[key] = None
+                else:
+                    self.write_bytes(key, content)
+
+    @property
+    def file_index(self) -> FileIndex:
+        """Index of the files in the repository, created once per snapshot."""
+        if self._parent is not None:
+            return self._parent.file_index
+        with self._lock:
+            if self.root not in self._file_index:
+                self._file_index[self.root] = FileIndex.create(self.root)
+            return self._file_index[self.root]
+
+    def glob(self, pattern: str) -> List[str]:
+        """Paths relative to the :attr:`root` of the files that match a pattern.
+
+        Files are looked up in the :attr:`file_index`, so files that git ignores
+        are not found. Staged changes are taken into account.
+        """
+        index = self.file_index
+        with self._lock:
+            staged = {
+                self.relative_path(path): content is not None
+                for path, content in self._staged.items()
+            }
+            paths = set(index.match(pattern))
+            paths.update(FileIndex(self.root, staged).match(pattern))
+            return sorted(path for path in paths if self.__is_file(path, staged))
+
+    def relative_path(self, path: Union[Path, str]) -> str:
+        """Express a path relative to the :attr:`root`, with forward slashes."""
+        return Path(os.path.relpath(self.__to_key(path), self.root)).as_posix()
+
+    def rename(self, old: Union[Path, str], new: Union[Path, str]) -> None:
+        with self._lock:
+            self.write_bytes(new, self.read_bytes(old))
+            self.remove(old)
+
+    def invalidate(self, path: Union[Path, str]) -> None:
+        """Forget the content of a file, or of all files under a directory.
+
+        Use this if a file has been modified on disk by something else than the
+        snapshot itself. Staged changes are kept.
+        """
+        key = self.__to_key(path)
+        prefix = key + os.sep
+        with self._lock:
+            self.__render_deferred()
+            self.__forget(key)
+            self._file_index.clear()
+            for staged_path, content in self._staged.items():
+                if staged_path == key or staged_path.startswith(prefix):
+                    self._content[staged_path] = content
+
+    def refresh(self, paths: Iterable[Union[Path, str]]) -> List[str]:
+        """Forget the files of which the content on disk has changed.
+
+        Use this to keep a snapshot across several runs, so that the parsed forms
+        of files that did not change can be reused. Files that have not been
+        loaded are considered to have changed if they exist, so that temporary
+        files that have already been removed again are ignored.
+
+        Returns:
+            The given paths of the files that changed.
+        """
+        changed_paths = []
+        with self._lock:
+            self.__render_deferred()
+            for path in paths:
+                key = self.__to_key(path)
+                if key in self._content:
+                    if self._content[key] == _read_from_disk(key):
+                        continue
+                    self.__forget(key)
+                elif not os.path.isfile(key):
+                    continue
+                changed_paths.append(str(path))
+            if changed_paths:
+                self._file_index.clear()
+        return changed_paths
+
+    def staged(self) -> Dict[str, Optional[bytes]]:
+        """Content of the files that have been written or removed, by absolute path.
+
+        Content is `None` for removed files. Unlike `changes`, this does not read
+        anything from disk.
+        """
+        with self._lock:
+            self.__render_deferred()
+            return dict(self._staged)
+
+    def changes(self) -> Dict[str, Tuple[Optional[bytes], Optional[bytes]]]:
+        """Staged changes that `commit` would write to disk.
+
+        Maps the absolute paths of all files that would be modified, created, or
+        removed to their content on disk and their staged content. Content is
+        `None` for files that do not exist. With :attr:`read_staged`, the content
+        of files that are in the git index is compared to their staged content
+        instead.
+        """
+        with self._lock:
+            self.__render_deferred()
+            new_content: Dict[str, Optional[bytes]] = {}
+            for directory in self._removed_directories:
+                for root, _, filenames in os.walk(directory):
+                    for filename in filenames:
+                        new_content[os.path.join(root, filename)] = None
+            new_content.update(self._staged)
+        old_contents = self.__read_original(new_content)
+        changes = {}
+        for path, content in sorted(new_content.items()):
+            old_content = old_contents[path]
+            if old_content != content:
+                changes[path] = old_content, content
+        return changes
+
+    def diff(self) -> str:
+        """Staged changes as a unified diff, which can be applied with git."""
+        return "".join(
+            _create_diff(self.relative_path(path), old, new)
+            for path, (old, new) in self.changes().items()
+        )
+
+    def commit(self) -> None:
+        """Write all staged changes to disk.
+
+        Files are first written to a temporary file and then moved to their
+        destination, so that other processes never see half-written files. With
+        :attr:`read_staged`, files of which the content has not changed with
+        respect to the git index are not written, so that unstaged edits are kept.
+
+        Raises:
+            PrecommitError: With :attr:`read_staged`, if a file that has to be
+                fixed also has unstaged edits. Such a file is not written,
+                because that would overwrite those edits. The error message
+                contains the fixes as a diff against the index instead. All
+                other files are written.
+        """
+        with self._lock, span("commit", "io", files=len(self._staged)):
+            self.__render_deferred()
+            for directory in sorted(self._removed_directories):
+                if os.path.isdir(directory):
+                    shutil.rmtree(directory)
+            unwritten = {
+                path: content
+                for path, content in sorted(self._staged.items())
+                if not self.__write(path, content)
+            }
+            self._staged.clear()
+            self._removed_directories.clear()
+        if unwritten:
+            raise PrecommitError(self.__describe_unwritten(unwritten))
+
+    def flush(self, path: Union[Path, str], write: bool = True) -> None:
+        """Forget the content of a file that has been processed, to free memory.
+
+        Hooks that process many large files one after the other should call this
+        once they are done with a file, because otherwise the snapshot keeps the
+        content of all of them until the end of the run.
+
+        Args:
+            path: The file that has been processed.
+            write: Write the staged changes to the file right away, like `commit`
+                does. If `False`, the staged content is kept for `changes` and
+                `diff`, but only if it differs from the original content.
+        """
+        key = self.__to_key(path)
+        with self._lock:
+            self.__render_deferred(key)
+            self.__forget(key)
+            if key not in self._staged:
+                return
+            content = self._staged[key]
+            if write and self.__write(key, content):
+                del self._staged[key]
+            elif write:
+                self._content[key] = content  # reported by commit
+            elif self.__read_original([key])[key] == content:
+                del self._staged[key]
+            else:
+                self._content[key] = content
+
+    @contextmanager
+    def activate(self) -> Iterator["RepositorySnapshot"]:
+        """Make this the snapshot that is used by the current thread.
+
+        The :code:`git cat-file` process of :attr:`read_staged` is stopped once
+        the snapshot is no longer active in any thread. A snapshot can therefore
+        be activated in the worker threads of a run without restarting that
+        process for every check.
+        """
+        previous = get_active_snapshot()
+        _ACTIVE.snapshot = self
+        with self._lock:
+            self._activations[self.root] = self._activations.get(self.root, 0) + 1
+        try:
+            yield self
+        finally:
+            _ACTIVE.snapshot = previous
+            with self._lock:
+                self._activations[self.root] -= 1
+                if not self._activations[self.root] and self.root in self._git_index:
+                    self._git_index[self.root].close()
+
+    def __to_key(self, path: Union[Path, str]) -> str:
+        return os.path.normpath(os.path.join(self.root, path))
+
+    def __forget(self, key: str) -> None:
+        prefix = key + os.sep
+        for cached_path in list(self._content):
+            if cached_path == key or cached_path.startswith(prefix):
+                del self._content[cached_path]
+        for cached_path, parser in list(self._parsed):
+            if cached_path == key or cached_path.startswith(prefix):
+                del self._parsed[(cached_path, parser)]
+
+    def __remove_directory(self, key: str) -> None:
+        self.__forget(key)
+        self._removed_directories.add(key)
+        prefix = key + os.sep
+        for staged_path in list(self._staged):
+            if staged_path.startswith(prefix):
+                self._staged[staged_path] = None
+
+    def __render_deferred(self, key: Optional[str] = None) -> None:
+        keys = list(self._deferred) if key is None else [key]
+        for deferred_key in keys:
+            if deferred_key not in self._deferred:
+                continue
+            render, parser = self._deferred.pop(deferred_key)
+            parsed = self._parsed.get((deferred_key, parser))
+            content = render().encode()
+            self.__forget(deferred_key)
+            self._content[deferred_key] = content
+            self._staged[deferred_key] = content
+            if parsed is not None:
+                self._parsed[(deferred_key, parser)] = parsed
+
+    def __write(self, key: str, content: Optional[bytes]) -> bool:
+        """Write staged content to disk, unless that loses unstaged edits.
+
+        Returns `False` if the file has not been written for that reason.
+        """
+        if content is not None and self.__is_in_git_index(key, content):
+            return True
+        if self.__has_unstaged_edits(key):
+            return False
+        if content is not None:
+            write_if_changed(key, content)
+        elif os.path.isfile(key):
+            os.remove(key)
+        return True
+
+    def __has_unstaged_edits(self, key: str) -> bool:
+        if not self.read_staged:
+            return False
+        index = self.__get_git_index()
+        relative_path = self.relative_path(key)
+        if relative_path not in index:
+            return False
+        content_on_disk = _read_from_disk(key)
+        if content_on_disk is None:
+            return True
+        return not index.has_blob(relative_path, content_on_disk)
+
+    def __describe_unwritten(self, unwritten: Dict[str, Optional[bytes]]) -> str:
+        old_contents = self.__read_original(unwritten)
+        diff = "".join(
+            _create_diff(self.relative_path(path), old_contents[path], content)
+            for path, content in unwritten.items()
+        )
+        paths = "\n".join(f"  {self.relative_path(path)}" for path in unwritten)
+        return (
+            "The following files have unstaged changes, so their fixes have not"
+            f" been written:\n{paths}\nStage or stash these changes and run again,"
+            " or apply the fixes to the index with git apply --cached:\n"
+            + diff
+        )
+
+    def __is_file(self, path: str, staged: Dict[str, bool]) -> bool:
+        if path in staged:
+            return staged[path]
+        key = self.__to_key(path)
+        return not self.__is_removed(key) and os.path.isfile(key)
+
+    def __is_removed(self, key: str) -> bool:
+        return any(
+            key == directory or key.startswith(directory + os.sep)
+            for directory in self._removed_directories
+        )
+
+    def __load(self, path: Union[Path, str]) -> Optional[bytes]:
+        key = self.__to_key(path)
+        with self._lock:
+            self.__render_deferred(key)
+            if key not in self._content:
+                self._content.update(self.__read_many([key]))
+            return self._content[key]
+
+    def __read_many(self, keys: List[str]) -> Dict[str, Optional[bytes]]:
+        content: Dict[str, Optional[bytes]] = {
+            key: None for key in keys if self.__is_removed(key)
+        }
+        if self.read_staged:
+            relative_paths = {
+                self.relative_path(key): key for key in keys if key not in content
+            }
+            staged = self.__get_git_index().read_many(relative_paths)
+            content.update((relative_paths[p], blob) for p, blob in staged.items())
+        for key in keys:
+            if key not in content:
+                content[key] = _load(key)
+        return content
+
+    def __read_original(self, keys: Iterable[str]) -> Dict[str, Optional[bytes]]:
+        """Content of files on disk, or in the git index with :attr:`read_staged`."""
+        keys = list(keys)
+        content: Dict[str, Optional[bytes]] = {}
+        if self.read_staged:
+            relative_paths = {self.relative_path(key): key for key in keys}
+            index = self.__get_git_index()
+            try:
+                staged = index.read_many(relative_paths)
+            finally:
+                if not self.__is_active():
+                    index.close()
+            content.update((relative_paths[p], blob) for p, blob in staged.items())
+        for key in keys:
+            if key not in content:
+                content[key] = _read_from_disk(key)
+        return content
+
+    def __is_in_git_index(self, key: str, content: bytes) -> bool:
+        if not self.read_staged:
+            return False
+        index = self.__get_git_index()
+        return index.has_blob(self.relative_path(key), content)
+
+    def __is_active(self) -> bool:
+        if self._parent is not None:
+            return self._parent.__is_active()
+        with self._lock:
+            return self._activations.get(self.root, 0) > 0
+
+    def __get_git_index(self) -> GitIndex:
+        if self._parent is not None:
+            return self._parent.__get_git_index()
+        if self.root not in self._git_index:
+            self._git_index[self.root] = GitIndex(self.root)
+        return self._git_index[self.root]
+
+    def __get_parsed(
+        self,
+        path: Union[Path, str],
+        parser: Callable[[Any], T],
+        load: Callable[[Union[Path, str]], Any],
+    ) -> T:
+        key = self.__to_key(path), parser
+        with self._lock:
+            deferred = self._deferred.get(key[0])
+            if deferred is not None and deferred[1] is not parser:
+                self.__render_deferred(key[0])
+            if key in self._parsed:
+                return self._parsed[key]
+        parsed = parser(load(path))
+        with self._lock:
+            return self._parsed.setdefault(key, parsed)
+
+
+def get_active_snapshot() -> Optional[RepositorySnapshot]:
+    return getattr(_ACTIVE, "snapshot", None)
+
+
+def write_if_changed(path: Union[Path, str], content: bytes) -> bool:
+    """Atomically write a file, unless it already has this content.
+
+    Returns `True` if the file has been written.
+    """
+    path = os.path.abspath(path)
+    if _read_from_disk(path) == content:
+        return False
+    directory, filename = os.path.split(path)
+    os.makedirs(directory, exist_ok=True)
+    temporary_path = os.path.join(
+        directory, f".{filename}.{os.getpid()}-{threading.get_ident()}.tmp"
+    )
+    try:
+        with open(temporary_path, "xb") as stream:
+            stream.write(content)
+        if os.path.isfile(path):
+            shutil.copymode(path, temporary_path)
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    return True
+
+
+def _load(key: str) -> Optional[bytes]:
+    try:
+        with span("load", "io", path=key), open(key, "rb") as stream:
+            return stream.read()
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        return None
+
+
+def _read_from_disk(path: str) -> Optional[bytes]:
+    if not os.path.isfile(path):
+        return None
+    with open(path, "rb") as stream:
+        return stream.read()
+
+
+def _create_diff(path: str, old: Optional[bytes], new: Optional[bytes]) -> str:
+    filename = Path(path).as_posix()
+    from_file = "/dev/null" if old is None else f"a/{filename}"
+    to_file = "/dev/null" if new is None else f"b/{filename}"
+    lines = difflib.unified_diff(
+        _to_diff_lines(old), _to_diff_lines(new), from_file, to_file
+    )
+    header = f"diff --git a/{filename} b/{filename}\n"
+    if old is None:
+        header += "new file mode 100644\n"
+    elif new is None:
+        header += "deleted file mode 100644\n"
+    return header + "".join(lines)
+
+
+def _to_diff_lines(content: Optional[bytes]) -> List[str]:
+    if content is None:
+        return []
+    lines = content.decode(errors="replace").splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n\\ No newline at end of file\n"
+    return lines
+
+
+def _decode(content: bytes) -> str:
+    # universal newlines, like open() in text mode
+    return content.decode().replace("\r\n", "\n").replace("\r", "\n")
@@ -0,0 +1,151 @@
+"""Access to the configuration templates that are bundled with repoma.
+
+The templates under :file:`.github` and :file:`.template` in the repoma package
+are packed into a single resource, :file:`templates.json`, when the package is
+built (see :file:`setup.py`). Next to its content, the bundle contains the
+SHA-256 digest of each template and its parsed form if the template is a JSON or
+YAML file. Checks can therefore compare the digest of a file in a repository
+before comparing full texts, and do not have to parse templates.
+
+If there is no bundle, as in an editable install, the templates are packed in
+memory from the files of the package the first time that they are needed.
+
+>>> template = get_template(".template/.prettierrc")
+>>> template.matches(template.content)
+True
+>>> template.parsed is None
+True
+"""
+
+import hashlib
+import json
+import os
+import pkgutil
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import attr
+
+from . import REPOMA_DIR
+
+BUNDLE_NAME = "templates.json"
+TEMPLATE_DIRECTORIES = (".github", ".template")
+
+
+@attr.s(frozen=True)
+class Template:
+    """Content of a bundled template file."""
+
+    path: str = attr.ib()
+    """Path relative to the repoma package, like :code:`.template/.gitpod.yml`."""
+    content: str = attr.ib()
+    digest: str = attr.ib()
+    """SHA-256 digest of the encoded :attr:`content`."""
+    parsed: Any = attr.ib(default=None)
+    """Parsed form of a JSON or YAML file. Should be copied before modifying."""
+
+    def matches(self, content: Union[bytes, str]) -> bool:
+        """Check whether some file content is equal to this template."""
+        return _compute_digest(content) == self.digest
+
+
+def get_template(path: Union[Path, str]) -> Template:
+    """Get a template by its path relative to the repoma package."""
+    key = Path(path).as_posix()
+    templates = _load_templates()
+    if key not in templates:
+        raise FileNotFoundError(f"repoma does not bundle a template {key}")
+    return templates[key]
+
+
+def list_templates(directory: Union[Path, str]) -> List[str]:
+    """List the templates under a directory, relative to that directory.
+
+    >>> list_templates(".template")
+    ['.cspell.json', '.gitpod.yml', '.prettierrc']
+    """
+    prefix = Path(directory).as_posix().rstrip("/") + "/"
+    return sorted(
+        path[len(prefix) :] for path in _load_templates() if path.startswith(prefix)
+    )
+
+
+def pack_templates(package_dir: Union[Path, str] = REPOMA_DIR) -> Dict[str, dict]:
+    """Create the bundle of all templates in a repoma package directory."""
+    bundle = {}
+    for directory in TEMPLATE_DIRECTORIES:
+        top = Path(package_dir) / directory
+        for root, _, filenames in os.walk(top, followlinks=True):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                with open(path, "rb") as stream:
+                    content = stream.read()
+                key = Path(os.path.relpath(path, package_dir)).as_posix()
+                bundle[key] = {
+                    "content": content.decode(),
+                    "digest": _compute_digest(content),
+                    "parsed": _parse(filename, content.decode()),
+                }
+    return dict(sorted(bundle.items()))
+
+
+def write_bundle(output_dir: Union[Path, str], package_dir: Union[Path, str]) -> None:
+    """Pack the templates of a package and write them to the bundle resource."""
+    bundle = pack_templates(package_dir)
+    with open(Path(output_dir) / BUNDLE_NAME, "w") as stream:
+        json.dump(bundle, stream, indent=None, separators=(",", ":"))
+
+
+@lru_cache(maxsize=None)
+def _load_templates() -> Dict[str, Template]:
+    resource = _read_bundle()
+    if resource is None:
+        bundle = pack_templates()
+    else:
+        bundle = json.loads(resource)
+    return {path: Template(path, **fields) for path, fields in bundle.items()}
+
+
+def _read_bundle() -> Optional[bytes]:
+    # pylint: disable=import-outside-toplevel
+    try:
+        if sys.version_info >= (3, 9):
+            from importlib.resources import files
+
+            return files("repoma").joinpath(BUNDLE_NAME).read_bytes()
+        if sys.version_info >= (3, 7):
+            from importlib.resources import read_binary
+
+            return read_binary("repoma", BUNDLE_NAME)
+        return pkgutil.get_data("repoma", BUNDLE_NAME)
+    except FileNotFoundError:
+        return None
+
+
+def _parse(filename: str, content: str) -> Any:
+    """Parse JSON and YAML templates, if their parsed form is valid JSON.
+
+    >>> _parse("ci.yml", "on: push")  # YAML 1.1 turns 'on' into True
+    >>> _parse(".gitpod.yml", "tasks: [init: pip install .]")
+    {'tasks': [{'init': 'pip install .'}]}
+    """
+    if filename.endswith(".json"):
+        return json.loads(content)
+    if filename.endswith((".yml", ".yaml")):
+        from .yaml import load_yaml  # pylint: disable=import-outside-toplevel
+
+        parsed = load_yaml(content)
+        try:
+            if json.loads(json.dumps(parsed)) == parsed:
+                return parsed
+        except TypeError:
+            pass
+    return None
+
+
+def _compute_digest(content: Union[bytes, str]) -> str:
+    if isinstance(content, str):
+        content = content.encode()
+    return hashlib.sha256(content).hexdigest()
@@ -0,0 +1,114 @@
+"""Record where time is spent, as nested spans in Chrome's trace-event format.
+
+Wrap a piece of code in a `span` to record how long it takes. Spans are only
+recorded while a `Tracer` is activated, otherwise `span` returns a context
+manager that does nothing. The recorded spans can be dumped with `Tracer.dump`
+and viewed with `Perfetto <https://ui.perfetto.dev>`_ or
+:code:`chrome://tracing`.
+
+>>> tracer = Tracer()
+>>> with tracer.activate():
+...     with span("check", path="setup.cfg"):
+...         pass
+>>> [event["name"] for event in tracer.events]
+['check']
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Union
+
+import attr
+
+_ACTIVE_TRACER: Optional["Tracer"] = None
+
+
+@attr.s(on_setattr=attr.setters.frozen)
+class Tracer:
+    """Collection of spans that were recorded while this tracer was active."""
+
+    events: List[Dict[str, Any]] = attr.ib(factory=list, init=False)
+    _start: float = attr.ib(factory=time.perf_counter, init=False)
+
+    def span(self, name: str, category: str, **args: Any) -> "_Span":
+        return _Span(self, name, category, args)
+
+    def record(
+        self, name: str, category: str, start: float, stop: float, args: dict
+    ) -> None:
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self._start) * 1e6,
+            "dur": (stop - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = {k: str(v) for k, v in args.items()}
+        self.events.append(event)
+
+    @contextmanager
+    def activate(self) -> Iterator["Tracer"]:
+        """Record spans of all threads with this tracer."""
+        global _ACTIVE_TRACER  # pylint: disable=global-statement
+        previous = _ACTIVE_TRACER
+        _ACTIVE_TRACER = self
+        try:
+            yield self
+        finally:
+            _ACTIVE_TRACER = previous
+
+    def dump(self, path: Union[Path, str]) -> None:
+        """Write the recorded spans to a JSON file in trace-event format."""
+        with open(path, "w") as stream:
+            json.dump({"traceEvents": self.events}, stream)
+
+
+class _Span:
+    __slots__ = ("__tracer", "__name", "__category", "__args", "__start")
+
+    def __init__(self, tracer: Tracer, name: str, category: str, args: dict) -> None:
+        self.__tracer = tracer
+        self.__name = name
+        self.__category = category
+        self.__args = args
+        self.__start = 0.0
+
+    def __enter__(self) -> None:
+        self.__start = time.perf_counter()
+
+    def __exit__(self, *_: Any) -> None:
+        stop = time.perf_counter()
+        self.__tracer.record(
+            self.__name, self.__category, self.__start, stop, self.__args
+        )
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *_: Any) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str, category: str = "repoma", **args: Any) -> ContextManager[None]:
+    """Record the duration of a :code:`with` block if a `Tracer` is active.
+
+    Keyword arguments are shown as details of the span.
+    """
+    tracer = _ACTIVE_TRACER
+    if tracer is None:
+        return _NO_SPAN
+    return tracer.span(name, category, **args)
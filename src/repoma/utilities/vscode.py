@@ -4,17 +4,15 @@ import json
 
 from repoma.errors import PrecommitError
 
-from . import CONFIG_PATH
+from . import CONFIG_PATH, exists, parse, write
 
 
 def add_vscode_extension_recommendation(extension_name: str) -> None:
-    if not CONFIG_PATH.vscode_extensions.exists():
-        CONFIG_PATH.vscode_extensions.parent.mkdir(exist_ok=True)
+    if not exists(CONFIG_PATH.vscode_extensions):
         config = {}
     else:
-        with open(CONFIG_PATH.vscode_extensions) as stream:
-            config = json.load(stream)
-    recommended_extensions = config.get("recommendations", [])
+        config = dict(parse(CONFIG_PATH.vscode_extensions, json.loads))
+    recommended_extensions = list(config.get("recommendations", []))
     if extension_name not in set(recommended_extensions):
         recommended_extensions.append(extension_name)
         config["recommendations"] = recommended_extensions
@@ -25,10 +23,9 @@ def add_vscode_extension_recommendation(extension_name: str) -> None:
 
 
 def remove_vscode_extension_recommendation(extension_name: str) -> None:
-    if not CONFIG_PATH.vscode_extensions.exists():
+    if not exists(CONFIG_PATH.vscode_extensions):
         return
-    with open(CONFIG_PATH.vscode_extensions) as stream:
-        config = json.load(stream)
+    config = dict(parse(CONFIG_PATH.vscode_extensions, json.loads))
     recommended_extensions = list(config.get("recommendations", []))
     if extension_name in recommended_extensions:
         recommended_extensions.remove(extension_name)
@@ -40,6 +37,5 @@ def remove_vscode_extension_recommendation(extension_name: str) -> None:
 
 
 def __dump_vscode_config(config: dict) -> None:
-    with open(CONFIG_PATH.vscode_extensions, "w") as stream:
-        json.dump(config, stream, indent=2, sort_keys=True)
-        stream.write("\n")
+    content = json.dumps(config, indent=2, sort_keys=True) + "\n"
+    write(content, CONFIG_PATH.vscode_extensions)
@@ -0,0 +1,264 @@
+"""Wait for files in a repository to change, for :code:`check-dev-files --watch`.
+
+On Linux, changes are reported by inotify, which is called through
+:mod:`ctypes`, so that no additional dependencies are needed. Where inotify is
+not available, a `PollingWatcher` compares the modification times of the files
+in a `.FileIndex` instead.
+"""
+
+import errno
+import os
+import select
+import struct
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Union
+
+import attr
+
+from .cache import CACHE_DIR
+from .file_index import FileIndex, list_directories
+
+if TYPE_CHECKING:
+    import ctypes
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_FILE_CHANGES = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+EXCLUDED_DIRECTORIES = [CACHE_DIR.as_posix()]
+"""Directories that are never watched, even if git does not ignore them.
+
+Each run of :code:`check-dev-files` writes its results to the cache directory, so
+watching it would start the next run.
+"""
+
+DEBOUNCE = 0.05
+"""Seconds to wait for more changes after the first one, for instance while an
+editor saves a file through a temporary file."""
+
+
+def _to_absolute_path(path: Union[Path, str]) -> str:
+    return os.path.abspath(path)
+
+
+@attr.s
+class InotifyWatcher:
+    """Watch all directories of a repository that git does not ignore with inotify.
+
+    Directories that are created later on are watched as well.
+    """
+
+    root: str = attr.ib(converter=_to_absolute_path)
+    name = "inotify"
+    _file_descriptor: int = attr.ib(init=False)
+    _directories: Dict[int, str] = attr.ib(factory=dict, init=False)
+
+    def __attrs_post_init__(self) -> None:
+        libc = _load_libc()
+        self._file_descriptor = libc.inotify_init1(os.O_CLOEXEC)
+        if self._file_descriptor < 0:
+            raise _get_os_error("inotify_init1")
+        try:
+            for directory in list_directories(self.root, EXCLUDED_DIRECTORIES):
+                self.__add_watch(directory)
+        except OSError:
+            self.close()
+            raise
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[List[str]]:
+        """Block until files change and get their paths relative to the :attr:`root`.
+
+        Returns an empty list if nothing changed within the timeout, and `None`
+        if it is not known which files changed.
+        """
+        changed_files: Set[str] = set()
+        while True:
+            readable, _, _ = select.select([self._file_descriptor], [], [], timeout)
+            if not readable:
+                return sorted(changed_files)
+            buffer = os.read(self._file_descriptor, 64 * 1024)
+            for event_mask, path in self.__parse_events(buffer):
+                if event_mask & IN_Q_OVERFLOW:
+                    return None
+                if not event_mask & IN_ISDIR:
+                    if event_mask & _FILE_CHANGES:
+                        changed_files.add(path)
+                elif event_mask & (IN_CREATE | IN_MOVED_TO):
+                    changed_files.update(self.__watch_new_directories())
+                elif event_mask & IN_MOVED_FROM:
+                    return None
+            if changed_files:
+                timeout = DEBOUNCE
+
+    def close(self) -> None:
+        if self._file_descriptor >= 0:
+            os.close(self._file_descriptor)
+            self._file_descriptor = -1
+
+    def __enter__(self) -> "InotifyWatcher":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def __add_watch(self, directory: str) -> None:
+        path = os.path.join(self.root, directory).encode()
+        libc = _load_libc()
+        watch_descriptor = libc.inotify_add_watch(
+            self._file_descriptor, path, _WATCH_MASK
+        )
+        if watch_descriptor < 0:
+            raise _get_os_error("inotify_add_watch", directory)
+        self._directories[watch_descriptor] = directory
+
+    def __watch_new_directories(self) -> List[str]:
+        """Watch directories that have been created and list the files in them."""
+        watched_directories = set(self._directories.values())
+        new_files: List[str] = []
+        for directory in list_directories(self.root, EXCLUDED_DIRECTORIES):
+            if directory in watched_directories:
+                continue
+            try:
+                self.__add_watch(directory)
+                absolute_path = os.path.join(self.root, directory)
+                new_files.extend(
+                    _join(directory, name)
+                    for name in os.listdir(absolute_path)
+                    if os.path.isfile(os.path.join(absolute_path, name))
+                )
+            except FileNotFoundError:
+                continue
+        return new_files
+
+    def __parse_events(self, buffer: bytes) -> List[Tuple[int, str]]:
+        events = []
+        offset = 0
+        while offset < len(buffer):
+            watch_descriptor, event_mask, _, length = _EVENT_HEADER.unpack_from(
+                buffer, offset
+            )
+            offset += _EVENT_HEADER.size
+            name = buffer[offset : offset + length].rstrip(b"\0").decode()
+            offset += length
+            if event_mask & IN_IGNORED:
+                self._directories.pop(watch_descriptor, None)
+                continue
+            directory = self._directories.get(watch_descriptor)
+            if directory is None and not event_mask & IN_Q_OVERFLOW:
+                continue
+            events.append((event_mask, _join(directory or ".", name)))
+        return events
+
+
+@attr.s
+class PollingWatcher:
+    """Detect changes by comparing the modification times of files periodically."""
+
+    root: str = attr.ib(converter=_to_absolute_path)
+    interval: float = attr.ib(default=0.5)
+    """Seconds between two scans of the repository."""
+    name = "polling"
+    _stats: Dict[str, Tuple[int, int]] = attr.ib(init=False)
+
+    def __attrs_post_init__(self) -> None:
+        self._stats = self.__scan()
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[List[str]]:
+        """Block until files change and get their paths relative to the :attr:`root`.
+
+        Returns an empty list if nothing changed within the timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            stats = self.__scan()
+            paths = set(stats) | set(self._stats)
+            changed_files = [p for p in paths if stats.get(p) != self._stats.get(p)]
+            self._stats = stats
+            if changed_files:
+                return sorted(changed_files)
+            if deadline is not None and time.monotonic() >= deadline:
+                return []
+            time.sleep(self.interval)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "PollingWatcher":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def __scan(self) -> Dict[str, Tuple[int, int]]:
+        stats = {}
+        for path in FileIndex.create(self.root).files:
+            if _is_excluded(path):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.root, path))
+            except OSError:
+                continue
+            stats[path] = stat.st_mtime_ns, stat.st_size
+        return stats
+
+
+Watcher = Union[InotifyWatcher, PollingWatcher]
+
+
+def create_watcher(root: Union[Path, str] = ".", polling: bool = False) -> Watcher:
+    """Watch a repository with inotify, or by polling if that is not possible."""
+    if not polling:
+        try:
+            return InotifyWatcher(os.fspath(root))
+        except (AttributeError, OSError):
+            pass
+    return PollingWatcher(os.fspath(root))
+
+
+@lru_cache(maxsize=None)
+def _load_libc() -> "ctypes.CDLL":
+    # pylint: disable=import-outside-toplevel,redefined-outer-name
+    import ctypes
+    import ctypes.util
+
+    return ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+
+
+def _get_os_error(function_name: str, path: Optional[str] = None) -> OSError:
+    import ctypes  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+    error_number = ctypes.get_errno()
+    message = f"{function_name}: {os.strerror(error_number)}"
+    if error_number == errno.ENOENT:
+        return FileNotFoundError(error_number, message, path)
+    return OSError(error_number, message, path)
+
+
+def _is_excluded(path: str) -> bool:
+    """Check whether a file is in one of the `EXCLUDED_DIRECTORIES`.
+
+    >>> _is_excluded(".cache/repoma/check-dev-files.json"), _is_excluded("setup.cfg")
+    (True, False)
+    """
+    return any(path.startswith(f"{d}/") for d in EXCLUDED_DIRECTORIES)
+
+
+def _join(directory: str, name: str) -> str:
+    """Join a relative directory and a name with a forward slash.
+
+    >>> _join(".", "setup.cfg"), _join("docs", "conf.py")
+    ('setup.cfg', 'docs/conf.py')
+    """
+    if directory == ".":
+        return name
+    return f"{directory}/{name}"
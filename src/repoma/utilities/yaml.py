@@ -1,10 +1,34 @@
-"""Helper functions for reading and writing to YAML files."""
+"""Helper functions for reading and writing to YAML files.
 
+Files that are only read are parsed with `load_yaml`, which is fast. The
+round-trip parser of :mod:`ruamel.yaml` keeps comments and formatting, but is
+much slower, so it is only used for files that are written.
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Union
 
 import yaml
-from ruamel.yaml import YAML
+
+from . import write
+from .trace import span
+
+try:
+    from yaml import CSafeLoader as FastSafeLoader
+except ImportError:  # PyYAML has been built without libyaml
+    from yaml import SafeLoader as FastSafeLoader  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from ruamel.yaml import YAML
+    from ruamel.yaml.comments import CommentedSeq
+
+__PARSE_CACHE_SIZE = 128
+__PARSE_CACHE: "OrderedDict[bytes, Any]" = OrderedDict()
+__PARSE_CACHE_LOCK = threading.Lock()
 
 
 class _IncreasedYamlIndent(yaml.Dumper):
@@ -19,7 +43,35 @@ class _IncreasedYamlIndent(yaml.Dumper):
             super().write_line_break()
 
 
-def create_prettier_round_trip_yaml() -> YAML:
+def load_yaml(content: str) -> Any:
+    """Parse YAML content that is only read.
+
+    The content is parsed with libyaml if PyYAML has been built with it. Results
+    are cached by a hash of the content, so the same content is parsed only once,
+    even if it is read through different paths or in another run of
+    :code:`check-dev-files --watch`. The result is shared by all callers, so it
+    should be copied before it is modified.
+
+    >>> load_yaml("repos: []") is load_yaml("repos: []")
+    True
+    """
+    digest = hashlib.sha256(content.encode()).digest()
+    with __PARSE_CACHE_LOCK:
+        if digest in __PARSE_CACHE:
+            __PARSE_CACHE.move_to_end(digest)
+            return __PARSE_CACHE[digest]
+    with span("load YAML", "parse", loader=FastSafeLoader.__name__):
+        parsed = yaml.load(content, Loader=FastSafeLoader)  # noqa: S506
+    with __PARSE_CACHE_LOCK:
+        __PARSE_CACHE[digest] = parsed
+        while len(__PARSE_CACHE) > __PARSE_CACHE_SIZE:
+            __PARSE_CACHE.popitem(last=False)
+    return parsed
+
+
+def create_prettier_round_trip_yaml() -> "YAML":
+    from ruamel.yaml import YAML  # pylint: disable=import-outside-toplevel
+
     yaml_parser = YAML(typ="rt")
     yaml_parser.preserve_quotes = True  # type: ignore[assignment]
     yaml_parser.map_indent = 2  # type: ignore[assignment]
@@ -28,13 +80,41 @@ def create_prettier_round_trip_yaml() -> YAML:
     return yaml_parser
 
 
+def write_round_trip_yaml(
+    yaml_parser: "YAML", definition: Any, output_path: Union[Path, str]
+) -> None:
+    """Write a YAML document that was loaded with a round-trip :code:`YAML`."""
+    stream = io.StringIO()
+    with span("dump YAML", "parse", path=output_path):
+        yaml_parser.dump(definition, stream)
+    write(stream.getvalue(), output_path)
+
+
+def update_round_trip_sequence(sequence: "CommentedSeq", items: Iterable) -> None:
+    """Replace the items of a round-trip sequence in place, keeping its comments.
+
+    Assigning a new list would drop the comments of the old one, including the
+    comment lines after its last item, which belong to whatever follows it.
+    """
+    items = list(items)
+    trailing_comment = sequence.ca.items.pop(len(sequence) - 1, None)
+    del sequence[len(items) :]
+    for i, item in enumerate(items):
+        if i < len(sequence):
+            sequence[i] = item
+        else:
+            sequence.append(item)
+    if trailing_comment is not None and items:
+        sequence.ca.items[len(items) - 1] = trailing_comment
+
+
 def write_yaml(definition: dict, output_path: Union[Path, str]) -> None:
     """Write a `dict` to disk with standardized YAML formatting."""
-    with open(output_path, "w") as stream:
-        yaml.dump(
+    with span("dump YAML", "parse", path=output_path):
+        content = yaml.dump(
             definition,
-            stream,
             sort_keys=False,
             Dumper=_IncreasedYamlIndent,
             default_flow_style=False,
         )
+    write(content, output_path)
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pytest
+
+from repoma.check_dev_files import create_registry
+from repoma.check_dev_files.github_workflows import check_docs_workflow
+from repoma.errors import PrecommitError
+from repoma.utilities.snapshot import RepositorySnapshot
+
+
+@pytest.mark.parametrize("directory", ["doc", "docs"])
+def test_check_docs_workflow(tmp_path: Path, directory: str):
+    (tmp_path / ".gitignore").write_text("_build/\n")
+    (tmp_path / directory / "_build").mkdir(parents=True)
+    (tmp_path / directory / "_build" / "index.html").write_text("\n")
+    snapshot = RepositorySnapshot(root=tmp_path)
+    with snapshot.activate():
+        check_docs_workflow()
+        assert snapshot.staged() == {}
+
+        (tmp_path / directory / "index.md").write_text("# Documentation\n")
+        snapshot.invalidate(".")
+        with pytest.raises(PrecommitError, match=r"Created .*ci-docs\.yml"):
+            check_docs_workflow()
+    assert sorted(Path(path).name for path in snapshot.staged()) == [
+        "ci-docs.yml",
+        "linkcheck.yml",
+    ]
+
+
+@pytest.mark.parametrize("check_name", ["docs_workflows", "github_workflows"])
+def test_workflow_checks_read_constraints(check_name: str):
+    # workflow files are copied differently if there are pinned constraints
+    check = create_registry().get(check_name)
+    assert check.depends_on([".constraints/py3.8.txt"])
@@ -0,0 +1,57 @@
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from repoma.check_dev_files.pyupgrade import _update_main_pyupgrade_hook
+from repoma.errors import PrecommitError
+from repoma.utilities.precommit import PrecommitConfig
+from repoma.utilities.snapshot import RepositorySnapshot
+
+
+def test_update_main_pyupgrade_hook(tmp_path: Path):
+    (tmp_path / "setup.cfg").write_text(
+        dedent(
+            """
+            [metadata]
+            classifiers =
+                Programming Language :: Python :: 3.7
+                Programming Language :: Python :: 3.8
+            """
+        )
+    )
+    (tmp_path / ".pre-commit-config.yaml").write_text(
+        dedent(
+            """
+            repos:
+              - repo: https://github.com/psf/black
+                rev: 22.3.0
+                hooks:
+                  - id: black
+              - repo: https://github.com/asottile/pyupgrade
+                rev: v2.29.0
+                hooks:
+                  - id: pyupgrade
+                    args:
+                      - --py36-plus
+
+              # The following tools have to be installed locally
+              - repo: local
+                hooks: []
+            """
+        ).lstrip()
+    )
+    snapshot = RepositorySnapshot(root=tmp_path)
+    with snapshot.activate():
+        with pytest.raises(PrecommitError, match=r"^Updated args of pyupgrade"):
+            _update_main_pyupgrade_hook()
+        config = PrecommitConfig.load()
+        assert config.repos[0].hooks[0].args == []
+        assert config.repos[1].hooks[0].args == ["--py37-plus"]
+        _update_main_pyupgrade_hook()
+        snapshot.commit()
+    content = (tmp_path / ".pre-commit-config.yaml").read_text()
+    assert (
+        "- --py37-plus\n\n  # The following tools have to be installed locally\n"
+        in content
+    )
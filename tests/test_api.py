@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+import pytest
+
+import repoma
+from repoma.api import CheckResult, Options, Report
+from repoma.utilities.findings import Finding
+
+
+def _create_repo(path: Path, *filenames: str) -> Path:
+    path.mkdir()
+    (path / ".pre-commit-config.yaml").write_text("repos: []\n")
+    for filename in filenames:
+        (path / filename).write_text("\n")
+    return path
+
+
+def test_check_in_threads(monkeypatch, tmp_path: Path):
+    labels_repo = _create_repo(tmp_path / "labels", "labels.toml")
+    editorconfig_repo = _create_repo(tmp_path / "editorconfig", ".editorconfig")
+    monkeypatch.chdir(tmp_path)
+    options = Options(select=["editor_config", "github_labels"], use_cache=False)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        labels_report, editorconfig_report = pool.map(
+            lambda root: repoma.check(root, options),
+            [labels_repo, editorconfig_repo],
+        )
+
+    assert isinstance(labels_report, Report)
+    assert labels_report.root == str(labels_repo)
+    assert labels_report.modified_files == ["labels.toml"]
+    assert labels_report.results == [
+        CheckResult("editor_config"),
+        CheckResult("github_labels", labels_report.error_messages[0]),
+    ]
+    assert not (labels_repo / "labels.toml").exists()
+    assert not labels_report.passed
+
+    assert editorconfig_report.modified_files == []
+    assert editorconfig_report.results[0].name == "editor_config"
+    assert "contains no hook" in editorconfig_report.merge_messages()
+    assert editorconfig_report.results[1].passed
+
+
+def test_check_without_writing(tmp_path: Path):
+    repo = _create_repo(tmp_path / "repo", "labels.toml")
+    options = Options(select=["github_labels"], write=False)
+    report = repoma.check(repo, options)
+    assert report.modified_files == ["labels.toml"]
+    assert report.diff.startswith("diff --git a/labels.toml b/labels.toml\n")
+    assert (repo / "labels.toml").exists()
+    assert not (repo / ".cache").exists()
+
+    findings: List[Finding] = []
+    repoma.check(repo, options, on_finding=findings.append)
+    assert [(f.check, f.file) for f in findings] == [("github_labels", "labels.toml")]
+
+
+def test_check_unknown_options(tmp_path: Path):
+    with pytest.raises(ValueError, match=r"^Unknown checks: unknown\."):
+        repoma.check(tmp_path, Options(skip=["unknown"]))
+    with pytest.raises(ValueError, match=r"^Timeouts given for unknown checks"):
+        repoma.check(tmp_path, Options(timeouts={"unknown": 1.0}))
@@ -0,0 +1,79 @@
+import json
+import subprocess
+from pathlib import Path
+
+import yaml
+
+from benchmarks.common import run_hook
+from benchmarks.models import create_cases, load_legacy_models, load_models
+from benchmarks.replay import replay, summarize_hooks
+from benchmarks.synthetic import (
+    RepositorySpec,
+    create_precommit_config,
+    generate,
+    get_hook_args,
+    main,
+)
+
+
+def test_generate(tmp_path: Path):
+    spec = RepositorySpec(notebooks=2, cells=3, output_size=100)
+    repo = generate(spec, tmp_path / "repo")
+    notebooks = sorted(repo.glob("docs/*.ipynb"))
+    assert len(notebooks) == 2
+    notebook = json.loads(notebooks[0].read_text())
+    assert len(notebook["cells"]) == 3
+    assert len(notebook["cells"][2]["outputs"][0]["text"]) == 100
+
+    measurement = run_hook("set-nb-cells", get_hook_args("set-nb-cells", spec), repo)
+    assert measurement.exit_code == 0
+    assert measurement.seconds > 0
+
+
+def test_main(tmp_path: Path):
+    output = tmp_path / "results.json"
+    argv = ["--sizes", "1", "2", "--dimension", "notebooks", "--repeat", "1"]
+    argv += ["--hooks", "format-setup-cfg", "--output", str(output)]
+    assert main(argv) == 0
+    results = json.loads(output.read_text())
+    assert results["benchmark"] == "synthetic"
+    assert [r["size"] for r in results["results"]] == [1, 2]
+    assert set(results["exponents"]) == {"format-setup-cfg"}
+
+
+def test_replay(tmp_path: Path):
+    spec = RepositorySpec(notebooks=1, cells=3, output_size=10)
+    repo = generate(spec, tmp_path / "repo")
+    git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+    subprocess.run([*git, "commit", "-qm", "Initial commit"], cwd=repo, check=True)
+    with open(repo / "setup.cfg", "a") as stream:
+        stream.write("\n\n[flake8]\nmax-line-length = 88\n")
+    subprocess.run([*git, "commit", "-qam", "Configure flake8"], cwd=repo, check=True)
+
+    hooks = ["format-setup-cfg", "set-nb-cells"]
+    results = replay(repo, commits=5, hooks=hooks)
+    assert [(r["hook"], r["files"], r["skipped"]) for r in results] == [
+        ("format-setup-cfg", 1, False),
+        ("set-nb-cells", 1, False),
+        ("format-setup-cfg", 1, False),
+        ("set-nb-cells", 0, True),
+    ]
+    assert results[2]["touched"] == ["setup.cfg"]
+    summaries = summarize_hooks(results)
+    assert summaries["set-nb-cells"]["runs"] == 1
+    assert summaries["format-setup-cfg"]["files_touched"] >= 1
+
+    status = subprocess.check_output(["git", "status", "--porcelain"], cwd=repo)
+    assert status == b""
+    worktrees = subprocess.check_output(["git", "worktree", "list"], cwd=repo)
+    assert len(worktrees.splitlines()) == 1
+
+
+def test_models_benchmark():
+    spec = RepositorySpec(precommit_repos=3, hooks_per_repo=2)
+    definition = yaml.safe_load(create_precommit_config(spec))
+    legacy_cases = create_cases(load_legacy_models(), definition)
+    cases = create_cases(load_models(), definition)
+    assert {name: case() for name, case in cases.items()} == {
+        name: case() for name, case in legacy_cases.items()
+    }
@@ -0,0 +1,87 @@
+import importlib
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+import repoma
+from repoma.client import main, request, run_hook
+
+
+def _start_daemon(socket_path: Path, idle_timeout: float) -> subprocess.Popen:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(Path(repoma.__file__).parent.parent)
+    env["REPOMA_DAEMON_SOCKET"] = str(socket_path)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "repoma.daemon", "serve"]
+        + ["--idle-timeout", str(idle_timeout)],
+        env=env,
+    )
+    start = time.monotonic()
+    while not socket_path.exists():
+        assert process.poll() is None, "Daemon did not start"
+        assert time.monotonic() - start < 60, "Daemon took too long to start"
+        time.sleep(0.05)
+    return process
+
+
+@pytest.mark.slow
+class TestDaemon:
+    def test_run_hook(self, capsys, monkeypatch, tmp_path: Path):
+        socket_path = tmp_path / "daemon.sock"
+        monkeypatch.setenv("REPOMA_DAEMON_SOCKET", str(socket_path))
+        process = _start_daemon(socket_path, idle_timeout=60)
+        try:
+            status = request({"command": "status"})
+            assert status is not None
+            assert status["pid"] == process.pid
+
+            repo_dir = tmp_path / "repo"
+            repo_dir.mkdir()
+            setup_cfg = dedent(
+                """
+                [options.extras_require]
+                dev =
+                    tox >= 1.9    # for skip_install, use_develop
+                """
+            )
+            (repo_dir / "setup.cfg").write_text(setup_cfg)
+            monkeypatch.chdir(repo_dir)
+            argv = ["setup.cfg", "--diff"]
+            assert run_hook("format-setup-cfg", argv) == 1
+            expected_output = capsys.readouterr()
+            assert "+    tox >=1.9" in expected_output.out
+            assert main(["format-setup-cfg", *argv]) == 1
+            assert capsys.readouterr() == expected_output
+            assert main(["format-setup-cfg", "--unknown-flag"]) == 2
+            assert "unrecognized arguments" in capsys.readouterr().err
+            assert (repo_dir / "setup.cfg").read_text() == setup_cfg
+
+            assert request({"command": "stop"}) == {"stopped": process.pid}
+            assert process.wait(timeout=10) == 0
+        finally:
+            process.kill()
+            process.wait()
+        assert not socket_path.exists()
+
+    def test_idle_shutdown(self, tmp_path: Path):
+        socket_path = tmp_path / "daemon.sock"
+        process = _start_daemon(socket_path, idle_timeout=0.5)
+        try:
+            assert process.wait(timeout=10) == 0
+        finally:
+            process.kill()
+            process.wait()
+        assert not socket_path.exists()
+
+
+def test_import_without_fcntl(monkeypatch):
+    monkeypatch.setitem(sys.modules, "fcntl", None)
+    monkeypatch.delitem(sys.modules, "repoma.daemon", raising=False)
+    daemon = importlib.import_module("repoma.daemon")
+    monkeypatch.setattr(daemon, "get_socket_path", lambda: None)
+    assert daemon.main(["serve"]) == 1
@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+from textwrap import dedent
+
+from repoma.fleet import check_repositories, main
+
+
+def _create_repo(path: Path, hook_args: str = "[]") -> Path:
+    path.mkdir()
+    precommit_config = dedent(
+        f"""
+        repos:
+          - repo: https://github.com/ComPWA/repo-maintenance
+            rev: ""
+            hooks:
+              - id: check-dev-files
+                args: {hook_args}
+        """
+    )
+    (path / ".pre-commit-config.yaml").write_text(precommit_config)
+    (path / "labels.toml").write_text("\n")
+    return path
+
+
+def test_check_repositories(tmp_path: Path):
+    first = _create_repo(tmp_path / "first", "[--select=github_labels]")
+    second = _create_repo(tmp_path / "second", "[--allow-labels, --select=tox]")
+    invalid = _create_repo(tmp_path / "invalid", "[--unknown-flag]")
+    roots = [str(first), str(second), str(invalid)]
+    results = check_repositories(roots, use_cache=False, jobs=2)
+    assert [result.root for result in results] == roots
+
+    first_report = results[0].report
+    assert first_report is not None
+    assert first_report.modified_files == ["labels.toml"]
+    assert [r.name for r in first_report.results] == ["github_labels"]
+    assert (first / "labels.toml").exists()
+
+    second_report = results[1].report
+    assert second_report is not None
+    assert second_report.passed
+    assert second_report.modified_files == []
+
+    assert results[2].report is None
+    assert results[2].error is not None
+    assert "unrecognized arguments: --unknown-flag" in results[2].error
+
+
+def test_main(capsys, tmp_path: Path):
+    _create_repo(tmp_path / "first", "[--select=github_labels]")
+    _create_repo(tmp_path / "second", "[--select=github_labels]")
+    assert main([str(tmp_path / "*"), "--jobs=1", "--no-cache"]) == 1
+    output = capsys.readouterr().out
+    summary = f"{tmp_path / 'first'}: 1 check reported problems, 1 file would change\n"
+    assert summary in output
+    assert "Drift in 2 of 2 repositories:\n  labels.toml  2\n" in output
+    assert "Checks that reported problems:\n  github_labels  2\n" in output
+
+    assert main([str(tmp_path / "*"), "--jobs=1", "--no-cache", "--fix"]) == 1
+    assert not (tmp_path / "first" / "labels.toml").exists()
+    assert main([str(tmp_path / "*"), "--jobs=1", "--no-cache"]) == 0
+
+
+def test_main_json(capsys, tmp_path: Path):
+    _create_repo(tmp_path / "first", "[--select=github_labels]")
+    _create_repo(tmp_path / "invalid", "[--unknown-flag]")
+    assert main([str(tmp_path / "*"), "--jobs=1", "--format=json"]) == 1
+    captured = capsys.readouterr()
+    findings = [json.loads(line) for line in captured.out.splitlines()]
+    assert [(f["check"], f["file"], f["fixed"]) for f in findings] == [
+        ("github_labels", f"{(tmp_path / 'first').as_posix()}/labels.toml", True),
+        ("repoma-fleet", (tmp_path / "invalid").as_posix(), False),
+    ]
+    assert "Drift in 1 of 2 repositories" in captured.err
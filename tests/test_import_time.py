@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+import repoma
+
+_IMPORT_TIME_BUDGETS = {
+    # cumulative import time of the entry point, relative to _BASELINE_MODULES
+    "repoma.check_dev_files": 4.0,
+    "repoma.client": 0.8,
+    "repoma.daemon": 0.8,
+    "repoma.fix_nbformat_version": 3.5,
+    "repoma.fleet": 4.0,
+    "repoma.format_setup_cfg": 3.5,
+    "repoma.pin_nb_requirements": 3.5,
+    "repoma.set_nb_cells": 3.5,
+}
+_BASELINE_MODULES = ["argparse", "email.message", "http.client", "logging"]
+"""Standard library modules that are imported first, in the same interpreter.
+
+Their import time scales with the speed of the machine, so budgets relative to it
+do not depend on how busy a CI runner is.
+"""
+_HEAVY_PACKAGES = {"nbformat", "pydantic", "ruamel", "toml", "yaml"}
+
+
+def _get_import_times(module_name: str) -> Dict[str, int]:
+    """Import a module in a new interpreter and get import times in microseconds."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(Path(repoma.__file__).parent.parent)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # do not time the compilation
+    command = [
+        sys.executable,
+        "-X",
+        "importtime",
+        "-c",
+        f"import {', '.join(_BASELINE_MODULES)}; import {module_name}",
+    ]
+    subprocess.run(command, check=True, env=env, stderr=subprocess.DEVNULL)
+    process = subprocess.run(
+        command,
+        stderr=subprocess.PIPE,
+        check=True,
+        env=env,
+        universal_newlines=True,
+    )
+    import_times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            import_times[name.strip()] = int(cumulative)
+    return import_times
+
+
+@pytest.mark.parametrize("module_name", sorted(_IMPORT_TIME_BUDGETS))
+def test_import_time(module_name: str):
+    import_times = _get_import_times(module_name)
+    heavy_imports = sorted(
+        name for name in import_times if name.split(".")[0] in _HEAVY_PACKAGES
+    )
+    assert heavy_imports == []
+    baseline = sum(import_times[name] for name in _BASELINE_MODULES)
+    relative_import_time = import_times[module_name] / baseline
+    assert relative_import_time < _IMPORT_TIME_BUDGETS[module_name]
+
+
+def test_budgets_cover_entry_points():
+    setup_cfg = Path(repoma.__file__).parent.parent.parent / "setup.cfg"
+    if not setup_cfg.exists():
+        pytest.skip("Only available in the source repository")
+    entry_points = {
+        line.split("=")[1].split(":")[0].strip()
+        for line in setup_cfg.read_text().splitlines()
+        if line.startswith("    ") and "= repoma." in line
+    }
+    assert entry_points == set(_IMPORT_TIME_BUDGETS)
@@ -0,0 +1,110 @@
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from repoma.errors import PrecommitError
+from repoma.utilities import write
+from repoma.utilities.cache import ResultCache
+from repoma.utilities.executor import Executor, Task
+from repoma.utilities.snapshot import RepositorySnapshot, get_active_snapshot
+
+
+class TestResultCache:
+    @pytest.fixture(autouse=True)
+    def _in_tmp_path(self, tmp_path: Path):
+        cwd = os.getcwd()
+        os.chdir(tmp_path)
+        yield
+        os.chdir(cwd)
+
+    def test_fingerprint(self):
+        cache = ResultCache()
+        Path("config.txt").write_text("old")
+        key = cache.fingerprint("check", ["config.txt"], ())
+        assert key == cache.fingerprint("check", ["config.txt"], ())
+        assert key != cache.fingerprint("other", ["config.txt"], ())
+        assert key != cache.fingerprint("check", ["config.txt"], (True,))
+        Path("config.txt").write_text("new")
+        assert key != cache.fingerprint("check", ["config.txt"], ())
+
+    def test_replay_results(self):
+        calls: List[str] = []
+
+        def check_config(text: str) -> None:
+            calls.append(text)
+            raise PrecommitError(f"Config is wrong: {text}")
+
+        task = Task("check_config", check_config, reads=["config.txt"])
+        for _ in range(2):
+            cache = ResultCache()
+            executor = Executor(cache=cache)
+            executor.schedule(task, "some text")
+            executor.execute()
+            cache.save()
+            assert executor.error_messages == ["Config is wrong: some text"]
+        assert calls == ["some text"]
+        assert (cache.hits, cache.misses) == (1, 0)
+        assert Path(".cache/repoma/.gitignore").exists()
+
+    def test_deferred_files_are_not_rendered(self):
+        Path("config.txt").write_text("old")
+        renders: List[str] = []
+
+        def render() -> str:
+            renders.append("new")
+            return "new"
+
+        def fix_config() -> None:
+            snapshot = get_active_snapshot()
+            assert snapshot is not None
+            snapshot.write_later("config.txt", render, str)
+
+        fix = Task("fix_config", fix_config, writes=["config.txt"])
+        check = Task("check_config", lambda: None, reads=["config.txt"])
+        cache = ResultCache()
+        executor = Executor(cache=cache)
+        executor.schedule(fix)
+        executor.schedule(check)
+        with RepositorySnapshot().activate() as snapshot:
+            executor.execute()
+        assert renders == []
+        snapshot.commit()
+        assert renders == ["new"]
+        assert Path("config.txt").read_text() == "new"
+        assert (cache.hits, cache.misses) == (0, 1)
+
+    def test_save_only_changes(self):
+        cache = ResultCache()
+        cache.put("key", None)
+        cache.save()
+        os.utime(cache.path, ns=(0, 0))
+
+        cache = ResultCache()
+        assert cache.get("key") == (True, None)
+        cache.save()
+        assert cache.path.stat().st_mtime_ns == 0
+
+        cache.put("other key", "Error")
+        cache.save()
+        assert cache.path.stat().st_mtime_ns > 0
+
+    def test_fixes_are_not_cached(self):
+        calls: List[str] = []
+
+        def fix_config() -> None:
+            calls.append("fix")
+            write("fixed", "config.txt")
+            raise PrecommitError("Fixed config.txt")
+
+        task = Task("fix_config", fix_config, writes=["config.txt"])
+        for _ in range(2):
+            Path("config.txt").write_text("broken")
+            cache = ResultCache()
+            executor = Executor(cache=cache)
+            executor.schedule(task)
+            executor.execute()
+            cache.save()
+        assert calls == ["fix", "fix"]
+        assert Path("config.txt").read_text() == "fixed"
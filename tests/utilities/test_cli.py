@@ -0,0 +1,56 @@
+import argparse
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from repoma.utilities import write
+from repoma.utilities.cli import (
+    EXIT_CLEAN,
+    EXIT_ERRORS,
+    EXIT_WOULD_CHANGE,
+    add_diff_arguments,
+    commit_or_diff,
+)
+from repoma.utilities.snapshot import RepositorySnapshot
+
+
+def _parse_args(*argv: str) -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    add_diff_arguments(parser)
+    return parser.parse_args(argv)
+
+
+@pytest.mark.parametrize(
+    ("new_content", "exit_code", "expected"),
+    [
+        (None, 0, EXIT_CLEAN),
+        (None, 1, EXIT_ERRORS),
+        ("new\n", 0, EXIT_WOULD_CHANGE),
+        ("new\n", 1, EXIT_WOULD_CHANGE),
+    ],
+)
+def test_commit_or_diff(
+    tmp_path: Path, new_content: Optional[str], exit_code: int, expected: int
+):
+    path = tmp_path / "file.txt"
+    path.write_text("old\n")
+    patch_file = tmp_path / "fix.patch"
+    with RepositorySnapshot().activate() as snapshot:
+        if new_content is not None:
+            write(new_content, path)
+    args = _parse_args("--diff-output", str(patch_file))
+    assert commit_or_diff(snapshot, args, exit_code) == expected
+    assert path.read_text() == "old\n"
+    if new_content is None:
+        assert patch_file.read_text() == ""
+    else:
+        assert "-old\n+new\n" in patch_file.read_text()
+
+
+def test_commit_without_diff(tmp_path: Path):
+    path = tmp_path / "file.txt"
+    with RepositorySnapshot().activate() as snapshot:
+        write("new\n", path)
+    assert commit_or_diff(snapshot, _parse_args(), exit_code=1) == 1
+    assert path.read_text() == "new\n"
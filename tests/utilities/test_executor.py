@@ -1,7 +1,26 @@
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
 from textwrap import dedent
+from typing import Iterator, List
+
+import pytest
 
 from repoma.errors import PrecommitError
-from repoma.utilities.executor import Executor
+from repoma.utilities import exists, read, write
+from repoma.utilities.executor import Executor, Task
+from repoma.utilities.snapshot import RepositorySnapshot
+
+
+@contextmanager
+def _chdir(path: Path) -> Iterator[None]:
+    cwd = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
 
 
 class TestExecutor:
@@ -45,3 +64,134 @@ class TestExecutor:
             """
         ).strip()
         assert merged_message == expected_message
+
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_execute_scheduled_tasks(self, jobs: int):
+        finished: List[str] = []
+
+        def slow_write(name: str) -> None:
+            time.sleep(0.05)
+            finished.append(name)
+            raise PrecommitError(f"{name} wrote file.txt")
+
+        def read(name: str) -> None:
+            finished.append(name)
+            raise PrecommitError(f"{name} read file.txt")
+
+        def independent() -> None:
+            finished.append("independent")
+            raise PrecommitError("independent")
+
+        writer = Task("writer", slow_write, writes=["file.txt"])
+        reader = Task("reader", read, reads=["file.txt"])
+        other = Task("other", independent, writes=["other.txt"])
+        executor = Executor(jobs)
+        executor.schedule(writer, "writer")
+        executor.schedule(reader, name="reader")
+        executor.schedule(other)
+        executor.execute()
+        assert executor.error_messages == [
+            "writer wrote file.txt",
+            "reader read file.txt",
+            "independent",
+        ]
+        assert finished.index("writer") < finished.index("reader")
+        if jobs > 1:
+            assert finished[0] == "independent"
+
+    def test_execute_until_stable(self, tmp_path: Path):
+        runs: List[str] = []
+
+        def copy_version() -> None:
+            runs.append("copy")
+            version = (
+                read(tmp_path / "version.txt")
+                if exists(tmp_path / "version.txt")
+                else ""
+            )
+            if read(tmp_path / "copy.txt") != version:
+                write(version, tmp_path / "copy.txt")
+                raise PrecommitError("Updated copy.txt")
+
+        def create_version() -> None:
+            runs.append("create")
+            if not exists(tmp_path / "version.txt"):
+                write("1.0", tmp_path / "version.txt")
+                raise PrecommitError("Created version.txt")
+
+        def check_unrelated() -> None:
+            runs.append("unrelated")
+            raise PrecommitError("Unrelated problem")
+
+        (tmp_path / "copy.txt").write_text("")
+        copy = Task("copy", copy_version, reads=["version.txt"], writes=["copy.txt"])
+        create = Task("create", create_version, writes=["version.txt"])
+        unrelated = Task("unrelated", check_unrelated, reads=["other.txt"])
+        executor = Executor()
+        with RepositorySnapshot(root=tmp_path).activate():
+            for task in [copy, create, unrelated]:
+                executor.schedule(task)
+            assert executor.execute_until_stable(max_iterations=5) == 3
+        assert runs == ["copy", "create", "unrelated", "copy", "create", "copy"]
+        assert executor.error_messages == [
+            "Created version.txt",
+            "Unrelated problem",
+            "Updated copy.txt",
+        ]
+        assert not (tmp_path / "version.txt").exists()
+
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_timeouts(self, jobs: int):
+        finished: List[str] = []
+
+        def hang() -> None:
+            while True:
+                time.sleep(0.01)
+
+        def check(name: str) -> None:
+            finished.append(name)
+            raise PrecommitError(f"{name} failed")
+
+        executor = Executor(jobs, timeout=5.0, timeouts={"hang": 0.1})
+        executor.schedule(Task("hang", hang, writes=["file.txt"]))
+        executor.schedule(Task("reader", check, reads=["file.txt"]), "reader")
+        executor.schedule(Task("other", check), "other")
+        start = time.perf_counter()
+        executor.execute()
+        assert time.perf_counter() - start < 2.0
+        assert sorted(finished) == ["other", "reader"]
+        assert executor.error_messages == ["reader failed", "other failed"]
+        assert len(executor.timed_out) == 1
+        timed_out = executor.timed_out[0]
+        assert timed_out.name == "hang"
+        assert timed_out.elapsed >= 0.1
+        assert str(timed_out).startswith('Check "hang" timed out after 0.1')
+
+    def test_timeouts_discard_writes(self, tmp_path: Path):
+        def hang() -> None:
+            write("partial\n", "hang.txt")
+            while True:
+                time.sleep(0.01)
+
+        def fix() -> None:
+            write("fixed\n", "fix.txt")
+
+        executor = Executor(timeout=5.0, timeouts={"hang": 0.1})
+        executor.schedule(Task("hang", hang, writes=["hang.txt"]))
+        executor.schedule(Task("fix", fix, writes=["fix.txt"]))
+        snapshot = RepositorySnapshot(root=tmp_path)
+        with snapshot.activate():
+            executor.execute()
+            assert not exists("hang.txt")
+            assert read("fix.txt") == "fixed\n"
+        assert [t.name for t in executor.timed_out] == ["hang"]
+        assert list(snapshot.staged()) == [str(tmp_path / "fix.txt")]
+
+    def test_timeout_propagates_exceptions(self):
+        def crash() -> None:
+            raise ValueError("Unexpected")
+
+        executor = Executor(timeout=5.0)
+        executor.schedule(Task("crash", crash))
+        with pytest.raises(ValueError, match="Unexpected"):
+            executor.execute()
@@ -0,0 +1,69 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from repoma.utilities import glob, write
+from repoma.utilities.file_index import FileIndex, list_directories
+from repoma.utilities.snapshot import RepositorySnapshot
+
+
+@pytest.fixture()
+def repo_dir(tmp_path: Path) -> Path:
+    for path in [
+        ".tox/py38/requirements.txt",
+        "docs/requirements.txt",
+        "node_modules/package/requirements.txt",
+        "requirements-dev.in",
+        "setup.cfg",
+        "venv/lib/requirements.txt",
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("\n")
+    (tmp_path / ".gitignore").write_text(".tox/\nnode_modules/\n/venv\n")
+    return tmp_path
+
+
+def _init_git(path: Path) -> None:
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+
+
+@pytest.mark.parametrize("use_git", [False, True])
+def test_create(repo_dir: Path, use_git: bool):
+    if use_git:
+        _init_git(repo_dir)
+    index = FileIndex.create(repo_dir)
+    assert index.files == (
+        ".gitignore",
+        "docs/requirements.txt",
+        "requirements-dev.in",
+        "setup.cfg",
+    )
+    assert index.match("**/requirements*.*") == [
+        "docs/requirements.txt",
+        "requirements-dev.in",
+    ]
+
+
+@pytest.mark.parametrize("use_git", [False, True])
+def test_list_directories(repo_dir: Path, use_git: bool):
+    if use_git:
+        _init_git(repo_dir)
+    (repo_dir / "docs" / "_build").mkdir()
+    (repo_dir / "docs" / ".gitignore").write_text("_build/\n")
+    (repo_dir / ".cache" / "repoma").mkdir(parents=True)
+    directories = list_directories(repo_dir, exclude=[Path(".cache/repoma")])
+    expected = [".", ".cache", "docs"]
+    if not use_git:
+        expected.append("docs/_build")
+    assert sorted(directories) == expected
+
+
+def test_snapshot_glob(repo_dir: Path):
+    _init_git(repo_dir)
+    with RepositorySnapshot(root=repo_dir).activate() as snapshot:
+        write("\n", "src/requirements.txt")
+        snapshot.remove("docs")
+        assert glob("**/requirements*.txt") == [Path("src/requirements.txt")]
+        assert glob("setup.cfg") == [Path("setup.cfg")]
+    assert snapshot.file_index is snapshot.file_index
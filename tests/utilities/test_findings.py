@@ -0,0 +1,114 @@
+import io
+import json
+from pathlib import Path
+from typing import List
+
+import attr
+import pytest
+
+from repoma.check_dev_files import main
+from repoma.errors import PrecommitError
+from repoma.utilities import write
+from repoma.utilities.executor import Executor, Task
+from repoma.utilities.findings import Finding, JsonLinesWriter, SarifWriter
+from repoma.utilities.snapshot import RepositorySnapshot
+
+
+def _fix_setup_cfg() -> None:
+    write("[metadata]\n", "setup.cfg")
+    raise PrecommitError("setup.cfg has been fixed")
+
+
+def _fix_tox_ini() -> None:
+    write("[tox]\n", "tox.ini")
+
+
+def _check_readme() -> None:
+    raise PrecommitError("README.md has no badges")
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_executor_findings(tmp_path: Path, jobs: int):
+    findings: List[Finding] = []
+    executor = Executor(jobs, on_finding=findings.append)
+    executor.schedule(Task("setup_cfg", _fix_setup_cfg, writes=["setup.cfg"]))
+    executor.schedule(Task("tox", _fix_tox_ini, writes=["tox.ini"]))
+    executor.schedule(Task("readme", _check_readme, reads=["README.md"]))
+    with RepositorySnapshot(root=tmp_path).activate():
+        executor.execute()
+        executor(_check_readme)
+
+    assert all(finding.duration >= 0 for finding in findings)
+    assert {attr.evolve(finding, duration=0.0) for finding in findings} == {
+        Finding("setup_cfg", "setup.cfg has been fixed", "setup.cfg", True, 0, 11),
+        Finding("tox", None, "tox.ini", True, 0, 6),
+        Finding("readme", "README.md has no badges"),
+        Finding("test_findings._check_readme", "README.md has no badges"),
+    }
+
+
+def test_json_lines_writer():
+    stream = io.StringIO()
+    writer = JsonLinesWriter(stream)
+    writer.write(Finding("tox", "Fixed", "tox.ini", fixed=True, bytes_written=6))
+    writer.write(Finding("readme", "No badges"))
+    writer.close()
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {
+            "check": "tox",
+            "message": "Fixed",
+            "file": "tox.ini",
+            "fixed": True,
+            "duration": 0.0,
+            "bytes_written": 6,
+        },
+        {
+            "check": "readme",
+            "message": "No badges",
+            "file": None,
+            "fixed": False,
+            "duration": 0.0,
+            "bytes_written": 0,
+        },
+    ]
+
+
+def test_sarif_writer():
+    stream = io.StringIO()
+    writer = SarifWriter(stream)
+    writer.close()
+    assert json.loads(stream.getvalue())["runs"][0]["results"] == []
+
+    stream = io.StringIO()
+    writer = SarifWriter(stream)
+    writer.write(Finding("tox", file="tox.ini", fixed=True))
+    writer.write(Finding("readme", "No badges"))
+    writer.write(Finding("tox", "Wrong section", "tox.ini"))
+    writer.close()
+    log = json.loads(stream.getvalue())
+    assert log["version"] == "2.1.0"
+    run = log["runs"][0]
+    assert run["tool"]["driver"]["rules"] == [{"id": "tox"}, {"id": "readme"}]
+    results = run["results"]
+    assert [r["ruleIndex"] for r in results] == [0, 1, 0]
+    assert [r["level"] for r in results] == ["warning", "error", "error"]
+    assert results[0]["message"] == {"text": "tox.ini has been fixed"}
+    assert results[0]["locations"][0]["physicalLocation"]["artifactLocation"] == {
+        "uri": "tox.ini"
+    }
+    assert "locations" not in results[1]
+
+
+def test_check_dev_files_json(capsys, monkeypatch, tmp_path: Path):
+    (tmp_path / "labels.toml").write_text("\n")
+    (tmp_path / ".pre-commit-config.yaml").write_text("repos: []\n")
+    monkeypatch.chdir(tmp_path)
+    argv = ["--format=json", "--no-cache", "--select=editor_config,github_labels"]
+    assert main([*argv, "--diff"]) == 1
+    stdout = capsys.readouterr().out
+    findings = [json.loads(line) for line in stdout.splitlines()]
+    assert [(f["check"], f["file"], f["fixed"]) for f in findings] == [
+        ("github_labels", "labels.toml", True)
+    ]
+    assert (tmp_path / "labels.toml").exists()
@@ -0,0 +1,117 @@
+import subprocess
+import threading
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from repoma.errors import PrecommitError
+from repoma.utilities import read, write
+from repoma.utilities.git_index import GitIndex, hash_blob
+from repoma.utilities.snapshot import RepositorySnapshot
+
+
+@pytest.fixture()
+def repo_dir(tmp_path: Path) -> Path:
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    (tmp_path / "setup.cfg").write_text("staged\n")
+    (tmp_path / "src").mkdir()
+    for i in range(300):
+        (tmp_path / "src" / f"{i}.txt").write_text(f"{i}\n")
+    subprocess.run(["git", "add", "."], cwd=tmp_path, check=True)
+    (tmp_path / "setup.cfg").write_text("unstaged\n")
+    (tmp_path / "untracked.txt").write_text("untracked\n")
+    return tmp_path
+
+
+class TestGitIndex:
+    def test_read_many(self, repo_dir: Path):
+        paths = [f"src/{i}.txt" for i in range(300)]
+        with GitIndex(str(repo_dir)) as index:
+            content = index.read_many([*paths, "setup.cfg", "untracked.txt"])
+            assert "untracked.txt" not in index
+        assert len(content) == 301
+        assert content["setup.cfg"] == b"staged\n"
+        assert content["src/299.txt"] == b"299\n"
+        assert index.read("setup.cfg") == b"staged\n"  # process is restarted
+        index.close()
+
+    def test_has_blob(self, repo_dir: Path):
+        index = GitIndex(str(repo_dir))
+        assert index.has_blob("setup.cfg", b"staged\n")
+        assert not index.has_blob("setup.cfg", b"unstaged\n")
+        assert not index.has_blob("untracked.txt", b"untracked\n")
+
+    def test_outside_git_repository(self, tmp_path: Path):
+        (tmp_path / "setup.cfg").write_text("\n")
+        assert GitIndex(str(tmp_path)).read("setup.cfg") is None
+
+
+def test_hash_blob(tmp_path: Path):
+    content = b"[metadata]\nname = repoma\n"
+    (tmp_path / "setup.cfg").write_bytes(content)
+    object_name = subprocess.run(
+        ["git", "hash-object", str(tmp_path / "setup.cfg")],
+        check=True,
+        stdout=subprocess.PIPE,
+    ).stdout
+    assert hash_blob(content) == object_name.decode().strip()
+
+
+def test_snapshot_read_staged(repo_dir: Path):
+    snapshot = RepositorySnapshot(root=repo_dir, read_staged=True)
+    with snapshot.activate():
+        snapshot.preload(["setup.cfg", "src/0.txt", "untracked.txt"])
+        assert read("setup.cfg") == "staged\n"
+        assert read("untracked.txt") == "untracked\n"
+        write("staged\n", "setup.cfg")
+        write("fixed\n", "src/0.txt")
+    assert (
+        snapshot.diff()
+        == "diff --git a/src/0.txt b/src/0.txt\n"
+        "--- a/src/0.txt\n"
+        "+++ b/src/0.txt\n"
+        "@@ -1 +1 @@\n"
+        "-0\n"
+        "+fixed\n"
+    )
+    snapshot.commit()
+    assert (repo_dir / "setup.cfg").read_text() == "unstaged\n"
+    assert (repo_dir / "src" / "0.txt").read_text() == "fixed\n"
+
+
+def test_snapshot_keeps_unstaged_edits(repo_dir: Path):
+    snapshot = RepositorySnapshot(root=repo_dir, read_staged=True)
+    with snapshot.activate():
+        write("fixed\n", "setup.cfg")
+        write("fixed\n", "src/0.txt")
+    with pytest.raises(PrecommitError, match=r"unstaged changes") as exception:
+        snapshot.commit()
+    assert "  setup.cfg\n" in str(exception.value)
+    assert "-staged\n+fixed\n" in str(exception.value)
+    assert (repo_dir / "setup.cfg").read_text() == "unstaged\n"
+    assert (repo_dir / "src" / "0.txt").read_text() == "fixed\n"
+
+
+def test_snapshot_keeps_git_index_open(repo_dir: Path, monkeypatch):
+    closed: List[str] = []
+    close = GitIndex.close
+
+    def record_close(self: GitIndex) -> None:
+        closed.append(self.root)
+        close(self)
+
+    monkeypatch.setattr(GitIndex, "close", record_close)
+    snapshot = RepositorySnapshot(root=repo_dir, read_staged=True)
+    with snapshot.activate():
+        for _ in range(3):
+            thread = threading.Thread(target=_read_in_snapshot, args=(snapshot,))
+            thread.start()
+            thread.join()
+        assert closed == []
+    assert closed == [str(repo_dir)]
+
+
+def _read_in_snapshot(snapshot: RepositorySnapshot) -> None:
+    with snapshot.activate():
+        read("setup.cfg")
@@ -0,0 +1,52 @@
+import sys
+
+from repoma.errors import PrecommitError
+from repoma.utilities.executor import Executor
+from repoma.utilities.memory import MemoryProfiler, measure_memory
+
+
+def _allocate(size: int) -> bytes:
+    return bytes(size)
+
+
+def _allocate_and_fail() -> None:
+    _allocate(200_000)
+    raise PrecommitError("Failed")
+
+
+class TestMemoryProfiler:
+    def test_no_profiler(self):
+        with measure_memory("not recorded"):
+            pass
+
+    def test_nested_measurements(self):
+        profiler = MemoryProfiler()
+        kept = []
+        with profiler.activate():
+            with measure_memory("notebook.ipynb"):
+                executor = Executor()
+                executor(_allocate, 1_000_000)
+                executor(_allocate_and_fail)
+                kept.append(_allocate(100_000))
+        names = [(record.name, record.depth) for record in profiler.records]
+        assert names == [
+            ("notebook.ipynb", 0),
+            ("test_memory._allocate", 1),
+            ("test_memory._allocate_and_fail", 1),
+        ]
+        file_usage, allocate, allocate_and_fail = profiler.records
+        assert allocate.peak >= 1_000_000
+        assert abs(allocate.net) < 10_000
+        assert allocate_and_fail.peak >= 200_000
+        if sys.version_info >= (3, 9):
+            assert allocate_and_fail.peak < 1_000_000
+        assert file_usage.peak >= 1_000_000
+        assert file_usage.net >= 100_000
+        assert file_usage.top_site is not None
+        assert "test_memory.py" in file_usage.top_site
+
+        report = profiler.report()
+        assert report.startswith("Memory usage (peak, net):\n")
+        assert "  notebook.ipynb" in report
+        assert "    test_memory._allocate" in report
+        assert "Top 10 allocation sites:" in report
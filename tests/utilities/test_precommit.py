@@ -3,7 +3,15 @@ from pathlib import Path
 
 import pytest
 
-from repoma.utilities.precommit import PrecommitConfig
+from repoma.errors import PrecommitError
+from repoma.utilities.precommit import (
+    Hook,
+    PrecommitConfig,
+    PrecommitDocument,
+    Repo,
+    load_precommit_document,
+)
+from repoma.utilities.snapshot import RepositorySnapshot
 
 
 @pytest.fixture(scope="session")
@@ -52,6 +60,41 @@ class TestPrecommitConfig:
         }
 
 
+class TestModels:
+    def test_lazy_validation(self):
+        config = PrecommitConfig(
+            repos=[
+                {"repo": "meta", "hooks": [{"id": "check-hooks-apply"}]},
+                {"repo": "local", "hooks": "not a list"},
+            ],
+            fail_fast="yes",
+        )
+        assert config.repos[0].hooks[0].args == []
+        assert config.fail_fast is True
+        with pytest.raises(PrecommitError, match=r'Field "hooks" of Repo'):
+            config.repos[1].hooks  # noqa: B018  # pylint: disable=pointless-statement
+        with pytest.raises(PrecommitError, match=r'missing field "repo"'):
+            Repo(hooks=[]).repo  # noqa: B018  # pylint: disable=expression-not-assigned
+
+    def test_equality(self):
+        hook = Hook(id="nbqa-black", additional_dependencies=["black>=22.1.0"])
+        assert hook == Hook(**hook.dict(skip_defaults=True))
+        assert hook != Hook(id="nbqa-black")
+        assert Hook(id="black") != Hook(id="black", args=[])
+        assert Repo(repo="meta", hooks=[hook]) == Repo(
+            repo="meta", hooks=[hook.dict(skip_defaults=True)]
+        )
+
+    def test_dict(self):
+        repo = Repo(repo="local", rev=1.0, hooks=[{"id": "flake8"}])
+        assert repo.dict(skip_defaults=True) == {
+            "repo": "local",
+            "rev": "1.0",
+            "hooks": [{"id": "flake8"}],
+        }
+        assert repo.dict()["hooks"][0]["args"] == []
+
+
 class TestRepo:
     def test_get_hook_index(self, dummy_config: PrecommitConfig):
         repo = dummy_config.find_repo("local")
@@ -59,3 +102,78 @@ class TestRepo:
         assert repo.get_hook_index("non-existent") is None
         assert repo.get_hook_index("flake8") == 0
         assert repo.get_hook_index("mypy") == 1
+
+
+class TestPrecommitDocument:
+    def test_edit(self, monkeypatch, tmp_path: Path):
+        path = tmp_path / ".pre-commit-config.yaml"
+        path.write_text(
+            "repos:\n"
+            "  - repo: meta\n"
+            "    hooks:\n"
+            "      - id: check-hooks-apply # comment\n"
+        )
+        dumps: list = []
+        monkeypatch.setattr(
+            PrecommitDocument, "dumps", _count_calls(PrecommitDocument.dumps, dumps)
+        )
+        snapshot = RepositorySnapshot(root=tmp_path)
+        with snapshot.activate():
+            document = load_precommit_document(path)
+            assert document.get_hook_index(0, "check-useless-excludes") is None
+            with document.edit() as config:
+                config["repos"][0]["hooks"].append({"id": "check-useless-excludes"})
+            with document.edit() as config:
+                config["repos"][0]["rev"] = "v1.0"
+            assert load_precommit_document(path) is document
+            assert document.get_hook_index(0, "check-useless-excludes") == 1
+            assert PrecommitConfig.load(path).repos[0].rev == "v1.0"
+            assert not dumps
+            assert "rev: v1.0" in snapshot.read_text(path)
+            assert len(dumps) == 1
+            assert load_precommit_document(path) is document
+            snapshot.commit()
+        assert len(dumps) == 1
+        assert (
+            path.read_text()
+            == "repos:\n"
+            "  - repo: meta\n"
+            "    hooks:\n"
+            "      - id: check-hooks-apply # comment\n"
+            "      - id: check-useless-excludes\n"
+            "    rev: v1.0\n"
+        )
+
+    def test_read_only(self, tmp_path: Path):
+        content = "repos:\n  - repo: meta\n    hooks: []\n"
+        document = PrecommitDocument(content, path=tmp_path / "config.yaml")
+        assert document.get_repo_index("meta") == 0
+        assert document.config.repos[0].hooks == []
+        assert document._tree is None  # pylint: disable=protected-access
+        with document.edit() as config:
+            config["repos"][0]["hooks"].append({"id": "identity"})
+        assert document.data is document.tree
+        assert document.config.repos[0].hooks == [Hook(id="identity")]
+
+    def test_failed_edit(self, tmp_path: Path):
+        path = tmp_path / ".pre-commit-config.yaml"
+        content = "repos:\n  - repo: meta\n    hooks: []\n"
+        path.write_text(content)
+        snapshot = RepositorySnapshot(root=tmp_path)
+        with snapshot.activate():
+            document = load_precommit_document(path)
+            with pytest.raises(KeyError):
+                with document.edit() as config:
+                    config["repos"][0]["rev"] = "v1.0"
+                    config["repos"][0]["missing"].append("id")
+            assert snapshot.staged() == {}
+        snapshot.commit()
+        assert path.read_text() == content
+
+
+def _count_calls(function, calls: list):
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        return function(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,96 @@
+from typing import Any, Callable, List
+
+import pytest
+
+from repoma.check_dev_files import _CHECKS, create_registry
+from repoma.utilities import registry as registry_module
+from repoma.utilities.registry import Check, CheckRegistry
+
+
+class _EntryPoint:
+    def __init__(self, name: str, load: Callable[[], Any]) -> None:
+        self.name = name
+        self.load = load
+
+
+def _fail() -> Check:
+    pytest.fail("Check should not have been loaded")
+
+
+class TestCheckRegistry:
+    def test_builtin_checks(self):
+        registry = create_registry()
+        assert registry.names[: len(_CHECKS)] == [check.name for check in _CHECKS]
+        selected = registry.select(select=["tox", "cspell"], skip=["cspell"])
+        assert selected == ["tox"]
+        assert all(isinstance(check.function, str) for check in _CHECKS)
+        check = registry.get("tox")
+        assert check.python_only
+        assert check.get_arguments({"no_python": False}) == {}
+
+    def test_duplicate_name(self):
+        registry = CheckRegistry()
+        registry.register(Check("tox", print))
+        with pytest.raises(ValueError, match=r'already a check with the name "tox"'):
+            registry.register(Check("tox", print))
+
+    def test_entry_points(self, monkeypatch):
+        loaded: List[str] = []
+
+        def load_plugin() -> Check:
+            loaded.append("plugin")
+            return Check("plugin", print, writes=["plugin.toml"])
+
+        entry_points = [
+            _EntryPoint("plugin", load_plugin),
+            _EntryPoint("unselected", _fail),
+            _EntryPoint("wrong_name", lambda: Check("other", print)),
+            _EntryPoint("wrong_type", lambda: print),
+        ]
+        monkeypatch.setattr(
+            registry_module, "_get_entry_points", lambda group: entry_points
+        )
+        registry = CheckRegistry()
+        registry.load_entry_points()
+        assert registry.names == ["plugin", "unselected", "wrong_name", "wrong_type"]
+        assert loaded == []
+
+        assert registry.select(select=["plugin"]) == ["plugin"]
+        assert registry.get("plugin").depends_on(["plugin.toml"])
+        assert registry.get("plugin") is registry.get("plugin")
+        assert loaded == ["plugin"]
+        with pytest.raises(ValueError, match=r'with the name "other"'):
+            registry.get("wrong_name")
+        with pytest.raises(TypeError, match=r"registered as a"):
+            registry.get("wrong_type")
+
+    def test_entry_points_are_looked_up_lazily(self, monkeypatch):
+        groups: List[str] = []
+
+        def get_entry_points(group: str) -> List[_EntryPoint]:
+            groups.append(group)
+            return [_EntryPoint("plugin", lambda: Check("plugin", print))]
+
+        monkeypatch.setattr(registry_module, "_get_entry_points", get_entry_points)
+        registry = create_registry()
+        assert registry.select(select=["tox"], skip=["black"]) == ["tox"]
+        assert registry.get("tox").name == "tox"
+        assert groups == []
+
+        assert registry.select(select=["plugin", "tox"]) == ["tox", "plugin"]
+        assert "plugin" in registry
+        assert registry.names[-1] == "plugin"
+        assert groups == ["repoma.checks"]
+        with pytest.raises(KeyError, match=r'no check with the name "unknown"'):
+            registry.get("unknown")
+
+    def test_select_unknown(self):
+        registry = CheckRegistry()
+        registry.register(Check("tox", print))
+        with pytest.raises(ValueError, match=r"^Unknown checks: black, flake8\."):
+            registry.select(select=["flake8"], skip=["black"])
+
+    def test_missing_options(self):
+        check = Check("setup_cfg", print, options=["ignore_author"])
+        with pytest.raises(ValueError, match=r"requires unknown options"):
+            check.get_arguments({})
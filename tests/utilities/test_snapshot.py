@@ -0,0 +1,182 @@
+import os
+from pathlib import Path
+from textwrap import dedent
+from typing import List
+
+import pytest
+
+from repoma.utilities import exists, list_files, parse, read, remove, write
+from repoma.utilities.snapshot import RepositorySnapshot, get_active_snapshot
+
+
+class TestRepositorySnapshot:
+    def test_activate(self):
+        assert get_active_snapshot() is None
+        snapshot = RepositorySnapshot()
+        with snapshot.activate():
+            assert get_active_snapshot() is snapshot
+            with RepositorySnapshot().activate() as nested:
+                assert get_active_snapshot() is nested
+            assert get_active_snapshot() is snapshot
+        assert get_active_snapshot() is None
+
+    def test_parse_is_cached(self, tmp_path: Path):
+        path = tmp_path / "numbers.txt"
+        path.write_text("1 2 3")
+        calls: List[str] = []
+
+        def parse_numbers(content: str) -> List[int]:
+            calls.append(content)
+            return [int(s) for s in content.split()]
+
+        snapshot = RepositorySnapshot()
+        with snapshot.activate():
+            assert parse(path, parse_numbers) == [1, 2, 3]
+            assert parse(str(path), parse_numbers) == [1, 2, 3]
+            path.write_text("4 5 6")  # not through repoma.utilities.write
+            assert parse(path, parse_numbers) == [1, 2, 3]
+        assert calls == ["1 2 3"]
+
+    def test_invalidate_on_write(self, tmp_path: Path):
+        path = tmp_path / "file.txt"
+        path.write_text("old\r\n")
+        with RepositorySnapshot().activate():
+            assert read(path) == "old\n"
+            write("new\n", path)
+            assert read(path) == "new\n"
+            remove(path)
+            assert not exists(path)
+
+    def test_invalidate_directory(self, tmp_path: Path):
+        path = tmp_path / "sub" / "file.txt"
+        path.parent.mkdir()
+        path.write_text("content")
+        snapshot = RepositorySnapshot()
+        assert snapshot.read_text(path) == "content"
+        path.write_text("changed")
+        snapshot.invalidate(tmp_path / "sub")
+        assert snapshot.read_text(path) == "changed"
+
+    def test_commit(self, tmp_path: Path):
+        changed = tmp_path / "changed.txt"
+        changed.write_text("old")
+        unchanged = tmp_path / "unchanged.txt"
+        unchanged.write_text("same")
+        os.utime(unchanged, (0, 0))
+        snapshot = RepositorySnapshot()
+        with snapshot.activate():
+            write("intermediate", changed)
+            write("new", changed)
+            write("same", unchanged)
+            write("created", tmp_path / "sub" / "created.txt")
+            assert read(changed) == "new"
+        assert changed.read_text() == "old"
+        assert not (tmp_path / "sub").exists()
+        snapshot.commit()
+        assert changed.read_text() == "new"
+        assert unchanged.stat().st_mtime == 0
+        assert (tmp_path / "sub" / "created.txt").read_text() == "created"
+        assert sorted(os.listdir(tmp_path)) == ["changed.txt", "sub", "unchanged.txt"]
+
+    def test_flush(self, tmp_path: Path):
+        changed = tmp_path / "changed.txt"
+        changed.write_text("old")
+        unchanged = tmp_path / "unchanged.txt"
+        unchanged.write_text("same")
+        snapshot = RepositorySnapshot()
+        with snapshot.activate():
+            write("new", changed)
+            assert read(unchanged) == "same"
+            snapshot.flush(changed)
+            snapshot.flush(unchanged)
+        assert changed.read_text() == "new"
+        assert snapshot.staged() == {}
+        assert snapshot._content == {}  # pylint: disable=protected-access
+        assert snapshot._parsed == {}  # pylint: disable=protected-access
+
+    def test_flush_diff(self, tmp_path: Path):
+        changed = tmp_path / "changed.txt"
+        changed.write_text("old\n")
+        unchanged = tmp_path / "unchanged.txt"
+        unchanged.write_text("same\n")
+        snapshot = RepositorySnapshot(root=tmp_path)
+        with snapshot.activate():
+            write("new\n", changed)
+            write("same\n", unchanged)
+            snapshot.flush(changed, write=False)
+            snapshot.flush(unchanged, write=False)
+            assert read(changed) == "new\n"
+        assert changed.read_text() == "old\n"
+        assert list(snapshot.staged()) == [str(changed)]
+        assert "+new" in snapshot.diff()
+
+    def test_fork(self, tmp_path: Path):
+        (tmp_path / "kept.txt").write_text("kept")
+        (tmp_path / "removed.txt").write_text("removed")
+        snapshot = RepositorySnapshot(root=tmp_path)
+        snapshot.write_text("staged.txt", "staged")
+        fork = snapshot.fork()
+        assert fork.read_text("staged.txt") == "staged"
+        fork.write_text("kept.txt", "modified")
+        fork.remove("removed.txt")
+        snapshot.write_text("staged.txt", "newer")
+        assert snapshot.read_text("kept.txt") == "kept"
+        snapshot.merge(fork)
+        assert snapshot.read_text("kept.txt") == "modified"
+        assert not snapshot.exists("removed.txt")
+        assert snapshot.read_text("staged.txt") == "newer"
+        with pytest.raises(ValueError, match="fork of this snapshot"):
+            fork.merge(snapshot)
+
+    def test_remove_directory(self, tmp_path: Path):
+        directory = tmp_path / "templates"
+        directory.mkdir()
+        (directory / "old.md").write_text("old")
+        (directory / "nested").mkdir()
+        (directory / "nested" / "deep.md").write_text("deep")
+        snapshot = RepositorySnapshot()
+        with snapshot.activate():
+            assert list_files(directory) == ["nested/deep.md", "old.md"]
+            remove(directory)
+            assert not exists(directory / "old.md")
+            assert list_files(directory) == []
+            write("new", directory / "new.md")
+            assert snapshot.listdir(directory) == ["new.md"]
+            assert (directory / "old.md").exists()
+        snapshot.commit()
+        assert os.listdir(directory) == ["new.md"]
+
+    def test_diff(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.chdir(tmp_path)
+        Path("modified.txt").write_text("first\nsecond\n")
+        Path("removed.txt").write_text("content")
+        snapshot = RepositorySnapshot()
+        with snapshot.activate():
+            write("first\nchanged\n", "modified.txt")
+            write("created\n", "created.txt")
+            remove("removed.txt")
+        expected_diff = dedent(
+            R"""
+            diff --git a/created.txt b/created.txt
+            new file mode 100644
+            --- /dev/null
+            +++ b/created.txt
+            @@ -0,0 +1 @@
+            +created
+            diff --git a/modified.txt b/modified.txt
+            --- a/modified.txt
+            +++ b/modified.txt
+            @@ -1,2 +1,2 @@
+             first
+            -second
+            +changed
+            diff --git a/removed.txt b/removed.txt
+            deleted file mode 100644
+            --- a/removed.txt
+            +++ /dev/null
+            @@ -1 +0,0 @@
+            -content
+            \ No newline at end of file
+            """
+        ).lstrip("\n")
+        assert snapshot.diff() == expected_diff
@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+
+from repoma.utilities import REPOMA_DIR
+from repoma.utilities.templates import (
+    BUNDLE_NAME,
+    Template,
+    get_template,
+    list_templates,
+    pack_templates,
+    write_bundle,
+)
+
+
+def test_get_template():
+    template = get_template(".template/.cspell.json")
+    with open(REPOMA_DIR / ".template/.cspell.json") as stream:
+        content = stream.read()
+    assert template.content == content
+    assert template.parsed == json.loads(content)
+    assert template.matches(content)
+    assert template.matches(content.encode())
+    assert not template.matches(content + "\n")
+
+
+def test_list_templates():
+    assert list_templates(".github/ISSUE_TEMPLATE") == [
+        "bug_report.md",
+        "feature_request.md",
+    ]
+    assert "milestone.yml" in list_templates(".github/workflows")
+
+
+def test_write_bundle(tmp_path: Path):
+    write_bundle(output_dir=tmp_path, package_dir=REPOMA_DIR)
+    with open(tmp_path / BUNDLE_NAME) as stream:
+        bundle = json.load(stream)
+    assert bundle == pack_templates(REPOMA_DIR)
+    gitpod = Template(".template/.gitpod.yml", **bundle[".template/.gitpod.yml"])
+    assert gitpod == get_template(".template/.gitpod.yml")
+    assert isinstance(gitpod.parsed, dict)
@@ -0,0 +1,32 @@
+import json
+from pathlib import Path
+
+from repoma.utilities import read, write
+from repoma.utilities.trace import Tracer, span
+
+
+class TestTracer:
+    def test_no_tracer(self):
+        assert span("first") is span("second", path="file.txt")
+
+    def test_nested_spans(self, tmp_path: Path):
+        tracer = Tracer()
+        with tracer.activate():
+            with span("check", category="check"):
+                write("content", tmp_path / "file.txt")
+                read(tmp_path / "file.txt")
+        with span("not recorded"):
+            pass
+        names = [event["name"] for event in tracer.events]
+        assert names == ["write", "read", "check"]
+        check = tracer.events[-1]
+        for event in tracer.events[:-1]:
+            assert event["args"]["path"] == str(tmp_path / "file.txt")
+            assert check["ts"] <= event["ts"]
+            assert event["ts"] + event["dur"] <= check["ts"] + check["dur"]
+
+        output_file = tmp_path / "trace.json"
+        tracer.dump(output_file)
+        with open(output_file) as stream:
+            trace = json.load(stream)
+        assert trace == {"traceEvents": tracer.events}
@@ -0,0 +1,65 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from repoma.check_dev_files import main
+from repoma.utilities import parse
+from repoma.utilities.snapshot import RepositorySnapshot
+from repoma.utilities.watch import InotifyWatcher, PollingWatcher, create_watcher
+
+
+@pytest.mark.parametrize("polling", [False, True])
+def test_watcher(tmp_path: Path, polling: bool):
+    if not polling and not sys.platform.startswith("linux"):
+        pytest.skip("inotify is only available on Linux")
+    (tmp_path / ".gitignore").write_text(".tox/\n")
+    (tmp_path / "setup.cfg").write_text("\n")
+    with create_watcher(tmp_path, polling) as watcher:
+        if polling:
+            assert isinstance(watcher, PollingWatcher)
+            watcher.interval = 0.01
+        else:
+            assert isinstance(watcher, InotifyWatcher)
+        assert watcher.wait(timeout=0.01) == []
+
+        (tmp_path / "setup.cfg").write_text("[metadata]\n")
+        assert watcher.wait(timeout=1) == ["setup.cfg"]
+
+        (tmp_path / ".tox").mkdir()
+        (tmp_path / ".tox" / "log.txt").write_text("\n")
+        (tmp_path / "docs").mkdir()
+        (tmp_path / "docs" / "conf.py").write_text("\n")
+        assert watcher.wait(timeout=1) == ["docs/conf.py"]
+
+        cache_dir = tmp_path / ".cache" / "repoma"
+        cache_dir.mkdir(parents=True)
+        (cache_dir / "check-dev-files.json").write_text("{}\n")
+        assert watcher.wait(timeout=0.1) == []
+
+
+def test_snapshot_refresh(tmp_path: Path):
+    (tmp_path / "a.txt").write_text("a")
+    (tmp_path / "b.txt").write_text("b")
+    snapshot = RepositorySnapshot(root=tmp_path)
+    with snapshot.activate():
+        parsed_a = parse("a.txt", str.upper)
+        parsed_b = parse("b.txt", str.upper)
+        snapshot.write_text("a.txt", "fixed")
+    snapshot.commit()
+    (tmp_path / "b.txt").write_text("changed")
+    (tmp_path / "c.txt").write_text("new")
+
+    changed = snapshot.refresh(["a.txt", "b.txt", "c.txt", "removed.tmp"])
+    assert changed == ["b.txt", "c.txt"]
+    with snapshot.activate():
+        assert parse("a.txt", str.upper) == "FIXED"
+        assert parse("b.txt", str.upper) == "CHANGED"
+    assert parsed_a == "A"
+    assert parsed_b == "B"
+
+
+def test_watch_in_diff_mode(capsys):
+    with pytest.raises(SystemExit):
+        main(["--watch", "--diff"])
+    assert "--watch cannot be combined" in capsys.readouterr().err
@@ -0,0 +1,50 @@
+import io
+from textwrap import dedent
+from typing import List
+
+import pytest
+import yaml
+
+from repoma.utilities.yaml import (
+    FastSafeLoader,
+    create_prettier_round_trip_yaml,
+    load_yaml,
+    update_round_trip_sequence,
+)
+
+
+def test_load_yaml():
+    content = "on: push\njobs:\n  test:\n    runs-on: ubuntu-20.04\n"
+    parsed = load_yaml(content)
+    assert parsed == yaml.safe_load(content)
+    assert load_yaml(content) is parsed
+    assert load_yaml(content + "\n") is not parsed
+
+
+def test_fast_safe_loader():
+    assert FastSafeLoader is getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@pytest.mark.parametrize(
+    "items", [["--py37-plus"], ["--py37-plus", "--keep-runtime-typing"]]
+)
+def test_update_round_trip_sequence(items: List[str]):
+    content = dedent(
+        """
+        args:
+          - --py36-plus  # minimal version
+          - --keep-percent-format
+
+        # The following hooks are local
+        repos: []
+        """
+    ).lstrip()
+    yaml_parser = create_prettier_round_trip_yaml()
+    document = yaml_parser.load(content)
+    sequence = document["args"]
+    update_round_trip_sequence(sequence, items)
+    assert document["args"] is sequence
+    assert sequence == items
+    stream = io.StringIO()
+    yaml_parser.dump(document, stream)
+    assert "\n\n# The following hooks are local\nrepos: []\n" in stream.getvalue()